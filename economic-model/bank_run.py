@@ -0,0 +1,224 @@
+"""
+Bank-Run Simulator
+
+Stochastic version of F5 in `failure_mode_analysis`. Instead of five
+depositors and one whale, a vault has N depositors of heterogeneous size
+whose exits feed back into the state that makes others exit.
+
+Each day, on VaultState semantics (revenue, then spend, then withdrawals):
+
+  work     = min(1, balance / (burn * capacity_months))   capital-limited output
+  revenue  = demand * work            (vault keeps vault_fee_bps of it)
+  spend    = burn / 30 * work
+  hazard   = base + dd_coef * drawdown + runway_coef * max(0, 1 - runway / runway_target)
+             + peer_coef * (EWMA of the daily fraction of shares withdrawn)
+
+where runway = balance / burn in months. Depositor i exits in full once the
+path's cumulative hazard reaches E_i / sens_i, with E_i ~ Exp(1) per path
+and sens_i rising with deposit size (whales are quicker to run). So
+depositors are never looped over. Each path sorts its exit thresholds once
+and keeps prefix sums of shares in that order. A day's exits are then one
+batched searchsorted over all paths, and their shares are a difference of
+prefix sums.
+
+Demand is lognormal around `revenue_multiple * burn` and dies for good
+with `death_prob` per month (the shock that starts the run). Paths run in
+SeedSequence-seeded chunks across processes, as in governance_mc.py, so
+results never depend on the worker count.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from governance_mc import _chunk_sizes
+from result_cache import ResultCache
+
+
+PERCENTILES = (5, 25, 50, 75, 95, 99)
+RUNWAY_MONTHS = (1, 3, 6)
+
+
+@dataclass
+class BankRunConfig:
+    n_depositors: int = 100_000
+    size_mean: float = 100.0        # USDC per depositor
+    size_cv: float = 3.0
+    whale_elasticity: float = 0.3   # sens ~ size^elasticity, normalized to mean 1
+    days: int = 365
+    burn_rate: float = 0.05         # monthly burn as a fraction of initial TVL
+    revenue_multiple: float = 8.0   # gross monthly revenue / burn while alive
+    revenue_cv: float = 1.0         # daily demand noise
+    death_prob: float = 0.05        # per month, demand drops to zero for good
+    capacity_months: float = 1.0    # full output needs this much burn on hand
+    vault_fee_bps: int = 2000
+    base_hazard: float = 2e-4       # per day
+    dd_coef: float = 0.1
+    runway_coef: float = 0.02
+    runway_target: float = 6.0      # months
+    peer_coef: float = 0.2            # x share-weighted sensitivity (~2) = feedback gain
+    peer_halflife: float = 7.0      # days
+    seed: int = 0
+
+    def depositors(self) -> tuple:
+        """(sizes, sensitivities), fixed across paths."""
+        rng = np.random.default_rng(np.random.SeedSequence(self.seed).spawn(1)[0])
+        sigma2 = np.log1p(self.size_cv ** 2)
+        sizes = rng.lognormal(np.log(self.size_mean) - sigma2 / 2, np.sqrt(sigma2), self.n_depositors)
+        sens = (sizes / np.median(sizes)) ** self.whale_elasticity
+        return sizes, sens / sens.mean()
+
+
+# ============================================================
+# PATH ENGINE
+# ============================================================
+
+def _sample_path_inputs(cfg: BankRunConfig, rng: np.random.Generator, n_paths: int, sens: np.ndarray) -> tuple:
+    """(daily demand in units of burn/30 at full work, exit thresholds) per path."""
+    sigma2 = np.log1p(cfg.revenue_cv ** 2)
+    noise = rng.lognormal(-sigma2 / 2, np.sqrt(sigma2), (n_paths, cfg.days))
+    daily_death = 1 - (1 - cfg.death_prob) ** (1 / 30)
+    alive = np.cumprod(rng.random((n_paths, cfg.days)) >= daily_death, axis=1)
+    tau = rng.exponential(size=(n_paths, sens.size)) / sens
+    return noise * alive, tau
+
+
+def simulate_paths(cfg: BankRunConfig, rng: np.random.Generator, n_paths: int, sizes: np.ndarray,
+                   sens: np.ndarray) -> dict:
+    """Run n_paths vaults in lockstep; per-path results."""
+    demand, tau = _sample_path_inputs(cfg, rng, n_paths, sens)
+    n = sizes.size
+    tvl0 = sizes.sum()
+    burn = cfg.burn_rate * tvl0
+    demand *= cfg.revenue_multiple * burn / 30
+
+    order = np.argsort(tau, axis=1)
+    tau = np.take_along_axis(tau, order, axis=1)
+    cum = np.zeros((n_paths, n + 1))
+    np.cumsum(sizes[order], axis=1, out=cum[:, 1:])  # NAV starts at 1, so shares = USDC deposited
+    del order
+    # One flat sorted array: row r's thresholds shifted by r * stride
+    cap = float(cfg.days) * 1e3
+    stride = 2 * cap
+    rows = np.arange(n_paths)
+    flat = (np.minimum(tau, cap) + (rows * stride)[:, None]).ravel()
+    del tau
+
+    balance = np.full(n_paths, tvl0)
+    shares = cum[:, n].copy()
+    peak_nav = np.ones(n_paths)
+    min_runway = balance / burn
+    withdrawn = np.zeros(n_paths)
+    big_hazard = np.zeros(n_paths)
+    peer = np.zeros(n_paths)
+    ptr = np.zeros(n_paths, dtype=np.int64)
+    decay = 0.5 ** (1 / cfg.peer_halflife)
+    vault_fee = cfg.vault_fee_bps / 10000
+
+    for d in range(cfg.days):
+        work = np.minimum(1.0, balance / (burn * cfg.capacity_months))
+        balance += demand[:, d] * work * vault_fee
+        balance -= np.minimum(burn / 30 * work, balance)
+        nav = _nav(balance, shares)
+        np.maximum(peak_nav, nav, out=peak_nav)
+        runway = balance / burn
+        np.minimum(min_runway, runway, out=min_runway)
+
+        hazard = (cfg.base_hazard + cfg.dd_coef * (1 - nav / peak_nav)
+                  + cfg.runway_coef * np.maximum(0.0, 1 - runway / cfg.runway_target)
+                  + cfg.peer_coef * peer)
+        big_hazard += hazard
+        new_ptr = np.searchsorted(flat, big_hazard + rows * stride, side="right") - rows * n
+        np.clip(new_ptr, ptr, n, out=new_ptr)
+        out_shares = cum[rows, new_ptr] - cum[rows, ptr]
+        ptr = new_ptr
+        left = cum[:, n] - cum[rows, ptr]  # exactly 0 once everyone is out
+
+        usdc_out = out_shares * nav
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.where(shares > 0, out_shares / shares, 0.0)
+        balance -= usdc_out
+        shares = left
+        withdrawn += usdc_out
+        peer = peer * decay + (1 - decay) * frac
+        np.copyto(balance, 0.0, where=left == 0)  # the last holder takes the dust
+
+    nav = _nav(balance, shares)
+    min_runway = np.minimum(min_runway, balance / burn)
+    return {
+        "min_runway": min_runway,
+        "withdrawn": withdrawn / tvl0,
+        "final_nav": nav,
+        "stayer_loss": np.where(shares > 0, np.maximum(0.0, 1 - nav), 0.0),
+        "stayer_loss_usdc": shares * np.maximum(0.0, 1 - nav),
+        "exited": ptr / n,
+    }
+
+
+def _nav(balance: np.ndarray, shares: np.ndarray) -> np.ndarray:
+    """VaultState.nav_per_share elementwise (1.0 when no shares are left)."""
+    nav = np.ones_like(balance)
+    np.divide(balance, shares, out=nav, where=shares > 0)
+    return nav
+
+
+# ============================================================
+# MONTE CARLO RUNNER
+# ============================================================
+
+def _run_chunk(args) -> dict:
+    cfg, seed_seq, n_paths = args
+    sizes, sens = cfg.depositors()
+    return simulate_paths(cfg, np.random.default_rng(seed_seq), n_paths, sizes, sens)
+
+
+def bank_run_monte_carlo(cfg: Optional[BankRunConfig] = None, n_paths: int = 1_000, workers: int = 1,
+                         chunk_size: int = 25, percentiles=PERCENTILES, cache: Optional[ResultCache] = None) -> dict:
+    """
+    P(min runway < N months) for N in RUNWAY_MONTHS, and percentile tables of
+    the share of TVL withdrawn and of stayers' NAV loss. Chunks hold
+    chunk_size * n_depositors thresholds (25 x 1e5 is about 40 MB).
+    """
+    cfg = cfg or BankRunConfig()
+    sizes = _chunk_sizes(n_paths, chunk_size)
+    seeds = np.random.SeedSequence(cfg.seed).spawn(len(sizes) + 1)[1:]
+    jobs = [(cfg, s, k) for s, k in zip(seeds, sizes)]
+    cache = cache if cache is not None else ResultCache.from_env()
+    parts = cache.map(_run_chunk, jobs, workers)
+
+    res = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    return {
+        "paths": n_paths,
+        "p_runway_below": {m: float(np.mean(res["min_runway"] < m)) for m in RUNWAY_MONTHS},
+        "withdrawn": dict(zip(percentiles, np.percentile(res["withdrawn"], percentiles))),
+        "stayer_loss": dict(zip(percentiles, np.percentile(res["stayer_loss"], percentiles))),
+        "stayer_loss_usdc": dict(zip(percentiles, np.percentile(res["stayer_loss_usdc"], percentiles))),
+        "p_any_loss": float(np.mean(res["stayer_loss"] > 0)),
+    }
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("BANK RUN: heterogeneous depositors, runway and peer-driven withdrawals")
+    print("=" * 80)
+
+    for label, cfg in [
+        ("Baseline (5%/mo demand death, whales more sensitive)", BankRunConfig()),
+        ("No peer contagion", BankRunConfig(peer_coef=0.0)),
+        ("Strong contagion (peer_coef 0.5, feedback gain > 1)", BankRunConfig(peer_coef=0.5)),
+    ]:
+        t0 = time.perf_counter()
+        r = bank_run_monte_carlo(cfg, n_paths=1_000, workers=2)
+        elapsed = time.perf_counter() - t0
+        print(f"\n### {label}: {cfg.n_depositors:,} depositors x {r['paths']:,} paths x {cfg.days} days "
+              f"({elapsed:.1f}s)")
+        print("  P(runway < N months): " + ", ".join(f"{m}mo {p:.1%}" for m, p in r["p_runway_below"].items())
+              + f"; P(stayers lose) {r['p_any_loss']:.1%}")
+        ps = list(r["withdrawn"])
+        print(f"  {'Metric':<22}" + "".join(f"{'p' + str(p):>11}" for p in ps))
+        print(f"  {'TVL withdrawn':<22}" + "".join(f"{v:>11.1%}" for v in r["withdrawn"].values()))
+        print(f"  {'Stayer NAV loss':<22}" + "".join(f"{v:>11.2%}" for v in r["stayer_loss"].values()))
+        print(f"  {'Stayer loss (USDC)':<22}" + "".join(f"{v:>11,.0f}" for v in r["stayer_loss_usdc"].values()))
+    print()
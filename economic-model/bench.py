@@ -0,0 +1,539 @@
+"""
+Benchmark Suite
+
+Throughput, wall time and peak memory for the economic-model hot paths,
+with a history file so nightly risk jobs can catch slowdowns:
+
+  vault.*      VaultState op throughput (deposit/withdraw, revenue/spend)
+  curve.*      buy/sell throughput per curve option, scalar and batched
+  afix.*       the Option A-Fix buy split solver, scalar and array
+  fees.*       fee cascade evaluation on a chain and on a random DAG
+  script.*     wall time of `python simulate.py` / `bonding-curve-sim.py`
+  batch.*, mc.*  large batched and Monte Carlo runs: time and peak memory
+
+Each benchmark's setup builds its state once and returns the timed call,
+which restores that state itself, so every repeat does identical work.
+The harness runs `warmup` untimed calls, then `repeats` timed ones with
+the garbage collector off (as timeit does), and keeps the fastest: as
+ops/s for op loops, as seconds for whole runs. Peak memory is the
+tracemalloc peak of one call, which includes NumPy buffers.
+
+    python bench.py                        # run all, append to bench_history.jsonl
+    python bench.py -k 'curve.A*' -k afix.*
+    python bench.py --compare              # flag >10% slowdowns vs the last record
+    python bench.py --compare --baseline 7cff42b --threshold 0.2
+
+With --compare the exit status is 1 when anything regressed past the
+threshold. A record holds the git commit, interpreter, NumPy version, host and
+invariant level next to the results. Comparisons across hosts are reported but mean
+little.
+"""
+
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from invariants import active
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HISTORY = os.path.join(HERE, "bench_history.jsonl")
+THRESHOLD = 0.10
+
+OPS = "ops/s"    # higher is better
+SECONDS = "s"    # lower is better
+MB = "MB"        # lower is better
+
+CURVES = ("A", "A-Fix", "B", "B-Ratchet", "C")
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    unit: str = OPS
+    ops: int = 1  # operations per timed call, for throughput
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, unit: str = OPS, ops: int = 1):
+    def register(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, unit, ops)
+        return setup
+    return register
+
+
+# ============================================================
+# VAULT OPS
+# ============================================================
+
+N_SCALAR = 10_000
+
+
+@benchmark("vault.deposit_withdraw", ops=2 * N_SCALAR)
+def _vault_deposit_withdraw():
+    from simulate import VaultState
+    v = VaultState()
+    v.deposit(10_000)
+    v.receive_revenue(1_000)
+    snap = v.snapshot()
+
+    def run():
+        v.restore(snap)
+        for _ in range(N_SCALAR):
+            v.withdraw(v.deposit(100.0))
+    return run
+
+
+@benchmark("vault.revenue_spend", ops=2 * N_SCALAR)
+def _vault_revenue_spend():
+    from simulate import VaultState
+    v = VaultState()
+    v.deposit(10_000)
+    snap = v.snapshot()
+
+    def run():
+        v.restore(snap)
+        for _ in range(N_SCALAR):
+            v.receive_revenue(10.0)
+            v.spend(1.0)
+    return run
+
+
+# ============================================================
+# CURVES
+# ============================================================
+
+N_TRADES = 2_000
+N_BATCH = 100_000
+
+
+def _curve(name: str):
+    """A curve option with $50k bought and some revenue in, ready to trade."""
+    from registry import make_model
+    m = make_model(name)
+    for _ in range(100):
+        m.buy(500.0)
+    m.receive_revenue(2_000.0)
+    return m
+
+
+def _curve_buy(name: str):
+    m = _curve(name)
+    snap = m.snapshot()
+
+    def run():
+        m.restore(snap)
+        for _ in range(N_TRADES):
+            m.buy(10.0)
+    return run
+
+
+def _curve_sell(name: str):
+    m = _curve(name)
+    tokens = m.metrics()["supply"] / (4 * N_TRADES)
+    snap = m.snapshot()
+
+    def run():
+        m.restore(snap)
+        for _ in range(N_TRADES):
+            m.sell(tokens)
+    return run
+
+
+def _curve_buy_batch(name: str):
+    import numpy as np
+    m = _curve(name)
+    usdc = np.full(N_BATCH, 0.25)
+    snap = m.snapshot()
+
+    def run():
+        m.restore(snap)
+        m.buy_batch(usdc)
+    return run
+
+
+def _curve_sell_batch(name: str):
+    import numpy as np
+    m = _curve(name)
+    tokens = np.full(N_BATCH, m.metrics()["supply"] / (4 * N_BATCH))
+    snap = m.snapshot()
+
+    def run():
+        m.restore(snap)
+        m.sell_batch(tokens)
+    return run
+
+
+for _name in CURVES:
+    benchmark(f"curve.{_name}.buy", ops=N_TRADES)(partial(_curve_buy, _name))
+    benchmark(f"curve.{_name}.sell", ops=N_TRADES)(partial(_curve_sell, _name))
+    benchmark(f"curve.{_name}.buy_batch", ops=N_BATCH)(partial(_curve_buy_batch, _name))
+    benchmark(f"curve.{_name}.sell_batch", ops=N_BATCH)(partial(_curve_sell_batch, _name))
+
+
+# ============================================================
+# A-FIX SOLVER
+# ============================================================
+
+def _split_inputs(n: int):
+    """Reserves from launch to sell-out, floors up to 10x the curve price."""
+    import numpy as np
+    rng = np.random.default_rng(0)
+    vur = rng.uniform(30_000, 120_000, n)
+    vtr = 1_073_000_000.0 * 30_000.0 / vur
+    floor = vur / vtr * rng.uniform(0.0, 10.0, n)
+    usdc = np.exp(rng.uniform(np.log(0.01), np.log(100_000), n))
+    return vtr, vur, floor, usdc
+
+
+@benchmark("afix.floor_split", ops=N_SCALAR)
+def _afix_scalar():
+    from curve_kernel import floor_split
+    args = list(zip(*(a.tolist() for a in _split_inputs(N_SCALAR))))
+
+    def run():
+        for a in args:
+            floor_split(*a)
+    return run
+
+
+@benchmark("afix.floor_split_array", ops=1_000_000)
+def _afix_array():
+    from curve_kernel import floor_split_array
+    args = _split_inputs(1_000_000)
+    return lambda: floor_split_array(*args)
+
+
+# ============================================================
+# FEE CASCADE
+# ============================================================
+
+@benchmark("fees.chain", ops=1)
+def _fees_chain():
+    import numpy as np
+    from fee_graph import chain_graph
+    g = chain_graph(7, 0.5)
+    client = np.zeros(7)
+    client[0] = 10.0
+    return lambda: g.propagate(client)
+
+
+@benchmark("fees.dag_10k_x32", ops=32)
+def _fees_dag():
+    import numpy as np
+    from fee_graph import random_dag
+    g = random_dag(10_000, 100_000)
+    rng = np.random.default_rng(1)
+    client = np.zeros((g.n, 32))
+    client[rng.integers(0, 100, 32), np.arange(32)] = 10.0
+    return lambda: g.propagate(client)
+
+
+@benchmark("batch.job_costs_4m", ops=4_000_000)
+def _job_costs():
+    import numpy as np
+    from unit_economics import JobCostModel
+    costs, rng = JobCostModel(), np.random.default_rng(0)
+    return lambda: costs.sample(rng, 4_000_000)
+
+
+@benchmark("stats.rolling_update_10k", ops=10_000 * 100)
+def _rolling_update():
+    import numpy as np
+    from rolling_stats import RollingStats
+    xs = np.random.default_rng(0).lognormal(2.5, 0.8, (465, 10_000))
+    stats = RollingStats(10_000, windows=(30, 90, 365), halflives=(30.0,), quantiles=(0.25, 0.5))
+    for x in xs[:365]:
+        stats.update(x)
+    return lambda: [stats.update(x) for x in xs[365:]]
+
+
+# ============================================================
+# SCRIPTS (wall time, including interpreter start)
+# ============================================================
+
+def _script(path: str):
+    cmd = [sys.executable, os.path.join(HERE, path)]
+    return lambda: subprocess.run(cmd, cwd=HERE, stdout=subprocess.DEVNULL, check=True)
+
+
+benchmark("script.simulate", unit=SECONDS)(partial(_script, "simulate.py"))
+benchmark("script.bonding_curve_sim", unit=SECONDS)(partial(_script, "bonding-curve-sim.py"))
+
+
+# ============================================================
+# BATCHED + MONTE CARLO (time and peak memory)
+# ============================================================
+
+def _vault_batch_1m(micro: bool):
+    from vault_batch import VaultBatch, VaultBatchMicro, _script
+    n = 1_000_000
+    d1, sp, rev, d2 = _script(n)
+    if micro:
+        d1, sp, rev, d2 = ((x * 1e6).astype("int64") for x in (d1, sp, rev, d2))
+
+    def run():
+        b = (VaultBatchMicro if micro else VaultBatch)(n)
+        b.deposit(d1)
+        b.spend(sp)
+        b.receive_revenue(rev)
+        shares = b.deposit(d2)
+        b.withdraw(shares)
+    return run
+
+
+def _governance_mc():
+    from governance_mc import LognormalRevenue, governance_monte_carlo
+    return lambda: governance_monte_carlo(LognormalRevenue(), n_paths=200_000, seed=42, workers=1)
+
+
+def _policies():
+    from governance_mc import RegimeSwitchRevenue
+    from governance_policy import POLICIES, policy_monte_carlo
+    return lambda: policy_monte_carlo(list(POLICIES.values()), RegimeSwitchRevenue(), n_paths=100_000, seed=42)
+
+
+def _policies_cached():
+    import tempfile
+    from governance_mc import RegimeSwitchRevenue
+    from governance_policy import POLICIES, policy_monte_carlo
+    from result_cache import ResultCache
+    tmp = tempfile.TemporaryDirectory()
+    cache = ResultCache(tmp.name)
+    run = lambda: policy_monte_carlo(list(POLICIES.values()), RegimeSwitchRevenue(), n_paths=100_000, seed=42,
+                                     cache=cache)
+    run()
+    run.tmp = tmp  # removed with the closure
+    return run
+
+
+def _bank_run():
+    from bank_run import BankRunConfig, bank_run_monte_carlo
+    return lambda: bank_run_monte_carlo(BankRunConfig(), n_paths=50)
+
+
+def _slashing():
+    from slashing import SlashConfig, slashing_monte_carlo
+    cfg = SlashConfig(jobs_per_day=5_000, job_mean=0.10, operator_bond=250, initial_tvl=100_000)
+    return lambda: slashing_monte_carlo(cfg, n_vaults=50, n_jobs=200_000, bad_rate=0.05)
+
+
+def _inflation_surface():
+    from inflation_attack import attack_surface, default_grid
+    grid = default_grid(1)
+    return lambda: attack_surface(grid)
+
+
+for _name, _setup in [("batch.vault_1m", partial(_vault_batch_1m, False)),
+                      ("batch.vault_micro_1m", partial(_vault_batch_1m, True)),
+                      ("batch.inflation_surface", _inflation_surface),
+                      ("mc.governance_200k", _governance_mc),
+                      ("mc.policies_100k", _policies),
+                      ("mc.policies_100k.cached", _policies_cached),
+                      ("mc.bank_run_50", _bank_run),
+                      ("mc.slashing_10m", _slashing)]:
+    benchmark(_name, unit=SECONDS)(_setup)
+    benchmark(f"{_name}.peak", unit=MB)(_setup)
+
+
+# ============================================================
+# HARNESS
+# ============================================================
+
+def measure(bench: Benchmark, repeats: int = 5, warmup: int = 1) -> dict:
+    run = bench.setup()
+    if bench.unit == MB:
+        run()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return {"value": peak / 2 ** 20, "unit": MB}
+
+    for _ in range(warmup):
+        run()
+    times = []
+    gc_was_enabled = gc.isenabled()
+    try:
+        for _ in range(repeats):
+            gc.collect()
+            gc.disable()
+            t0 = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - t0)
+            gc.enable()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    best, median = min(times), statistics.median(times)
+    value = best if bench.unit == SECONDS else bench.ops / best
+    return {"value": value, "unit": bench.unit, "min_s": best, "median_s": median, "repeats": repeats}
+
+
+def run_benchmarks(names: List[str], repeats: int = 5, warmup: int = 1, log=print) -> Dict[str, dict]:
+    results = {}
+    for name in names:
+        bench = BENCHMARKS[name]
+        r = measure(bench, repeats, warmup)
+        results[name] = r
+        log(f"  {name:<34} {_fmt(r['value'], r['unit']):>16}")
+    return results
+
+
+def _fmt(value: float, unit: str) -> str:
+    if unit == OPS:
+        return f"{value:,.0f} {unit}"
+    return f"{value:,.3f} {unit}" if unit == SECONDS else f"{value:,.1f} {unit}"
+
+
+# ============================================================
+# HISTORY + COMPARE
+# ============================================================
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                             text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=HERE,
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_record(results: Dict[str, dict]) -> dict:
+    numpy = sys.modules.get("numpy")
+    return {
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__ if numpy else None,
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "invariants": active().level,
+        "results": results,
+    }
+
+
+def load_history(path: str = HISTORY) -> List[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(record: dict, path: str = HISTORY) -> None:
+    with open(path, "a") as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+def find_baseline(history: List[dict], ref: Optional[str] = None) -> Optional[dict]:
+    """Latest record, or the latest whose commit starts with `ref`, or history[int(ref)]."""
+    if not history:
+        return None
+    if ref is None:
+        return history[-1]
+    if ref.lstrip("-").isdigit():
+        return history[int(ref)]
+    matches = [r for r in history if (r.get("commit") or "").startswith(ref)]
+    return matches[-1] if matches else None
+
+
+def slowdown(old: dict, new: dict) -> float:
+    """Fractional slowdown of new vs old (> 0 is worse), whatever the unit."""
+    if old["unit"] == OPS:
+        return old["value"] / new["value"] - 1
+    return new["value"] / old["value"] - 1
+
+
+def compare(baseline: dict, current: dict, threshold: float = THRESHOLD) -> List[dict]:
+    """One row per benchmark present in both records, flagged past `threshold`."""
+    rows = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None or old["unit"] != new["unit"] or not old["value"]:
+            continue
+        s = slowdown(old, new)
+        rows.append({"name": name, "unit": new["unit"], "old": old["value"], "new": new["value"],
+                     "slowdown": s, "regressed": s > threshold})
+    return rows
+
+
+def print_comparison(rows: List[dict], baseline: dict, current: dict, threshold: float) -> None:
+    print(f"\n--- vs {baseline.get('commit')} ({baseline.get('time')}), threshold {threshold:.0%} ---")
+    for key in ("host", "cpus", "invariants"):
+        if baseline.get(key) != current.get(key):
+            print(f"  note: baseline {key} was {baseline.get(key)}, now {current.get(key)}")
+    print(f"  {'Benchmark':<34} {'Baseline':>16} {'Current':>16} {'Speed':>8}")
+    for r in rows:
+        flag = "  REGRESSED" if r["regressed"] else ""
+        print(f"  {r['name']:<34} {_fmt(r['old'], r['unit']):>16} {_fmt(r['new'], r['unit']):>16} "
+              f"{1 / (1 + r['slowdown']) - 1:>+8.1%}{flag}")
+    n = sum(r["regressed"] for r in rows)
+    print(f"\n  {n} regression(s) past {threshold:.0%}" if n else "\n  No regressions.")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the economic-model hot paths.")
+    parser.add_argument("-k", dest="patterns", action="append", help="benchmark name glob (repeatable)")
+    parser.add_argument("--list", action="store_true", help="list benchmarks")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--history", default=HISTORY, help="JSON-lines history file")
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    parser.add_argument("--compare", action="store_true", help="compare against a baseline record")
+    parser.add_argument("--baseline", help="commit prefix or history index (default: latest record)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="fractional slowdown to flag")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for b in BENCHMARKS.values():
+            print(f"  {b.name:<34} {b.unit}")
+        return 0
+
+    names = [n for n in BENCHMARKS if not args.patterns or any(fnmatch.fnmatch(n, p) for p in args.patterns)]
+    if not names:
+        parser.error("no benchmark matches")
+    history = load_history(args.history)
+    baseline = find_baseline(history, args.baseline) if args.compare else None
+    if args.compare and baseline is None:
+        print(f"No baseline record in {args.history}; this run becomes the first.")
+
+    print("=" * 80)
+    print(f"BENCHMARKS ({len(names)}, {args.repeats} repeats, {args.warmup} warmup)")
+    print("=" * 80)
+    t0 = time.perf_counter()
+    record = make_record(run_benchmarks(names, args.repeats, args.warmup))
+    print(f"\n  total {time.perf_counter() - t0:.1f}s, commit {record['commit']}")
+
+    if not args.no_save:
+        append_history(record, args.history)
+        print(f"  appended to {args.history}")
+    if baseline is not None:
+        rows = compare(baseline, record, args.threshold)
+        print_comparison(rows, baseline, record, args.threshold)
+        return 1 if any(r["regressed"] for r in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,399 +9,9 @@ Models three approaches to combining bonding curves with revenue backing:
 For each: tracks price, floor, reserve solvency, and buyer/seller outcomes.
 """
 
-import math
-from dataclasses import dataclass, field
-from typing import List, Tuple
-
-
-# ============================================================
-# OPTION A: SEPARATE REVENUE POOL
-# ============================================================
-
-@dataclass
-class BondingCurveFloorA:
-    """
-    Two pools:
-      1. Curve reserve: backs the speculative component (constant product)
-      2. Revenue pool: backs the floor (monotonically increasing per-share)
-
-    effective_price = curve_price(supply) + revenue_floor_per_share
-
-    On buy: buyer pays effective_price, curve reserve gets curve portion,
-            revenue pool is unchanged
-    On sell: seller gets curve_price(new_supply) + revenue_floor_per_share
-             curve reserve pays curve portion, revenue pool pays floor portion
-    On revenue: Y% goes to revenue pool, divided by outstanding shares
-    """
-    virtual_token_reserve: float = 1_073_000_000.0
-    virtual_usdc_reserve: float = 30_000.0
-    real_token_reserve: float = 800_000_000.0
-    real_usdc_reserve: float = 0.0  # actual USDC in curve reserve
-
-    revenue_pool: float = 0.0  # USDC backing the floor
-    cumulative_revenue_per_share: float = 0.0  # the ratchet
-
-    total_supply: float = 1_000_000_000.0
-    tokens_sold: float = 0.0  # tokens currently in circulation (bought on curve)
-    operator_tokens: float = 200_000_000.0  # vested to operator
-
-    total_revenue: float = 0.0
-
-    @property
-    def k(self) -> float:
-        return self.virtual_token_reserve * self.virtual_usdc_reserve
-
-    @property
-    def curve_price(self) -> float:
-        return self.virtual_usdc_reserve / self.virtual_token_reserve
-
-    @property
-    def effective_price(self) -> float:
-        return self.curve_price + self.cumulative_revenue_per_share
-
-    @property
-    def circulating_supply(self) -> float:
-        return self.tokens_sold + self.operator_tokens
-
-    def buy(self, usdc_amount: float) -> dict:
-        # How many tokens does the curve give for this USDC?
-        # First subtract the floor component we need to set aside
-        # Actually: buyer pays effective_price which includes floor
-        # But tokens come off the bonding curve at curve_price
-        # The floor portion of the payment goes... nowhere? It's already backed.
-        #
-        # Wait -- this is the tricky part.
-        # If effective_price = curve_price + floor, and buyer pays effective_price,
-        # then the extra (floor portion) needs to go somewhere.
-        #
-        # Option: All USDC goes to curve reserve. The floor is backed by the
-        # revenue pool which is separately funded by revenue events.
-        # Buyer just pays curve_price (the floor is a guarantee, not a surcharge).
-        #
-        # Actually re-reading the spec: buyer pays on the bonding curve normally.
-        # The floor is just a minimum sell price. It doesn't affect buy price.
-        # Revenue builds up the floor. When you sell, you get max(curve_sell_price, floor).
-        # Or: curve_sell_price + floor.
-        #
-        # Let's model: buy at curve price, sell at curve_price + floor.
-        # Revenue pool must have enough to cover floor * circulating_supply.
-
-        new_virtual_usdc = self.virtual_usdc_reserve + usdc_amount
-        new_virtual_token = self.k / new_virtual_usdc
-        tokens_out = self.virtual_token_reserve - new_virtual_token
-
-        if tokens_out > self.real_token_reserve:
-            tokens_out = self.real_token_reserve
-
-        self.virtual_usdc_reserve = new_virtual_usdc
-        self.virtual_token_reserve = new_virtual_token
-        self.real_usdc_reserve += usdc_amount
-        self.real_token_reserve -= tokens_out
-        self.tokens_sold += tokens_out
-
-        return {
-            "tokens_out": tokens_out,
-            "price_paid": usdc_amount / tokens_out if tokens_out > 0 else 0,
-            "curve_price_after": self.curve_price,
-            "effective_price_after": self.effective_price,
-        }
-
-    def sell(self, token_amount: float) -> dict:
-        # Curve component
-        new_virtual_token = self.virtual_token_reserve + token_amount
-        new_virtual_usdc = self.k / new_virtual_token
-        curve_usdc_out = self.virtual_usdc_reserve - new_virtual_usdc
-
-        # Floor component
-        floor_usdc_out = token_amount * self.cumulative_revenue_per_share
-
-        total_usdc_out = curve_usdc_out + floor_usdc_out
-
-        # Check solvency
-        if curve_usdc_out > self.real_usdc_reserve:
-            curve_usdc_out = self.real_usdc_reserve
-            total_usdc_out = curve_usdc_out + floor_usdc_out
-        if floor_usdc_out > self.revenue_pool:
-            floor_usdc_out = self.revenue_pool
-            total_usdc_out = curve_usdc_out + floor_usdc_out
-
-        self.virtual_token_reserve = new_virtual_token
-        self.virtual_usdc_reserve = new_virtual_usdc
-        self.real_usdc_reserve -= curve_usdc_out
-        self.revenue_pool -= floor_usdc_out
-        self.real_token_reserve += token_amount
-        self.tokens_sold -= token_amount
-
-        return {
-            "usdc_out": total_usdc_out,
-            "curve_component": curve_usdc_out,
-            "floor_component": floor_usdc_out,
-            "price_received": total_usdc_out / token_amount if token_amount > 0 else 0,
-            "curve_price_after": self.curve_price,
-            "effective_price_after": self.effective_price,
-        }
-
-    def receive_revenue(self, amount: float, operator_bps: int = 6000,
-                        floor_bps: int = 3000, protocol_bps: int = 1000) -> dict:
-        operator_cut = amount * operator_bps / 10000
-        floor_cut = amount * floor_bps / 10000
-        protocol_cut = amount * protocol_bps / 10000
-
-        self.total_revenue += amount
-        self.revenue_pool += floor_cut
-
-        # Update floor per share (ratchet -- only increases)
-        if self.circulating_supply > 0:
-            increment = floor_cut / self.circulating_supply
-            self.cumulative_revenue_per_share += increment
-
-        return {
-            "operator": operator_cut,
-            "floor": floor_cut,
-            "protocol": protocol_cut,
-            "new_floor_per_share": self.cumulative_revenue_per_share,
-            "revenue_pool_balance": self.revenue_pool,
-        }
-
-    def check_solvency(self) -> dict:
-        floor_liability = self.tokens_sold * self.cumulative_revenue_per_share
-        floor_backed = self.revenue_pool >= floor_liability - 0.01  # rounding tolerance
-        return {
-            "floor_liability": floor_liability,
-            "revenue_pool": self.revenue_pool,
-            "floor_fully_backed": floor_backed,
-            "curve_reserve": self.real_usdc_reserve,
-        }
-
-
-# ============================================================
-# OPTION B: REVENUE SHIFTS THE CURVE
-# ============================================================
-
-@dataclass
-class BondingCurveFloorB:
-    """
-    Revenue goes directly into the bonding curve's virtual USDC reserve.
-    This shifts the entire curve upward. No separate floor.
-    The "floor" is implicit: the curve price can never go below the
-    amount that revenue has added.
-
-    Problem: if someone sells, they pull USDC out of the curve,
-    which DOES lower the price below the revenue-added amount.
-    So this doesn't actually create a ratchet.
-
-    Unless: we track a minimum_virtual_usdc that can never decrease.
-    Revenue adds to it. Sells can only pull the curve down to that minimum.
-    """
-    virtual_token_reserve: float = 1_073_000_000.0
-    virtual_usdc_reserve: float = 30_000.0
-    real_token_reserve: float = 800_000_000.0
-    real_usdc_reserve: float = 0.0
-
-    revenue_added_to_reserve: float = 0.0  # tracks how much revenue has shifted curve
-
-    total_supply: float = 1_000_000_000.0
-    tokens_sold: float = 0.0
-    operator_tokens: float = 200_000_000.0
-    total_revenue: float = 0.0
-
-    @property
-    def k(self) -> float:
-        return self.virtual_token_reserve * self.virtual_usdc_reserve
-
-    @property
-    def curve_price(self) -> float:
-        return self.virtual_usdc_reserve / self.virtual_token_reserve
-
-    def buy(self, usdc_amount: float) -> dict:
-        new_virtual_usdc = self.virtual_usdc_reserve + usdc_amount
-        new_virtual_token = self.k / new_virtual_usdc
-        tokens_out = self.virtual_token_reserve - new_virtual_token
-
-        if tokens_out > self.real_token_reserve:
-            tokens_out = self.real_token_reserve
-
-        self.virtual_usdc_reserve = new_virtual_usdc
-        self.virtual_token_reserve = new_virtual_token
-        self.real_usdc_reserve += usdc_amount
-        self.real_token_reserve -= tokens_out
-        self.tokens_sold += tokens_out
-
-        # Recalculate k after state change (k changes because we add real USDC)
-        # Actually in constant product, k stays constant during trades.
-        # It only changes when revenue is added (liquidity injection).
-
-        return {
-            "tokens_out": tokens_out,
-            "price_paid": usdc_amount / tokens_out if tokens_out > 0 else 0,
-            "curve_price_after": self.curve_price,
-        }
-
-    def sell(self, token_amount: float) -> dict:
-        new_virtual_token = self.virtual_token_reserve + token_amount
-        new_virtual_usdc = self.k / new_virtual_token
-        usdc_out = self.virtual_usdc_reserve - new_virtual_usdc
-
-        if usdc_out > self.real_usdc_reserve:
-            usdc_out = self.real_usdc_reserve
-
-        self.virtual_token_reserve = new_virtual_token
-        self.virtual_usdc_reserve = new_virtual_usdc
-        self.real_usdc_reserve -= usdc_out
-        self.real_token_reserve += token_amount
-        self.tokens_sold -= token_amount
-
-        return {
-            "usdc_out": usdc_out,
-            "price_received": usdc_out / token_amount if token_amount > 0 else 0,
-            "curve_price_after": self.curve_price,
-        }
-
-    def receive_revenue(self, amount: float, operator_bps: int = 6000,
-                        curve_bps: int = 3000, protocol_bps: int = 1000) -> dict:
-        operator_cut = amount * operator_bps / 10000
-        curve_cut = amount * curve_bps / 10000
-        protocol_cut = amount * protocol_bps / 10000
-
-        self.total_revenue += amount
-
-        # Add revenue to BOTH sides of the curve to maintain price
-        # but increase k (add liquidity)
-        # Actually: adding just USDC shifts price up. That IS the mechanism.
-        price_before = self.curve_price
-        self.virtual_usdc_reserve += curve_cut
-        self.real_usdc_reserve += curve_cut
-        self.revenue_added_to_reserve += curve_cut
-        # k changes: new_k = virtual_token * new_virtual_usdc
-        # This means price goes up but the curve also gets deeper
-        price_after = self.curve_price
-
-        return {
-            "operator": operator_cut,
-            "to_curve": curve_cut,
-            "protocol": protocol_cut,
-            "price_before": price_before,
-            "price_after": price_after,
-            "price_increase_pct": (price_after - price_before) / price_before * 100,
-        }
-
-
-# ============================================================
-# OPTION C: BUYBACK AND BURN (baseline from existing spec)
-# ============================================================
-
-@dataclass
-class BondingCurveBuybackBurn:
-    """
-    Revenue buys tokens on the bonding curve and burns them.
-    No floor, no separate pool. Pure supply reduction.
-    """
-    virtual_token_reserve: float = 1_073_000_000.0
-    virtual_usdc_reserve: float = 30_000.0
-    real_token_reserve: float = 800_000_000.0
-    real_usdc_reserve: float = 0.0
-
-    total_supply: float = 1_000_000_000.0
-    tokens_sold: float = 0.0
-    tokens_burned: float = 0.0
-    operator_tokens: float = 200_000_000.0
-    total_revenue: float = 0.0
-    total_buyback_usdc: float = 0.0
-
-    @property
-    def k(self) -> float:
-        return self.virtual_token_reserve * self.virtual_usdc_reserve
-
-    @property
-    def curve_price(self) -> float:
-        return self.virtual_usdc_reserve / self.virtual_token_reserve
-
-    @property
-    def circulating_supply(self) -> float:
-        return self.tokens_sold + self.operator_tokens - self.tokens_burned
-
-    def buy(self, usdc_amount: float) -> dict:
-        new_virtual_usdc = self.virtual_usdc_reserve + usdc_amount
-        new_virtual_token = self.k / new_virtual_usdc
-        tokens_out = self.virtual_token_reserve - new_virtual_token
-
-        if tokens_out > self.real_token_reserve:
-            tokens_out = self.real_token_reserve
-
-        self.virtual_usdc_reserve = new_virtual_usdc
-        self.virtual_token_reserve = new_virtual_token
-        self.real_usdc_reserve += usdc_amount
-        self.real_token_reserve -= tokens_out
-        self.tokens_sold += tokens_out
-
-        return {
-            "tokens_out": tokens_out,
-            "price_paid": usdc_amount / tokens_out if tokens_out > 0 else 0,
-            "curve_price_after": self.curve_price,
-        }
-
-    def sell(self, token_amount: float) -> dict:
-        new_virtual_token = self.virtual_token_reserve + token_amount
-        new_virtual_usdc = self.k / new_virtual_token
-        usdc_out = self.virtual_usdc_reserve - new_virtual_usdc
-
-        if usdc_out > self.real_usdc_reserve:
-            usdc_out = self.real_usdc_reserve
-
-        self.virtual_token_reserve = new_virtual_token
-        self.virtual_usdc_reserve = new_virtual_usdc
-        self.real_usdc_reserve -= usdc_out
-        self.real_token_reserve += token_amount
-        self.tokens_sold -= token_amount
-
-        return {
-            "usdc_out": usdc_out,
-            "price_received": usdc_out / token_amount if token_amount > 0 else 0,
-            "curve_price_after": self.curve_price,
-        }
-
-    def execute_buyback(self, usdc_amount: float) -> dict:
-        """Buy tokens on the curve and burn them."""
-        price_before = self.curve_price
-
-        new_virtual_usdc = self.virtual_usdc_reserve + usdc_amount
-        new_virtual_token = self.k / new_virtual_usdc
-        tokens_bought = self.virtual_token_reserve - new_virtual_token
-
-        self.virtual_usdc_reserve = new_virtual_usdc
-        self.virtual_token_reserve = new_virtual_token
-        self.real_usdc_reserve += usdc_amount
-        # Tokens are bought then burned -- they don't go to real_token_reserve
-        # They come from the virtual reserve (buying pushes virtual_token down)
-        # Then we burn them, which means they never re-enter circulation
-        self.tokens_burned += tokens_bought
-        self.total_buyback_usdc += usdc_amount
-
-        return {
-            "tokens_bought": tokens_bought,
-            "tokens_burned_total": self.tokens_burned,
-            "price_before": price_before,
-            "price_after": self.curve_price,
-            "circulating_supply": self.circulating_supply,
-        }
-
-    def receive_revenue(self, amount: float, operator_bps: int = 6000,
-                        buyback_bps: int = 3000, protocol_bps: int = 1000) -> dict:
-        operator_cut = amount * operator_bps / 10000
-        buyback_cut = amount * buyback_bps / 10000
-        protocol_cut = amount * protocol_bps / 10000
-
-        self.total_revenue += amount
-
-        # Execute buyback immediately
-        bb_result = self.execute_buyback(buyback_cut)
-
-        return {
-            "operator": operator_cut,
-            "buyback": buyback_cut,
-            "protocol": protocol_cut,
-            **bb_result,
-        }
+from bonding_curves import (BondingCurveBuybackBurn, BondingCurveFloorA, BondingCurveFloorAFixed,
+                            BondingCurveFloorB)
+from registry import EconomicModel
 
 
 # ============================================================
@@ -665,124 +275,6 @@ def sim_floor_with_buy_adjustment():
     print("OPTION A-FIX: BUYERS PAY INTO REVENUE POOL FOR FLOOR")
     print("=" * 90)
 
-    class BondingCurveFloorAFixed:
-        def __init__(self):
-            self.virtual_token_reserve = 1_073_000_000.0
-            self.virtual_usdc_reserve = 30_000.0
-            self.real_token_reserve = 800_000_000.0
-            self.real_usdc_reserve = 0.0
-            self.revenue_pool = 0.0
-            self.cumulative_revenue_per_share = 0.0
-            self.tokens_sold = 0.0
-            self.operator_tokens = 200_000_000.0
-            self.total_revenue = 0.0
-
-        @property
-        def k(self):
-            return self.virtual_token_reserve * self.virtual_usdc_reserve
-
-        @property
-        def curve_price(self):
-            return self.virtual_usdc_reserve / self.virtual_token_reserve
-
-        @property
-        def effective_price(self):
-            return self.curve_price + self.cumulative_revenue_per_share
-
-        @property
-        def circulating(self):
-            return self.tokens_sold + self.operator_tokens
-
-        def buy(self, usdc_amount):
-            # First figure out how many tokens the curve would give
-            # Then check if buyer can also cover the floor for those tokens
-            # Iterative: tokens_out depends on curve_usdc, but floor_cost depends on tokens_out
-
-            # Approximate: split usdc_amount into curve and floor portions
-            # curve_portion buys tokens, floor_portion = tokens_out * floor
-            # usdc_amount = curve_portion + tokens_out * floor
-            # tokens_out = f(curve_portion) from constant product
-            # This requires solving: usdc_amount = cp + (vtr - k/(vur+cp)) * floor
-            # where vtr = virtual_token_reserve, vur = virtual_usdc_reserve
-
-            # Binary search for simplicity
-            floor = self.cumulative_revenue_per_share
-            lo, hi = 0.0, usdc_amount
-
-            for _ in range(50):
-                mid = (lo + hi) / 2
-                curve_usdc = mid
-                new_vusdc = self.virtual_usdc_reserve + curve_usdc
-                new_vtoken = self.k / new_vusdc
-                tokens = self.virtual_token_reserve - new_vtoken
-                total_cost = curve_usdc + tokens * floor
-                if total_cost < usdc_amount:
-                    lo = mid
-                else:
-                    hi = mid
-
-            curve_usdc = (lo + hi) / 2
-            floor_usdc = usdc_amount - curve_usdc
-
-            new_vusdc = self.virtual_usdc_reserve + curve_usdc
-            new_vtoken = self.k / new_vusdc
-            tokens_out = self.virtual_token_reserve - new_vtoken
-
-            self.virtual_usdc_reserve = new_vusdc
-            self.virtual_token_reserve = new_vtoken
-            self.real_usdc_reserve += curve_usdc
-            self.revenue_pool += floor_usdc
-            self.real_token_reserve -= tokens_out
-            self.tokens_sold += tokens_out
-
-            return {
-                "tokens_out": tokens_out,
-                "curve_usdc": curve_usdc,
-                "floor_usdc": floor_usdc,
-                "effective_price": usdc_amount / tokens_out if tokens_out > 0 else 0,
-                "curve_price_after": self.curve_price,
-            }
-
-        def sell(self, token_amount):
-            new_vtoken = self.virtual_token_reserve + token_amount
-            new_vusdc = self.k / new_vtoken
-            curve_out = self.virtual_usdc_reserve - new_vusdc
-            floor_out = token_amount * self.cumulative_revenue_per_share
-
-            if curve_out > self.real_usdc_reserve:
-                curve_out = self.real_usdc_reserve
-            if floor_out > self.revenue_pool:
-                floor_out = self.revenue_pool
-
-            self.virtual_token_reserve = new_vtoken
-            self.virtual_usdc_reserve = new_vusdc
-            self.real_usdc_reserve -= curve_out
-            self.revenue_pool -= floor_out
-            self.real_token_reserve += token_amount
-            self.tokens_sold -= token_amount
-
-            return {
-                "usdc_out": curve_out + floor_out,
-                "curve_component": curve_out,
-                "floor_component": floor_out,
-            }
-
-        def receive_revenue(self, amount, operator_bps=6000, floor_bps=3000, protocol_bps=1000):
-            floor_cut = amount * floor_bps / 10000
-            self.total_revenue += amount
-            self.revenue_pool += floor_cut
-            if self.circulating > 0:
-                self.cumulative_revenue_per_share += floor_cut / self.circulating
-            return {"floor_cut": floor_cut}
-
-        def solvency(self):
-            liability = self.tokens_sold * self.cumulative_revenue_per_share
-            return {
-                "pool": self.revenue_pool,
-                "liability": liability,
-                "solvent": self.revenue_pool >= liability - 0.01,
-            }
-
     c = BondingCurveFloorAFixed()
 
     # Phase 1: Initial buys (floor = 0, so no floor payment)
@@ -869,16 +361,14 @@ def sim_comparison_6month():
     # Now simulate: all holders sell
     print(f"\n--- If all holders sell ---")
 
+    a_snap, c_snap = a.snapshot(), c.snapshot()
     for name in ["Alice", "Bob", "Charlie"]:
-        # Option A
-        a_temp = BondingCurveFloorA()
-        a_temp.__dict__.update({k: v for k, v in a.__dict__.items()})
-        r_a = a_temp.sell(a_tokens[name])
+        # Each holder sells alone from the same post-revenue state
+        r_a = a.sell(a_tokens[name])
+        a.restore(a_snap)
 
-        # Option C
-        c_temp = BondingCurveBuybackBurn()
-        c_temp.__dict__.update({k: v for k, v in c.__dict__.items()})
-        r_c = c_temp.sell(c_tokens[name])
+        r_c = c.sell(c_tokens[name])
+        c.restore(c_snap)
 
         cost = {"Alice": 500, "Bob": 1000, "Charlie": 2000}[name]
 
@@ -895,7 +385,8 @@ def sim_comparison_6month():
     print(f"  Option C holders could get near-zero if panic selling cascades.")
 
 
-def sim_worst_case_buyer():
+def sim_worst_case_buyer(models=(("Option A (Floor)", BondingCurveFloorA),
+                                 ("Option C (Buyback)", BondingCurveBuybackBurn))):
     """What's the absolute worst case for a buyer in each model?"""
     print("\n" + "=" * 90)
     print("WORST CASE ANALYSIS: What's the most you can lose?")
@@ -904,49 +395,35 @@ def sim_worst_case_buyer():
     # Worst case: buy at the top, revenue drops to zero, everyone sells before you
     print("\nScenario: Buy $1000 after hype. Agent earns a little. Then revenue = 0. Panic sell.")
 
-    for label, Model in [("Option A (Floor)", BondingCurveFloorA),
-                          ("Option C (Buyback)", BondingCurveBuybackBurn)]:
-        m = Model()
+    for label, Model in models:
+        m: EconomicModel = Model()
 
         # Hype phase: lots of buying
         for _ in range(10):
             m.buy(500)
 
         # Some revenue
-        if hasattr(m, 'cumulative_revenue_per_share'):
-            m.receive_revenue(2000)
-        else:
-            m.receive_revenue(2000)
+        m.receive_revenue(2000)
 
         # Our buyer enters
-        if label.startswith("Option A"):
-            r = m.buy(1000)
-            my_tokens = r["tokens_out"]
-
-            # Everyone else panic sells before us
-            other_tokens = m.tokens_sold - my_tokens
-            m.sell(other_tokens * 0.9)  # 90% of other holders sell
-
-            # We sell last
-            r = m.sell(my_tokens)
-            print(f"\n  {label}:")
-            print(f"    Bought: {my_tokens:,.0f} tokens for $1000")
-            print(f"    After panic: sold for ${r['usdc_out']:.2f}")
+        r = m.buy(1000)
+        my_tokens = r["tokens_out"]
+
+        # Everyone else panic sells before us
+        other_tokens = m.metrics()["supply"] - my_tokens
+        m.sell(other_tokens * 0.9)  # 90% of other holders sell
+
+        # We sell last
+        r = m.sell(my_tokens)
+        print(f"\n  {label}:")
+        print(f"    Bought: {my_tokens:,.0f} tokens for $1000")
+        print(f"    After panic: sold for ${r['usdc_out']:.2f}")
+        if "floor_component" in r:
             print(f"      Curve: ${r['curve_component']:.2f}, Floor: ${r['floor_component']:.2f}")
-            print(f"    Loss: ${1000 - r['usdc_out']:.2f} ({(r['usdc_out']/1000 - 1)*100:+.1f}%)")
+        print(f"    Loss: ${1000 - r['usdc_out']:.2f} ({(r['usdc_out']/1000 - 1)*100:+.1f}%)")
+        if "floor_component" in r:
             print(f"    Floor guarantee protected: ${r['floor_component']:.2f}")
         else:
-            r = m.buy(1000)
-            my_tokens = r["tokens_out"]
-
-            other_tokens = m.tokens_sold - my_tokens
-            m.sell(other_tokens * 0.9)
-
-            r = m.sell(my_tokens)
-            print(f"\n  {label}:")
-            print(f"    Bought: {my_tokens:,.0f} tokens for $1000")
-            print(f"    After panic: sold for ${r['usdc_out']:.2f}")
-            print(f"    Loss: ${1000 - r['usdc_out']:.2f} ({(r['usdc_out']/1000 - 1)*100:+.1f}%)")
             print(f"    No floor protection.")
 
 
@@ -0,0 +1,774 @@
+"""
+Bonding Curve Models
+
+The three revenue-backed bonding-curve designs compared in
+bonding-curve-sim.py, built on the shared constant-product kernel in
+curve_kernel.py:
+  Option A: Separate revenue pool (floor paid from segregated reserve)
+  Option A-Fix: Option A where buyers also pay into the pool for the floor
+  Option B: Revenue shifts the curve up (adds to virtual USDC reserve)
+  Option B-Ratchet: Option B where sells cannot pull the curve below its
+    revenue-raised minimum (partial fills)
+  Option C: Revenue buys and burns (existing spec, baseline comparison)
+
+Each model has scalar buy/sell that return a result dict (used by the
+narrated scenarios) and buy_batch/sell_batch that apply an array of trades
+back to back and return one dict of arrays. `replay` drives any model over a
+mixed buy/sell stream.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from curve_kernel import (buy_sequence, clamp_cumulative, cp_buy, cp_sell, floor_buy_cap, floor_buy_sequence,
+                          floor_split, sell_sequence, trade_runs)
+from event_log import KIND_CODES, EventRecorder, recorded
+from invariants import BOUND, NONDECREASING, Invariant, checked
+from snapshot import snapshottable
+
+
+# ============================================================
+# OPTION A: SEPARATE REVENUE POOL
+# ============================================================
+
+@snapshottable
+@dataclass(slots=True, weakref_slot=True)
+class BondingCurveFloorA:
+    """
+    Two pools:
+      1. Curve reserve: backs the speculative component (constant product)
+      2. Revenue pool: backs the floor (monotonically increasing per-share)
+
+    effective_price = curve_price(supply) + revenue_floor_per_share
+
+    On buy: buyer pays effective_price, curve reserve gets curve portion,
+            revenue pool is unchanged
+    On sell: seller gets curve_price(new_supply) + revenue_floor_per_share
+             curve reserve pays curve portion, revenue pool pays floor portion
+    On revenue: Y% goes to revenue pool, divided by outstanding shares
+    """
+    virtual_token_reserve: float = 1_073_000_000.0
+    virtual_usdc_reserve: float = 30_000.0
+    real_token_reserve: float = 800_000_000.0
+    real_usdc_reserve: float = 0.0  # actual USDC in curve reserve
+
+    revenue_pool: float = 0.0  # USDC backing the floor
+    cumulative_revenue_per_share: float = 0.0  # the ratchet
+
+    total_supply: float = 1_000_000_000.0
+    tokens_sold: float = 0.0  # tokens currently in circulation (bought on curve)
+    operator_tokens: float = 200_000_000.0  # vested to operator
+
+    total_revenue: float = 0.0
+    recorder: Optional[EventRecorder] = field(default=None, repr=False, compare=False)
+    recorder_id: int = field(default=0, repr=False, compare=False)
+
+    INVARIANTS = (
+        # floor liability must stay backed by the revenue pool (0.01 rounding tolerance)
+        Invariant("floor_backed", lambda c: c.tokens_sold * c.cumulative_revenue_per_share - c.revenue_pool,
+                  BOUND, tol=0.01),
+    )
+
+    @property
+    def k(self) -> float:
+        return self.virtual_token_reserve * self.virtual_usdc_reserve
+
+    @property
+    def curve_price(self) -> float:
+        return self.virtual_usdc_reserve / self.virtual_token_reserve
+
+    @property
+    def effective_price(self) -> float:
+        return self.curve_price + self.cumulative_revenue_per_share
+
+    @property
+    def circulating_supply(self) -> float:
+        return self.tokens_sold + self.operator_tokens
+
+    def observe(self) -> tuple:
+        return (self.virtual_usdc_reserve / self.virtual_token_reserve,
+                self.real_usdc_reserve + self.revenue_pool, self.tokens_sold)
+
+    def metrics(self) -> dict:
+        return {"price": self.curve_price, "floor": self.cumulative_revenue_per_share,
+                "supply": self.tokens_sold, "reserve": self.real_usdc_reserve + self.revenue_pool,
+                "revenue": self.total_revenue}
+
+    @checked
+    @recorded("buy", "tokens_out")
+    def buy(self, usdc_amount: float) -> dict:
+        # How many tokens does the curve give for this USDC?
+        # First subtract the floor component we need to set aside
+        # Actually: buyer pays effective_price which includes floor
+        # But tokens come off the bonding curve at curve_price
+        # The floor portion of the payment goes... nowhere? It's already backed.
+        #
+        # Wait -- this is the tricky part.
+        # If effective_price = curve_price + floor, and buyer pays effective_price,
+        # then the extra (floor portion) needs to go somewhere.
+        #
+        # Option: All USDC goes to curve reserve. The floor is backed by the
+        # revenue pool which is separately funded by revenue events.
+        # Buyer just pays curve_price (the floor is a guarantee, not a surcharge).
+        #
+        # Actually re-reading the spec: buyer pays on the bonding curve normally.
+        # The floor is just a minimum sell price. It doesn't affect buy price.
+        # Revenue builds up the floor. When you sell, you get max(curve_sell_price, floor).
+        # Or: curve_sell_price + floor.
+        #
+        # Let's model: buy at curve price, sell at curve_price + floor.
+        # Revenue pool must have enough to cover floor * circulating_supply.
+
+        tokens_out, new_virtual_token, new_virtual_usdc = cp_buy(
+            self.virtual_token_reserve, self.virtual_usdc_reserve, usdc_amount)
+
+        if tokens_out > self.real_token_reserve:
+            tokens_out = self.real_token_reserve
+
+        self.virtual_usdc_reserve = new_virtual_usdc
+        self.virtual_token_reserve = new_virtual_token
+        self.real_usdc_reserve += usdc_amount
+        self.real_token_reserve -= tokens_out
+        self.tokens_sold += tokens_out
+
+        curve_price = new_virtual_usdc / new_virtual_token
+        return {
+            "tokens_out": tokens_out,
+            "price_paid": usdc_amount / tokens_out if tokens_out > 0 else 0,
+            "curve_price_after": curve_price,
+            "effective_price_after": curve_price + self.cumulative_revenue_per_share,
+        }
+
+    @checked
+    @recorded("sell", "usdc_out")
+    def sell(self, token_amount: float) -> dict:
+        # Curve component
+        curve_usdc_out, new_virtual_token, new_virtual_usdc = cp_sell(
+            self.virtual_token_reserve, self.virtual_usdc_reserve, token_amount)
+
+        # Floor component
+        floor_usdc_out = token_amount * self.cumulative_revenue_per_share
+
+        # Check solvency
+        if curve_usdc_out > self.real_usdc_reserve:
+            curve_usdc_out = self.real_usdc_reserve
+        if floor_usdc_out > self.revenue_pool:
+            floor_usdc_out = self.revenue_pool
+        total_usdc_out = curve_usdc_out + floor_usdc_out
+
+        self.virtual_token_reserve = new_virtual_token
+        self.virtual_usdc_reserve = new_virtual_usdc
+        self.real_usdc_reserve -= curve_usdc_out
+        self.revenue_pool -= floor_usdc_out
+        self.real_token_reserve += token_amount
+        self.tokens_sold -= token_amount
+
+        curve_price = new_virtual_usdc / new_virtual_token
+        return {
+            "usdc_out": total_usdc_out,
+            "curve_component": curve_usdc_out,
+            "floor_component": floor_usdc_out,
+            "price_received": total_usdc_out / token_amount if token_amount > 0 else 0,
+            "curve_price_after": curve_price,
+            "effective_price_after": curve_price + self.cumulative_revenue_per_share,
+        }
+
+    @checked
+    def buy_batch(self, usdc: np.ndarray) -> dict:
+        return _curve_buy_batch(self, usdc)
+
+    @checked
+    def sell_batch(self, tokens: np.ndarray) -> dict:
+        floor_raw = np.asarray(tokens, dtype=np.float64) * self.cumulative_revenue_per_share
+        floor = clamp_cumulative(floor_raw, np.cumsum(floor_raw), self.revenue_pool)
+        return _curve_sell_batch(self, tokens, floor)
+
+    @checked
+    @recorded("revenue", "floor")
+    def receive_revenue(self, amount: float, operator_bps: int = 6000,
+                        floor_bps: int = 3000, protocol_bps: int = 1000) -> dict:
+        operator_cut = amount * operator_bps / 10000
+        floor_cut = amount * floor_bps / 10000
+        protocol_cut = amount * protocol_bps / 10000
+
+        self.total_revenue += amount
+        self.revenue_pool += floor_cut
+
+        # Update floor per share (ratchet -- only increases)
+        if self.circulating_supply > 0:
+            increment = floor_cut / self.circulating_supply
+            self.cumulative_revenue_per_share += increment
+
+        return {
+            "operator": operator_cut,
+            "floor": floor_cut,
+            "protocol": protocol_cut,
+            "new_floor_per_share": self.cumulative_revenue_per_share,
+            "revenue_pool_balance": self.revenue_pool,
+        }
+
+    def check_solvency(self) -> dict:
+        floor_liability = self.tokens_sold * self.cumulative_revenue_per_share
+        floor_backed = self.revenue_pool >= floor_liability - 0.01  # rounding tolerance
+        return {
+            "floor_liability": floor_liability,
+            "revenue_pool": self.revenue_pool,
+            "floor_fully_backed": floor_backed,
+            "curve_reserve": self.real_usdc_reserve,
+        }
+
+
+# ============================================================
+# OPTION A-FIX: BUYERS PAY INTO REVENUE POOL FOR FLOOR
+# ============================================================
+
+@snapshottable
+@dataclass(slots=True, weakref_slot=True)
+class BondingCurveFloorAFixed(BondingCurveFloorA):
+    """
+    Option A with the new-buyer dilution fixed: a buyer pays the curve for
+    their tokens and also deposits tokens_out * floor into the revenue pool,
+    so the floor liability stays backed as supply grows.
+
+    effective_buy_price = curve_price + cumulative_revenue_per_share
+    Sells and revenue behave exactly as in Option A.
+    """
+
+    @checked
+    @recorded("buy", "tokens_out")
+    def buy(self, usdc_amount: float) -> dict:
+        # past the real reserve only the remaining tokens fill; the rest is handed back
+        paid = min(usdc_amount, floor_buy_cap(self.virtual_token_reserve, self.virtual_usdc_reserve,
+                                              self.real_token_reserve, self.cumulative_revenue_per_share))
+        curve_usdc = floor_split(self.virtual_token_reserve, self.virtual_usdc_reserve,
+                                 self.cumulative_revenue_per_share, paid)
+        floor_usdc = paid - curve_usdc
+
+        tokens_out, new_vtoken, new_vusdc = cp_buy(
+            self.virtual_token_reserve, self.virtual_usdc_reserve, curve_usdc)
+        tokens_out = min(tokens_out, self.real_token_reserve)
+
+        self.virtual_usdc_reserve = new_vusdc
+        self.virtual_token_reserve = new_vtoken
+        self.real_usdc_reserve += curve_usdc
+        self.revenue_pool += floor_usdc
+        self.real_token_reserve -= tokens_out
+        self.tokens_sold += tokens_out
+
+        return {
+            "tokens_out": tokens_out,
+            "curve_usdc": curve_usdc,
+            "floor_usdc": floor_usdc,
+            "usdc_unfilled": usdc_amount - paid,
+            "effective_price": paid / tokens_out if tokens_out > 0 else 0,
+            "curve_price_after": new_vusdc / new_vtoken,
+        }
+
+    @checked
+    def buy_batch(self, usdc: np.ndarray) -> dict:
+        usdc = np.asarray(usdc, dtype=np.float64)
+        pre = self.observe()
+        f = floor_buy_sequence(self.virtual_token_reserve, self.virtual_usdc_reserve,
+                               self.real_token_reserve, self.cumulative_revenue_per_share, usdc)
+        paid = np.diff(np.minimum(np.cumsum(usdc), floor_buy_cap(
+            self.virtual_token_reserve, self.virtual_usdc_reserve, self.real_token_reserve,
+            self.cumulative_revenue_per_share)), prepend=0.0)
+        floor_usdc = paid - f.usdc
+        if f.tokens.size:
+            self.virtual_token_reserve = float(f.virtual_token_reserve[-1])
+            self.virtual_usdc_reserve = float(f.virtual_usdc_reserve[-1])
+            self.real_token_reserve = float(f.real_reserve[-1])
+            self.real_usdc_reserve += float(f.usdc.sum())
+            self.revenue_pool += float(floor_usdc.sum())
+            self.tokens_sold += float(f.tokens.sum())
+        _record_fills(self, "buy", pre, usdc, f.tokens, f, paid, f.tokens)
+        return {
+            "tokens_out": f.tokens,
+            "usdc_in": paid,
+            "curve_usdc": f.usdc,
+            "floor_usdc": floor_usdc,
+            "usdc_unfilled": usdc - paid,
+            "virtual_token_reserve": f.virtual_token_reserve,
+            "virtual_usdc_reserve": f.virtual_usdc_reserve,
+        }
+
+    def solvency(self) -> dict:
+        liability = self.tokens_sold * self.cumulative_revenue_per_share
+        return {
+            "pool": self.revenue_pool,
+            "liability": liability,
+            "solvent": self.revenue_pool >= liability - 0.01,
+        }
+
+
+# ============================================================
+# OPTION B: REVENUE SHIFTS THE CURVE
+# ============================================================
+
+@snapshottable
+@dataclass(slots=True, weakref_slot=True)
+class BondingCurveFloorB:
+    """
+    Revenue goes directly into the bonding curve's virtual USDC reserve.
+    This shifts the entire curve upward. No separate floor.
+    The "floor" is implicit: the curve price can never go below the
+    amount that revenue has added.
+
+    Problem: if someone sells, they pull USDC out of the curve,
+    which DOES lower the price below the revenue-added amount.
+    So this doesn't actually create a ratchet.
+
+    Unless: we track a minimum_virtual_usdc that can never decrease.
+    Revenue adds to it. Sells can only pull the curve down to that minimum.
+    """
+    virtual_token_reserve: float = 1_073_000_000.0
+    virtual_usdc_reserve: float = 30_000.0
+    real_token_reserve: float = 800_000_000.0
+    real_usdc_reserve: float = 0.0
+
+    revenue_added_to_reserve: float = 0.0  # tracks how much revenue has shifted curve
+
+    total_supply: float = 1_000_000_000.0
+    tokens_sold: float = 0.0
+    operator_tokens: float = 200_000_000.0
+    total_revenue: float = 0.0
+    recorder: Optional[EventRecorder] = field(default=None, repr=False, compare=False)
+    recorder_id: int = field(default=0, repr=False, compare=False)
+
+    INVARIANTS = (
+        # trades keep k (up to float rounding), revenue only ever deepens the curve
+        Invariant("k_monotone", lambda c: c.virtual_token_reserve * c.virtual_usdc_reserve,
+                  NONDECREASING, rel_tol=1e-12),
+    )
+
+    @property
+    def k(self) -> float:
+        return self.virtual_token_reserve * self.virtual_usdc_reserve
+
+    @property
+    def curve_price(self) -> float:
+        return self.virtual_usdc_reserve / self.virtual_token_reserve
+
+    def observe(self) -> tuple:
+        return (self.virtual_usdc_reserve / self.virtual_token_reserve,
+                self.real_usdc_reserve, self.tokens_sold)
+
+    def metrics(self) -> dict:
+        return {"price": self.curve_price, "floor": 0.0, "supply": self.tokens_sold,
+                "reserve": self.real_usdc_reserve, "revenue": self.total_revenue}
+
+    @checked
+    @recorded("buy", "tokens_out")
+    def buy(self, usdc_amount: float) -> dict:
+        tokens_out, new_virtual_token, new_virtual_usdc = cp_buy(
+            self.virtual_token_reserve, self.virtual_usdc_reserve, usdc_amount)
+
+        if tokens_out > self.real_token_reserve:
+            tokens_out = self.real_token_reserve
+
+        self.virtual_usdc_reserve = new_virtual_usdc
+        self.virtual_token_reserve = new_virtual_token
+        self.real_usdc_reserve += usdc_amount
+        self.real_token_reserve -= tokens_out
+        self.tokens_sold += tokens_out
+
+        # In constant product, k stays constant during trades.
+        # It only changes when revenue is added (liquidity injection).
+
+        return {
+            "tokens_out": tokens_out,
+            "price_paid": usdc_amount / tokens_out if tokens_out > 0 else 0,
+            "curve_price_after": new_virtual_usdc / new_virtual_token,
+        }
+
+    @checked
+    @recorded("sell", "usdc_out")
+    def sell(self, token_amount: float) -> dict:
+        usdc_out, new_virtual_token, new_virtual_usdc = cp_sell(
+            self.virtual_token_reserve, self.virtual_usdc_reserve, token_amount)
+
+        if usdc_out > self.real_usdc_reserve:
+            usdc_out = self.real_usdc_reserve
+
+        self.virtual_token_reserve = new_virtual_token
+        self.virtual_usdc_reserve = new_virtual_usdc
+        self.real_usdc_reserve -= usdc_out
+        self.real_token_reserve += token_amount
+        self.tokens_sold -= token_amount
+
+        return {
+            "usdc_out": usdc_out,
+            "price_received": usdc_out / token_amount if token_amount > 0 else 0,
+            "curve_price_after": new_virtual_usdc / new_virtual_token,
+        }
+
+    @checked
+    def buy_batch(self, usdc: np.ndarray) -> dict:
+        return _curve_buy_batch(self, usdc)
+
+    @checked
+    def sell_batch(self, tokens: np.ndarray) -> dict:
+        return _curve_sell_batch(self, tokens)
+
+    @checked
+    @recorded("revenue", "to_curve")
+    def receive_revenue(self, amount: float, operator_bps: int = 6000,
+                        curve_bps: int = 3000, protocol_bps: int = 1000) -> dict:
+        operator_cut = amount * operator_bps / 10000
+        curve_cut = amount * curve_bps / 10000
+        protocol_cut = amount * protocol_bps / 10000
+
+        self.total_revenue += amount
+
+        # Add revenue to BOTH sides of the curve to maintain price
+        # but increase k (add liquidity)
+        # Actually: adding just USDC shifts price up. That IS the mechanism.
+        price_before = self.curve_price
+        self.virtual_usdc_reserve += curve_cut
+        self.real_usdc_reserve += curve_cut
+        self.revenue_added_to_reserve += curve_cut
+        # k changes: new_k = virtual_token * new_virtual_usdc
+        # This means price goes up but the curve also gets deeper
+        price_after = self.curve_price
+
+        return {
+            "operator": operator_cut,
+            "to_curve": curve_cut,
+            "protocol": protocol_cut,
+            "price_before": price_before,
+            "price_after": price_after,
+            "price_increase_pct": (price_after - price_before) / price_before * 100,
+        }
+
+
+# ============================================================
+# OPTION B-RATCHET: SELLS CLAMPED AT THE REVENUE-RAISED MINIMUM
+# ============================================================
+
+@snapshottable
+@dataclass(slots=True, weakref_slot=True)
+class BondingCurveFloorBRatchet(BondingCurveFloorB):
+    """
+    Option B with the ratchet the docstring above asks for:
+      minimum_virtual_usdc = base_virtual_usdc + revenue_added_to_reserve
+    only ever grows, and a sell may pull virtual_usdc_reserve down to it but
+    no further. The most tokens a sell can place is k / minimum - vtr; any
+    excess is a partial fill and is returned to the seller (tokens_unfilled).
+    Buys and revenue behave exactly as in Option B.
+    """
+    base_virtual_usdc: Optional[float] = None  # the curve's starting virtual USDC (default: virtual_usdc_reserve)
+
+    INVARIANTS = BondingCurveFloorB.INVARIANTS + (
+        Invariant("ratchet_holds", lambda c: (c.minimum_virtual_usdc - c.virtual_usdc_reserve)
+                  / c.minimum_virtual_usdc, BOUND, tol=1e-12),
+    )
+
+    def __post_init__(self):
+        if self.base_virtual_usdc is None:
+            self.base_virtual_usdc = self.virtual_usdc_reserve
+
+    @property
+    def minimum_virtual_usdc(self) -> float:
+        return self.base_virtual_usdc + self.revenue_added_to_reserve
+
+    @property
+    def floor_price(self) -> float:
+        """Lowest curve price sells can reach: minimum^2 / k."""
+        return self.minimum_virtual_usdc ** 2 / self.k
+
+    def metrics(self) -> dict:
+        return {**BondingCurveFloorB.metrics(self), "floor": self.floor_price}
+
+    def max_sell(self) -> float:
+        """Tokens a sell can place before the curve hits the minimum."""
+        return max(0.0, self.k / self.minimum_virtual_usdc - self.virtual_token_reserve)
+
+    @checked
+    @recorded("sell", "usdc_out")
+    def sell(self, token_amount: float) -> dict:
+        filled = min(token_amount, self.max_sell())
+        usdc_out, new_virtual_token, new_virtual_usdc = cp_sell(
+            self.virtual_token_reserve, self.virtual_usdc_reserve, filled)
+
+        if usdc_out > self.real_usdc_reserve:
+            usdc_out = self.real_usdc_reserve
+
+        self.virtual_token_reserve = new_virtual_token
+        self.virtual_usdc_reserve = new_virtual_usdc
+        self.real_usdc_reserve -= usdc_out
+        self.real_token_reserve += filled
+        self.tokens_sold -= filled
+
+        return {
+            "usdc_out": usdc_out,
+            "tokens_filled": filled,
+            "tokens_unfilled": token_amount - filled,
+            "price_received": usdc_out / filled if filled > 0 else 0,
+            "curve_price_after": new_virtual_usdc / new_virtual_token,
+        }
+
+    @checked
+    def sell_batch(self, tokens: np.ndarray) -> dict:
+        """Back-to-back sells; once the minimum is reached later sells fill nothing."""
+        tokens = np.asarray(tokens, dtype=np.float64)
+        filled = clamp_cumulative(tokens, np.cumsum(tokens), self.max_sell())
+        r = _curve_sell_batch(self, filled)
+        r["tokens_unfilled"] = tokens - filled
+        return r
+
+
+# ============================================================
+# OPTION C: BUYBACK AND BURN (baseline from existing spec)
+# ============================================================
+
+@snapshottable
+@dataclass(slots=True, weakref_slot=True)
+class BondingCurveBuybackBurn:
+    """
+    Revenue buys tokens on the bonding curve and burns them.
+    No floor, no separate pool. Pure supply reduction.
+    """
+    virtual_token_reserve: float = 1_073_000_000.0
+    virtual_usdc_reserve: float = 30_000.0
+    real_token_reserve: float = 800_000_000.0
+    real_usdc_reserve: float = 0.0
+
+    total_supply: float = 1_000_000_000.0
+    tokens_sold: float = 0.0
+    tokens_burned: float = 0.0
+    operator_tokens: float = 200_000_000.0
+    total_revenue: float = 0.0
+    total_buyback_usdc: float = 0.0
+    recorder: Optional[EventRecorder] = field(default=None, repr=False, compare=False)
+    recorder_id: int = field(default=0, repr=False, compare=False)
+
+    @property
+    def k(self) -> float:
+        return self.virtual_token_reserve * self.virtual_usdc_reserve
+
+    @property
+    def curve_price(self) -> float:
+        return self.virtual_usdc_reserve / self.virtual_token_reserve
+
+    @property
+    def circulating_supply(self) -> float:
+        return self.tokens_sold + self.operator_tokens - self.tokens_burned
+
+    def observe(self) -> tuple:
+        return (self.virtual_usdc_reserve / self.virtual_token_reserve,
+                self.real_usdc_reserve, self.tokens_sold)
+
+    def metrics(self) -> dict:
+        return {"price": self.curve_price, "floor": 0.0, "supply": self.tokens_sold,
+                "reserve": self.real_usdc_reserve, "revenue": self.total_revenue}
+
+    @checked
+    @recorded("buy", "tokens_out")
+    def buy(self, usdc_amount: float) -> dict:
+        tokens_out, new_virtual_token, new_virtual_usdc = cp_buy(
+            self.virtual_token_reserve, self.virtual_usdc_reserve, usdc_amount)
+
+        if tokens_out > self.real_token_reserve:
+            tokens_out = self.real_token_reserve
+
+        self.virtual_usdc_reserve = new_virtual_usdc
+        self.virtual_token_reserve = new_virtual_token
+        self.real_usdc_reserve += usdc_amount
+        self.real_token_reserve -= tokens_out
+        self.tokens_sold += tokens_out
+
+        return {
+            "tokens_out": tokens_out,
+            "price_paid": usdc_amount / tokens_out if tokens_out > 0 else 0,
+            "curve_price_after": new_virtual_usdc / new_virtual_token,
+        }
+
+    @checked
+    @recorded("sell", "usdc_out")
+    def sell(self, token_amount: float) -> dict:
+        usdc_out, new_virtual_token, new_virtual_usdc = cp_sell(
+            self.virtual_token_reserve, self.virtual_usdc_reserve, token_amount)
+
+        if usdc_out > self.real_usdc_reserve:
+            usdc_out = self.real_usdc_reserve
+
+        self.virtual_token_reserve = new_virtual_token
+        self.virtual_usdc_reserve = new_virtual_usdc
+        self.real_usdc_reserve -= usdc_out
+        self.real_token_reserve += token_amount
+        self.tokens_sold -= token_amount
+
+        return {
+            "usdc_out": usdc_out,
+            "price_received": usdc_out / token_amount if token_amount > 0 else 0,
+            "curve_price_after": new_virtual_usdc / new_virtual_token,
+        }
+
+    @checked
+    def buy_batch(self, usdc: np.ndarray) -> dict:
+        return _curve_buy_batch(self, usdc)
+
+    @checked
+    def sell_batch(self, tokens: np.ndarray) -> dict:
+        return _curve_sell_batch(self, tokens)
+
+    @checked
+    @recorded("buyback", "tokens_bought")
+    def execute_buyback(self, usdc_amount: float) -> dict:
+        """Buy tokens on the curve and burn them."""
+        price_before = self.curve_price
+
+        tokens_bought, new_virtual_token, new_virtual_usdc = cp_buy(
+            self.virtual_token_reserve, self.virtual_usdc_reserve, usdc_amount)
+
+        self.virtual_usdc_reserve = new_virtual_usdc
+        self.virtual_token_reserve = new_virtual_token
+        self.real_usdc_reserve += usdc_amount
+        # Tokens are bought then burned -- they don't go to real_token_reserve
+        # They come from the virtual reserve (buying pushes virtual_token down)
+        # Then we burn them, which means they never re-enter circulation
+        self.tokens_burned += tokens_bought
+        self.total_buyback_usdc += usdc_amount
+
+        return {
+            "tokens_bought": tokens_bought,
+            "tokens_burned_total": self.tokens_burned,
+            "price_before": price_before,
+            "price_after": new_virtual_usdc / new_virtual_token,
+            "circulating_supply": self.circulating_supply,
+        }
+
+    @checked
+    def execute_buyback_batch(self, usdc: np.ndarray) -> dict:
+        """Back-to-back buybacks; burned tokens never touch real_token_reserve."""
+        pre = self.observe()
+        f = buy_sequence(self.virtual_token_reserve, self.virtual_usdc_reserve, np.inf, usdc)
+        _record_fills(self, "buyback", pre, f.usdc, f.tokens, f, f.usdc, 0.0)
+        if f.tokens.size:
+            self.virtual_token_reserve = float(f.virtual_token_reserve[-1])
+            self.virtual_usdc_reserve = float(f.virtual_usdc_reserve[-1])
+            self.real_usdc_reserve += float(f.usdc.sum())
+            self.tokens_burned += float(f.tokens.sum())
+            self.total_buyback_usdc += float(f.usdc.sum())
+        return {
+            "tokens_bought": f.tokens,
+            "virtual_token_reserve": f.virtual_token_reserve,
+            "virtual_usdc_reserve": f.virtual_usdc_reserve,
+        }
+
+    @checked
+    @recorded("revenue", "buyback")
+    def receive_revenue(self, amount: float, operator_bps: int = 6000,
+                        buyback_bps: int = 3000, protocol_bps: int = 1000) -> dict:
+        operator_cut = amount * operator_bps / 10000
+        buyback_cut = amount * buyback_bps / 10000
+        protocol_cut = amount * protocol_bps / 10000
+
+        self.total_revenue += amount
+
+        # Execute buyback immediately
+        bb_result = self.execute_buyback(buyback_cut)
+
+        return {
+            "operator": operator_cut,
+            "buyback": buyback_cut,
+            "protocol": protocol_cut,
+            **bb_result,
+        }
+
+
+# ============================================================
+# BATCHED TRADES + REPLAY
+# ============================================================
+
+def _record_fills(m, kind: str, pre: tuple, amount, result, f, reserve_delta, supply_delta) -> None:
+    """Log a batched run to the model's recorder, one event per trade."""
+    if m.recorder is None or len(amount) == 0:
+        return
+    price_post = f.virtual_usdc_reserve / f.virtual_token_reserve
+    reserve_post = pre[1] + np.cumsum(np.broadcast_to(reserve_delta, price_post.shape))
+    supply_post = pre[2] + np.cumsum(np.broadcast_to(supply_delta, price_post.shape))
+    m.recorder.record_columns(m, KIND_CODES[kind], {
+        "amount": amount,
+        "result": result,
+        "price_pre": np.concatenate(([pre[0]], price_post[:-1])),
+        "price_post": price_post,
+        "reserve_pre": np.concatenate(([pre[1]], reserve_post[:-1])),
+        "reserve_post": reserve_post,
+        "supply_pre": np.concatenate(([pre[2]], supply_post[:-1])),
+        "supply_post": supply_post,
+    })
+
+
+def _curve_buy_batch(m, usdc: np.ndarray) -> dict:
+    pre = m.observe()
+    f = buy_sequence(m.virtual_token_reserve, m.virtual_usdc_reserve, m.real_token_reserve, usdc)
+    if f.tokens.size:
+        m.virtual_token_reserve = float(f.virtual_token_reserve[-1])
+        m.virtual_usdc_reserve = float(f.virtual_usdc_reserve[-1])
+        m.real_token_reserve = float(f.real_reserve[-1])
+        m.real_usdc_reserve += float(f.usdc.sum())
+        m.tokens_sold += float(f.tokens.sum())
+    _record_fills(m, "buy", pre, f.usdc, f.tokens, f, f.usdc, f.tokens)
+    return {
+        "tokens_out": f.tokens,
+        "usdc_in": f.usdc,
+        "virtual_token_reserve": f.virtual_token_reserve,
+        "virtual_usdc_reserve": f.virtual_usdc_reserve,
+    }
+
+
+def _curve_sell_batch(m, tokens: np.ndarray, floor: Optional[np.ndarray] = None) -> dict:
+    """Curve sells; `floor` is the per-trade payout from the revenue pool (Option A)."""
+    pre = m.observe()
+    f = sell_sequence(m.virtual_token_reserve, m.virtual_usdc_reserve, m.real_usdc_reserve, tokens)
+    usdc_out = f.usdc if floor is None else f.usdc + floor
+    if f.tokens.size:
+        m.virtual_token_reserve = float(f.virtual_token_reserve[-1])
+        m.virtual_usdc_reserve = float(f.virtual_usdc_reserve[-1])
+        m.real_usdc_reserve = float(f.real_reserve[-1])
+        m.real_token_reserve += float(f.tokens.sum())
+        m.tokens_sold -= float(f.tokens.sum())
+        if floor is not None:
+            m.revenue_pool -= float(floor.sum())
+    _record_fills(m, "sell", pre, f.tokens, usdc_out, f, -usdc_out, -f.tokens)
+    r = {
+        "usdc_out": usdc_out,
+        "tokens_in": f.tokens,
+        "virtual_token_reserve": f.virtual_token_reserve,
+        "virtual_usdc_reserve": f.virtual_usdc_reserve,
+    }
+    if floor is not None:
+        r["curve_component"] = f.usdc
+        r["floor_component"] = floor
+    return r
+
+
+def replay(model, is_buy: np.ndarray, amount: np.ndarray) -> dict:
+    """
+    Apply a mixed trade stream to any curve model. `amount` is USDC for buys
+    and tokens for sells. Same-side runs go through buy_batch/sell_batch in
+    one call each.
+
+    Returns per-trade tokens (out for buys, in for sells; filled amount where
+    a model clamps sells), USDC (in for buys, out for sells) and the curve
+    price after each trade.
+    """
+    is_buy = np.asarray(is_buy, dtype=bool)
+    amount = np.asarray(amount, dtype=np.float64)
+    tokens = np.empty_like(amount)
+    usdc = np.empty_like(amount)
+    price = np.empty_like(amount)
+    for a, b, buying in trade_runs(is_buy):
+        if buying:
+            r = model.buy_batch(amount[a:b])
+            tokens[a:b] = r["tokens_out"]
+            usdc[a:b] = amount[a:b]
+        else:
+            r = model.sell_batch(amount[a:b])
+            tokens[a:b] = r["tokens_in"]
+            usdc[a:b] = r["usdc_out"]
+        price[a:b] = r["virtual_usdc_reserve"] / r["virtual_token_reserve"]
+    return {"tokens": tokens, "usdc": usdc, "curve_price": price}
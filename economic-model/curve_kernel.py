@@ -0,0 +1,188 @@
+"""
+Constant-Product Curve Kernel
+
+Shared x*y=k math for every bonding-curve model. The scalar functions work
+unchanged on floats or NumPy arrays (many independent trades against the
+same state); the *_sequence functions apply a run of trades back to back in
+one vectorized pass.
+
+Within a run of same-side trades k is fixed, so the reserve path is a
+closed form of the cumulative trade size:
+  buys:  vur_i = vur_0 + sum(usdc[:i+1]),   vtr_i = k / vur_i
+  sells: vtr_i = vtr_0 + sum(tokens[:i+1]), vur_i = k / vtr_i
+Real-reserve clamps are applied on the cumulative payout, which is exactly
+what clamping each trade against the running balance does.
+
+Option A-Fix buys split the payment into a curve part c and a floor part
+(tokens_out * floor). With k = vtr * vur that split,
+  usdc = c + (vtr - k / (vur + c)) * floor,
+reduces to the quadratic
+  c^2 + (vur + floor * vtr - usdc) * c - usdc * vur = 0
+whose positive root is taken in its cancellation-free form; a bracketed
+Newton step cleans up the rare cases where it loses precision.
+"""
+
+import math
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+
+class CurveFills(NamedTuple):
+    tokens: np.ndarray                 # tokens out (buys) / tokens in (sells)
+    usdc: np.ndarray                   # USDC in (buys) / USDC out after clamp (sells)
+    virtual_token_reserve: np.ndarray  # post-trade reserves
+    virtual_usdc_reserve: np.ndarray
+    real_reserve: np.ndarray           # real tokens (buys) / real USDC (sells) after each trade
+
+
+# ============================================================
+# SINGLE TRADE (scalar or elementwise)
+# ============================================================
+
+def cp_buy(vtr, vur, usdc_amount) -> Tuple:
+    """USDC in -> (tokens_out, new_vtr, new_vur)."""
+    new_vur = vur + usdc_amount
+    new_vtr = vtr * vur / new_vur
+    return vtr - new_vtr, new_vtr, new_vur
+
+
+def cp_sell(vtr, vur, token_amount) -> Tuple:
+    """Tokens in -> (usdc_out, new_vtr, new_vur)."""
+    new_vtr = vtr + token_amount
+    new_vur = vtr * vur / new_vtr
+    return vur - new_vur, new_vtr, new_vur
+
+
+# ============================================================
+# FLOOR SPLIT (Option A-Fix buys)
+# ============================================================
+
+SPLIT_TOL = 1e-9
+
+
+def _split_newton(vtr: float, vur: float, floor: float, usdc: float,
+                  c: float, max_iter: int = 60) -> float:
+    lo, hi = 0.0, usdc
+    c = min(max(c, lo), hi) if math.isfinite(c) else usdc / 2
+    for _ in range(max_iter):
+        y = vur + c
+        g = c + floor * vtr * c / y - usdc
+        if abs(g) <= SPLIT_TOL * max(usdc, 1.0):
+            break
+        if g > 0:
+            hi = c
+        else:
+            lo = c
+        c_new = c - g / (1.0 + floor * vtr * vur / (y * y))
+        c = c_new if lo < c_new < hi else (lo + hi) / 2
+    return c
+
+
+def floor_split(vtr: float, vur: float, floor: float, usdc: float) -> float:
+    """Curve portion of an A-Fix buy of `usdc`; the rest funds the floor."""
+    if floor == 0.0 or usdc == 0.0:
+        return usdc
+    b = vur + floor * vtr - usdc
+    disc = math.sqrt(b * b + 4.0 * usdc * vur)
+    # b > 0: -b + disc cancels, use the product-of-roots form instead
+    c = (2.0 * usdc * vur / (b + disc)) if b > 0 else (disc - b) / 2.0
+    if 0.0 <= c <= usdc:
+        g = c + floor * vtr * c / (vur + c) - usdc
+        if abs(g) <= SPLIT_TOL * max(usdc, 1.0):
+            return c
+    return _split_newton(vtr, vur, floor, usdc, c)
+
+
+def floor_buy_cap(vtr: float, vur: float, real_token_reserve: float, floor: float) -> float:
+    """Largest A-Fix payment the remaining real tokens can fill: the curve cost
+    of exactly real_token_reserve tokens plus their floor."""
+    if real_token_reserve >= vtr:
+        return math.inf
+    return vtr * vur / (vtr - real_token_reserve) - vur + real_token_reserve * floor
+
+
+def floor_split_array(vtr, vur, floor, usdc) -> np.ndarray:
+    """Elementwise floor_split; any argument may be an array."""
+    vtr, vur, floor, usdc = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (vtr, vur, floor, usdc)))
+    b = vur + floor * vtr - usdc
+    disc = np.sqrt(b * b + 4.0 * usdc * vur)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c = np.where(b > 0, 2.0 * usdc * vur / (b + disc), (disc - b) / 2.0)
+        g = c + floor * vtr * c / (vur + c) - usdc
+    c = np.where(floor == 0.0, usdc, c)
+    bad = (floor != 0.0) & ~((c >= 0) & (c <= usdc) & (np.abs(g) <= SPLIT_TOL * np.maximum(usdc, 1.0)))
+    for j in np.flatnonzero(bad):
+        c[j] = _split_newton(float(vtr[j]), float(vur[j]), float(floor[j]), float(usdc[j]), float(c[j]))
+    return c
+
+
+# ============================================================
+# SEQUENTIAL RUNS
+# ============================================================
+
+def clamp_cumulative(raw: np.ndarray, cum_raw: np.ndarray, available: float) -> np.ndarray:
+    """Per-trade payouts when each trade is capped by what is left of `available`."""
+    if cum_raw.size == 0 or cum_raw[-1] <= available:
+        return raw
+    paid = np.minimum(cum_raw, available)
+    clamped = np.diff(paid, prepend=0.0)
+    return np.where(cum_raw <= available, raw, clamped)
+
+
+def buy_sequence(vtr: float, vur: float, real_token_reserve: float,
+                 usdc: np.ndarray) -> CurveFills:
+    usdc = np.asarray(usdc, dtype=np.float64)
+    k = vtr * vur
+    vur_path = vur + np.cumsum(usdc)
+    vtr_path = k / vur_path
+    raw = -np.diff(vtr_path, prepend=vtr)
+    tokens = clamp_cumulative(raw, vtr - vtr_path, real_token_reserve)
+    real_path = real_token_reserve - np.cumsum(tokens)
+    return CurveFills(tokens, usdc, vtr_path, vur_path, real_path)
+
+
+def sell_sequence(vtr: float, vur: float, real_usdc_reserve: float,
+                  tokens: np.ndarray) -> CurveFills:
+    tokens = np.asarray(tokens, dtype=np.float64)
+    k = vtr * vur
+    vtr_path = vtr + np.cumsum(tokens)
+    vur_path = k / vtr_path
+    raw = -np.diff(vur_path, prepend=vur)
+    usdc = clamp_cumulative(raw, vur - vur_path, real_usdc_reserve)
+    real_path = real_usdc_reserve - np.cumsum(usdc)
+    return CurveFills(tokens, usdc, vtr_path, vur_path, real_path)
+
+
+def floor_buy_sequence(vtr: float, vur: float, real_token_reserve: float,
+                       floor: float, usdc: np.ndarray) -> CurveFills:
+    """
+    Back-to-back A-Fix buys at a fixed floor. Cumulative payment U splits the
+    same way a single buy of U would (curve tokens and floor cost both add
+    up along the curve), so the whole run is one vectorized floor_split on
+    the cumulative sums. Payments past floor_buy_cap fill nothing (the
+    caller refunds usdc - curve - tokens * floor). `usdc` in the result is
+    the curve portion.
+    """
+    usdc = np.asarray(usdc, dtype=np.float64)
+    k = vtr * vur
+    paid_cum = np.minimum(np.cumsum(usdc), floor_buy_cap(vtr, vur, real_token_reserve, floor))
+    curve_cum = floor_split_array(vtr, vur, floor, paid_cum)
+    curve = np.diff(curve_cum, prepend=0.0)
+    vur_path = vur + curve_cum
+    vtr_path = k / vur_path
+    tokens = clamp_cumulative(-np.diff(vtr_path, prepend=vtr), vtr - vtr_path, real_token_reserve)
+    return CurveFills(tokens, curve, vtr_path, vur_path, real_token_reserve - np.cumsum(tokens))
+
+
+def trade_runs(is_buy: np.ndarray):
+    """Yield (start, stop, is_buy) for each maximal run of same-side trades."""
+    is_buy = np.asarray(is_buy, dtype=bool)
+    if is_buy.size == 0:
+        return
+    edges = np.flatnonzero(is_buy[1:] != is_buy[:-1]) + 1
+    starts = np.concatenate(([0], edges))
+    stops = np.concatenate((edges, [is_buy.size]))
+    for a, b in zip(starts.tolist(), stops.tolist()):
+        yield a, b, bool(is_buy[a])
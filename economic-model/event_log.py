@@ -0,0 +1,265 @@
+"""
+Event-Sourced Simulation Log
+
+Every model (VaultState, the bonding-curve options, VaultBatch) can carry a
+`recorder`. When set, each deposit / withdraw / buy / sell / revenue /
+buyback / spend appends one event with the model's state before and after:
+
+  (run, model, entity, seq, kind, label, amount, result,
+   price_pre, price_post, reserve_pre, reserve_post, supply_pre, supply_post)
+
+price is NAV per share (vaults) or curve price (curves); reserve is the USDC
+backing the model; supply is shares or tokens sold. `result` is the op's
+headline output (shares minted, tokens out, USDC out, retained revenue cut).
+
+Events are buffered in typed `array.array` columns and flushed in bulk to a
+directory with one fixed-width binary file per column plus schema.json, so a
+run can be memory-mapped back as NumPy arrays column by column. Text tables
+are just a view over the recorded columns.
+
+The recorder itself is stdlib-only; NumPy is imported when columns are read.
+"""
+
+import functools
+import json
+import os
+from array import array
+from typing import Dict, List, Optional
+
+
+EVENT_KINDS = ("deposit", "withdraw", "buy", "sell", "revenue", "buyback", "spend", "slash")
+KIND_CODES = {k: i for i, k in enumerate(EVENT_KINDS)}
+
+SCHEMA = (
+    ("run", "i"), ("model", "i"), ("entity", "q"), ("seq", "q"), ("kind", "b"), ("label", "i"),
+    ("amount", "d"), ("result", "d"),
+    ("price_pre", "d"), ("price_post", "d"),
+    ("reserve_pre", "d"), ("reserve_post", "d"),
+    ("supply_pre", "d"), ("supply_post", "d"),
+)
+_NUMPY_DTYPES = {"i": "<i4", "q": "<i8", "b": "i1", "d": "<f8"}
+
+
+# ============================================================
+# RECORDER
+# ============================================================
+
+class EventRecorder:
+    def __init__(self, path: Optional[str] = None, capacity: int = 1 << 16):
+        self.path = path
+        self.capacity = capacity
+        self.run = 0
+        self.seq = 0
+        self.pending_label = ""
+        self.models: List[str] = []
+        self.labels: List[str] = [""]
+        self._label_ids: Dict[str, int] = {"": 0}
+        self._cols = {name: array(code) for name, code in SCHEMA}
+        self._buffered = 0
+        self.flushed = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            for name, _ in SCHEMA:
+                open(os.path.join(path, f"{name}.bin"), "wb").close()
+
+    def attach(self, model, name: Optional[str] = None):
+        """Route `model`'s events here. Returns the model for chaining."""
+        model.recorder = self
+        model.recorder_id = len(self.models)
+        self.models.append(name or type(model).__name__)
+        return model
+
+    def begin_run(self, run: Optional[int] = None) -> int:
+        self.run = self.run + 1 if run is None else run
+        return self.run
+
+    def label_id(self, label: str) -> int:
+        i = self._label_ids.get(label)
+        if i is None:
+            i = self._label_ids[label] = len(self.labels)
+            self.labels.append(label)
+        return i
+
+    def record(self, model, kind: int, amount: float, result: float,
+               pre: tuple, post: tuple, label: str = "", entity: int = 0) -> None:
+        c = self._cols
+        c["run"].append(self.run)
+        c["model"].append(model.recorder_id)
+        c["entity"].append(entity)
+        c["seq"].append(self.seq)
+        c["kind"].append(kind)
+        c["label"].append(self.label_id(label) if label else 0)
+        c["amount"].append(amount)
+        c["result"].append(result)
+        c["price_pre"].append(pre[0])
+        c["price_post"].append(post[0])
+        c["reserve_pre"].append(pre[1])
+        c["reserve_post"].append(post[1])
+        c["supply_pre"].append(pre[2])
+        c["supply_post"].append(post[2])
+        self.seq += 1
+        self._buffered += 1
+        if self._buffered >= self.capacity and self.path is not None:
+            self.flush()
+
+    def record_columns(self, model, kind: int, columns: dict, entity=0) -> None:
+        """Bulk append from NumPy arrays (batched ops). `columns` holds amount,
+        result and the six pre/post arrays; scalars broadcast."""
+        import numpy as np
+        n = len(columns["amount"])
+        if n == 0:
+            return
+        fixed = {
+            "run": np.full(n, self.run), "model": np.full(n, model.recorder_id),
+            "entity": entity, "seq": np.arange(self.seq, self.seq + n),
+            "kind": np.full(n, kind), "label": np.zeros(n),
+        }
+        for name, code in SCHEMA:
+            src = np.broadcast_to(fixed[name] if name in fixed else columns[name], (n,))
+            self._cols[name].frombytes(np.ascontiguousarray(src, dtype=_NUMPY_DTYPES[code]).tobytes())
+        self.seq += n
+        self._buffered += n
+        if self._buffered >= self.capacity and self.path is not None:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.path is None or self._buffered == 0:
+            return
+        for name, _ in SCHEMA:
+            with open(os.path.join(self.path, f"{name}.bin"), "ab") as f:
+                self._cols[name].tofile(f)
+            del self._cols[name][:]
+        self.flushed += self._buffered
+        self._buffered = 0
+        self._write_schema()
+
+    def _write_schema(self) -> None:
+        meta = {
+            "columns": [[name, _NUMPY_DTYPES[code]] for name, code in SCHEMA],
+            "kinds": list(EVENT_KINDS),
+            "models": self.models,
+            "labels": self.labels,
+            "rows": self.flushed,
+        }
+        with open(os.path.join(self.path, "schema.json"), "w") as f:
+            json.dump(meta, f)
+
+    def close(self) -> None:
+        self.flush()
+        if self.path is not None:
+            self._write_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def buffer(self) -> dict:
+        """Unflushed rows as the raw typed arrays (no NumPy needed)."""
+        return self._cols
+
+    def columns(self) -> dict:
+        """Everything recorded so far as NumPy arrays (flushed rows + buffer)."""
+        import numpy as np
+        if self.path is not None and self.flushed:
+            self.flush()
+            return load_events(self.path)
+        return {name: np.frombuffer(self._cols[name], dtype=_NUMPY_DTYPES[code])
+                for name, code in SCHEMA}
+
+
+def load_events(path: str) -> dict:
+    """Memory-map a flushed event directory column by column."""
+    import numpy as np
+    with open(os.path.join(path, "schema.json")) as f:
+        meta = json.load(f)
+    cols = {}
+    for name, dtype in meta["columns"]:
+        if meta["rows"] == 0:
+            cols[name] = np.zeros(0, dtype=dtype)
+        else:
+            cols[name] = np.memmap(os.path.join(path, f"{name}.bin"), dtype=dtype,
+                                   mode="r", shape=(meta["rows"],))
+    return cols
+
+
+def to_parquet(path: str, out_file: str) -> None:
+    """Export a flushed event directory to Parquet (requires pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("to_parquet needs pyarrow: pip install pyarrow") from e
+    pq.write_table(pa.table({k: v for k, v in load_events(path).items()}), out_file)
+
+
+# ============================================================
+# MODEL HOOK
+# ============================================================
+
+def recorded(kind: str, result_key: Optional[str] = None):
+    """
+    Decorate a model op so it logs to `self.recorder` when one is attached.
+    The model provides observe() -> (price, reserve, supply). With no
+    recorder the op runs straight through.
+    """
+    code = KIND_CODES[kind]
+
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(self, amount, *args, **kwargs):
+            rec = self.recorder
+            if rec is None:
+                return fn(self, amount, *args, **kwargs)
+            # take the label before running: a nested recorded op (e.g. the
+            # buyback inside receive_revenue) must not consume it
+            label, rec.pending_label = rec.pending_label, ""
+            pre = self.observe()
+            out = fn(self, amount, *args, **kwargs)
+            if out is None:
+                result = 0.0
+            elif result_key is None:
+                result = out
+            else:
+                result = out[result_key]
+            rec.record(self, code, amount, result, pre, self.observe(), label=label)
+            return out
+        return wrapper
+    return deco
+
+
+def labelled(recorder: Optional[EventRecorder], label: str) -> None:
+    """Tag the next recorded event with a free-text label (e.g. "Alice deposits")."""
+    if recorder is not None:
+        recorder.pending_label = label
+
+
+# ============================================================
+# VIEWS + AGGREGATION
+# ============================================================
+
+def summarize(columns: dict, n_models: int) -> dict:
+    """Event count and summed amount/result per (model, kind), via bincount."""
+    import numpy as np
+    key = columns["model"].astype(np.int64) * len(EVENT_KINDS) + columns["kind"]
+    size = n_models * len(EVENT_KINDS)
+    count = np.bincount(key, minlength=size).reshape(n_models, -1)
+    amount = np.bincount(key, weights=columns["amount"], minlength=size).reshape(n_models, -1)
+    result = np.bincount(key, weights=columns["result"], minlength=size).reshape(n_models, -1)
+    return {"count": count, "amount": amount, "result": result}
+
+
+def render_text(columns: dict, recorder: EventRecorder, rows=None) -> List[str]:
+    """Generic one-line-per-event rendering of recorded columns."""
+    n = len(columns["seq"])
+    out = [f"{'Seq':>6} {'Model':<24} {'Event':<9} {'Amount':>14} {'Result':>14} "
+           f"{'Price':>12} {'Reserve':>12} {'Supply':>16}"]
+    for i in (range(n) if rows is None else rows):
+        label = recorder.labels[columns["label"][i]]
+        out.append(f"{columns['seq'][i]:>6} {recorder.models[columns['model'][i]]:<24} "
+                   f"{EVENT_KINDS[columns['kind'][i]]:<9} {columns['amount'][i]:>14.4f} "
+                   f"{columns['result'][i]:>14.4f} {columns['price_post'][i]:>12.6g} "
+                   f"{columns['reserve_post'][i]:>12.2f} {columns['supply_post'][i]:>16,.2f}"
+                   + (f"  {label}" if label else ""))
+    return out
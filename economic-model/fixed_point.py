@@ -0,0 +1,321 @@
+"""
+Integer Micro-USDC Mode
+
+Exact integer twins of VaultState and the Option A / A-Fix curve that round
+the way the on-chain programs do: amounts are u64 micro-units (6 decimals),
+products are formed in u128 and divided once, and every division rounds in
+the protocol's favor (down on shares minted and USDC paid out, up on what
+a buyer owes). Checked arithmetic is mirrored by raising OverflowError
+wherever a u64 result or u128 intermediate would not fit.
+
+Because nothing is approximated, the float models' tolerances become exact
+checks: NAV per share can never drop on deposit or withdraw, and the A-Fix
+revenue pool always covers the floor liability to the micro-unit.
+
+Python ints do the scalar math (no Decimal). VaultBatchMicro in
+vault_batch.py is the int64 NumPy counterpart for batches.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Optional
+
+from event_log import EventRecorder, recorded
+from invariants import BOUND, CONSERVED, Invariant, checked
+from snapshot import snapshottable
+
+
+MICRO = 1_000_000                 # micro-units per USDC (and per token: 6 decimals)
+BPS = 10_000
+U64_MAX = (1 << 64) - 1
+U128_MAX = (1 << 128) - 1
+ACC_SCALE = 10 ** 18              # fixed-point scale of floor-per-token accumulators (fits u128 products)
+
+
+def to_micro(usdc: float) -> int:
+    return int(round(usdc * MICRO))
+
+
+def from_micro(units: int) -> float:
+    return units / MICRO
+
+
+def u64(x: int) -> int:
+    if not 0 <= x <= U64_MAX:
+        raise OverflowError(f"u64 overflow: {x}")
+    return x
+
+
+def mul_div(a: int, b: int, c: int) -> int:
+    """floor(a * b / c) with a u128 intermediate and a u64 result."""
+    p = a * b
+    if p > U128_MAX:
+        raise OverflowError(f"u128 overflow: {a} * {b}")
+    return u64(p // c)
+
+
+def mul_div_ceil(a: int, b: int, c: int) -> int:
+    p = a * b
+    if p > U128_MAX:
+        raise OverflowError(f"u128 overflow: {a} * {b}")
+    return u64(-(-p // c))
+
+
+# ============================================================
+# VAULT
+# ============================================================
+
+def _nav_drop(v, before: tuple, after: tuple) -> int:
+    """> 0 iff NAV (assets / shares) fell, compared exactly by cross-multiplying."""
+    return before[0] * after[1] - after[0] * before[1]
+
+
+@snapshottable
+@dataclass(slots=True, weakref_slot=True)
+class VaultStateMicro:
+    """
+    VaultState in micro-USDC with the on-chain share math:
+      shares   = amount * (total_shares + virtual_shares) / (total_assets + virtual_assets)
+      usdc_out = shares * (total_assets + virtual_assets) / (total_shares + virtual_shares)
+    An empty vault with no virtual offset mints 1:1. `dead_shares` are
+    locked away on the first deposit; `min_first_deposit` rejects dust
+    first deposits. Revenue splits pay agent and protocol rounded down and
+    leave the remainder in the vault.
+    """
+    usdc_balance: int = 0
+    total_shares: int = 0
+    total_revenue: int = 0
+    total_spend: int = 0
+    agent_fee_bps: int = 7000
+    protocol_fee_bps: int = 1000
+    virtual_shares: int = 0
+    virtual_assets: int = 0
+    dead_shares: int = 0
+    min_first_deposit: int = 0
+    recorder: Optional[EventRecorder] = field(default=None, repr=False, compare=False)
+    recorder_id: int = field(default=0, repr=False, compare=False)
+
+    INVARIANTS = (
+        Invariant("nav_never_drops", lambda v: (v.usdc_balance + v.virtual_assets,
+                                                v.total_shares + v.virtual_shares),
+                  CONSERVED, tol=0, ops=("deposit", "withdraw"),
+                  guard=lambda v: v.total_shares + v.virtual_shares > 0, distance=_nav_drop),
+    )
+
+    @property
+    def nav_per_share(self) -> float:
+        shares = self.total_shares + self.virtual_shares
+        if shares == 0:
+            return 1.0
+        return (self.usdc_balance + self.virtual_assets) / shares
+
+    def observe(self) -> tuple:
+        return (self.nav_per_share, from_micro(self.usdc_balance), from_micro(self.total_shares))
+
+    @checked
+    @recorded("deposit")
+    def deposit(self, amount: int) -> int:
+        assert amount > 0
+        if self.total_shares == 0:
+            assert amount >= self.min_first_deposit, f"First deposit below minimum: {amount}"
+        supply = self.total_shares + self.virtual_shares
+        if supply == 0:
+            shares = amount
+        else:
+            shares = mul_div(amount, supply, self.usdc_balance + self.virtual_assets)
+        if self.total_shares == 0 and self.dead_shares:
+            assert shares > self.dead_shares, "First deposit must exceed dead shares"
+            self.total_shares += self.dead_shares
+            shares -= self.dead_shares
+        self.usdc_balance = u64(self.usdc_balance + amount)
+        self.total_shares = u64(self.total_shares + shares)
+        return shares
+
+    @checked
+    @recorded("withdraw")
+    def withdraw(self, shares: int) -> int:
+        assert shares > 0
+        assert shares <= self.total_shares
+        usdc_out = mul_div(shares, self.usdc_balance + self.virtual_assets,
+                           self.total_shares + self.virtual_shares)
+        self.total_shares -= shares
+        self.usdc_balance -= usdc_out
+        return usdc_out
+
+    @checked
+    @recorded("revenue", "vault")
+    def receive_revenue(self, amount: int) -> dict:
+        assert amount > 0
+        agent_cut = mul_div(amount, self.agent_fee_bps, BPS)
+        protocol_cut = mul_div(amount, self.protocol_fee_bps, BPS)
+        vault_cut = amount - agent_cut - protocol_cut
+        self.usdc_balance = u64(self.usdc_balance + vault_cut)
+        self.total_revenue = u64(self.total_revenue + amount)
+        return {"vault": vault_cut, "protocol": protocol_cut, "agent": agent_cut}
+
+    @checked
+    @recorded("spend")
+    def spend(self, amount: int) -> None:
+        assert amount > 0
+        assert amount <= self.usdc_balance, f"Insufficient balance: {self.usdc_balance} < {amount}"
+        self.usdc_balance -= amount
+        self.total_spend += amount
+
+    def donate(self, amount: int) -> None:
+        """Direct SPL transfer into the vault token account: assets up, no shares."""
+        self.usdc_balance = u64(self.usdc_balance + amount)
+
+
+# ============================================================
+# CURVE (Option A / A-Fix)
+# ============================================================
+
+def cp_buy_micro(vtr: int, vur: int, usdc: int) -> tuple:
+    """USDC in -> (tokens_out, new_vtr, new_vur); the pool keeps the rounding (ceil k / vur)."""
+    new_vur = u64(vur + usdc)
+    new_vtr = -(-(vtr * vur) // new_vur)
+    return vtr - new_vtr, new_vtr, new_vur
+
+
+def cp_sell_micro(vtr: int, vur: int, tokens: int) -> tuple:
+    """Tokens in -> (usdc_out, new_vtr, new_vur); the pool keeps the rounding."""
+    new_vtr = u64(vtr + tokens)
+    new_vur = -(-(vtr * vur) // new_vtr)
+    return vur - new_vur, new_vtr, new_vur
+
+
+@snapshottable
+@dataclass(slots=True, weakref_slot=True)
+class BondingCurveMicro:
+    """
+    Option A in micro-units (tokens also have 6 decimals). The floor per
+    token is an accumulator scaled by ACC_SCALE: revenue adds
+    floor_cut * ACC_SCALE / circulating supply (sold plus operator tokens,
+    rounded down, as in the float model), a sale pays
+    tokens * acc / ACC_SCALE (rounded down). With buyer_pays_floor (A-Fix)
+    a buyer also pays tokens_out * acc / ACC_SCALE, rounded up, into the
+    pool, which keeps the floor exactly backed.
+    """
+    virtual_token_reserve: int = 1_073_000_000 * MICRO
+    virtual_usdc_reserve: int = 30_000 * MICRO
+    real_token_reserve: int = 800_000_000 * MICRO
+    real_usdc_reserve: int = 0
+    revenue_pool: int = 0
+    acc_floor_per_token: int = 0
+    tokens_sold: int = 0
+    operator_tokens: int = 200_000_000 * MICRO
+    total_revenue: int = 0
+    buyer_pays_floor: bool = False
+    recorder: Optional[EventRecorder] = field(default=None, repr=False, compare=False)
+    recorder_id: int = field(default=0, repr=False, compare=False)
+
+    INVARIANTS = (
+        # exact (tol 0): holds for A-Fix, and Option A's dilution shows up to the micro-unit
+        Invariant("floor_backed", lambda c: c.floor_liability - c.revenue_pool, BOUND, tol=0),
+    )
+
+    @property
+    def curve_price(self) -> float:
+        return self.virtual_usdc_reserve / self.virtual_token_reserve
+
+    @property
+    def floor_per_token(self) -> float:
+        return self.acc_floor_per_token / ACC_SCALE
+
+    @property
+    def circulating_supply(self) -> int:
+        return self.tokens_sold + self.operator_tokens
+
+    @property
+    def floor_liability(self) -> int:
+        # sold tokens only, as in BondingCurveFloorA.check_solvency: operator
+        # tokens dilute the floor but are not redeemable through sell()
+        return self.tokens_sold * self.acc_floor_per_token // ACC_SCALE
+
+    def observe(self) -> tuple:
+        return (self.curve_price, from_micro(self.real_usdc_reserve + self.revenue_pool),
+                from_micro(self.tokens_sold))
+
+    def _floor_cost(self, tokens: int) -> int:
+        return -(-(tokens * self.acc_floor_per_token) // ACC_SCALE)
+
+    def _floor_split(self, usdc: int) -> int:
+        """Largest curve part whose tokens' floor cost still fits in `usdc`.
+
+        Starts from the closed-form split (curve_kernel.floor_split) and steps
+        by micro-units; the float estimate is off by at most a few units.
+        """
+        vtr, vur = self.virtual_token_reserve, self.virtual_usdc_reserve
+        floor = self.acc_floor_per_token / ACC_SCALE
+        b = vur + floor * vtr - usdc
+        disc = math.sqrt(b * b + 4.0 * usdc * vur)
+        c = min(usdc, max(0, int(2.0 * usdc * vur / (b + disc) if b > 0 else (disc - b) / 2.0)))
+
+        def cost(c):
+            return c + self._floor_cost(cp_buy_micro(vtr, vur, c)[0]) if c else 0
+
+        while c > 0 and cost(c) > usdc:
+            c -= 1
+        while c < usdc and cost(c + 1) <= usdc:
+            c += 1
+        return c
+
+    def _floor_buy_cap(self) -> int:
+        """Most an A-Fix buyer can pay before the real tokens run out (the rest is refunded)."""
+        vtr, vur, left = self.virtual_token_reserve, self.virtual_usdc_reserve, self.real_token_reserve
+        if left >= vtr:
+            return U64_MAX
+        return -(-(vtr * vur) // (vtr - left)) - vur + self._floor_cost(left)
+
+    @checked
+    @recorded("buy", "tokens_out")
+    def buy(self, usdc_amount: int) -> dict:
+        assert usdc_amount > 0
+        curve_usdc = usdc_amount
+        if self.buyer_pays_floor and self.acc_floor_per_token:
+            curve_usdc = self._floor_split(min(usdc_amount, self._floor_buy_cap()))
+        tokens_out, new_vtr, new_vur = cp_buy_micro(
+            self.virtual_token_reserve, self.virtual_usdc_reserve, curve_usdc)
+        tokens_out = min(tokens_out, self.real_token_reserve)   # sold out: as the float curves
+        floor_usdc = self._floor_cost(tokens_out) if self.buyer_pays_floor else 0
+
+        self.virtual_token_reserve, self.virtual_usdc_reserve = new_vtr, new_vur
+        self.real_token_reserve -= tokens_out
+        self.real_usdc_reserve = u64(self.real_usdc_reserve + curve_usdc)
+        self.revenue_pool = u64(self.revenue_pool + floor_usdc)
+        self.tokens_sold += tokens_out
+        return {"tokens_out": tokens_out, "curve_usdc": curve_usdc, "floor_usdc": floor_usdc,
+                "refund": usdc_amount - curve_usdc - floor_usdc}
+
+    @checked
+    @recorded("sell", "usdc_out")
+    def sell(self, token_amount: int) -> dict:
+        assert 0 < token_amount <= self.tokens_sold
+        curve_out, new_vtr, new_vur = cp_sell_micro(
+            self.virtual_token_reserve, self.virtual_usdc_reserve, token_amount)
+        curve_out = min(curve_out, self.real_usdc_reserve)
+        floor_out = min(token_amount * self.acc_floor_per_token // ACC_SCALE, self.revenue_pool)
+
+        self.virtual_token_reserve, self.virtual_usdc_reserve = new_vtr, new_vur
+        self.real_usdc_reserve -= curve_out
+        self.revenue_pool -= floor_out
+        self.real_token_reserve += token_amount
+        self.tokens_sold -= token_amount
+        return {"usdc_out": curve_out + floor_out, "curve_component": curve_out,
+                "floor_component": floor_out}
+
+    @checked
+    @recorded("revenue", "floor")
+    def receive_revenue(self, amount: int, operator_bps: int = 6000,
+                        floor_bps: int = 3000, protocol_bps: int = 1000) -> dict:
+        floor_cut = mul_div(amount, floor_bps, BPS)
+        self.total_revenue = u64(self.total_revenue + amount)
+        self.revenue_pool = u64(self.revenue_pool + floor_cut)
+        if self.circulating_supply > 0:
+            self.acc_floor_per_token += floor_cut * ACC_SCALE // self.circulating_supply
+        return {"operator": mul_div(amount, operator_bps, BPS), "floor": floor_cut,
+                "protocol": mul_div(amount, protocol_bps, BPS)}
+
+    def check_solvency(self) -> dict:
+        return {"floor_liability": self.floor_liability, "revenue_pool": self.revenue_pool,
+                "floor_fully_backed": self.revenue_pool >= self.floor_liability}
@@ -0,0 +1,190 @@
+"""
+Governance Monte Carlo
+
+Distributional version of `governance_simulation` in simulate.py. Samples
+monthly revenue paths from a stochastic process, runs every governance
+budget model over each path with the same accounting (vault keeps 20% of
+revenue, spend capped at 50% of balance), and reports percentile tables of
+final balance, final NAV and max NAV drawdown.
+
+Paths are generated in fixed-size chunks, each seeded from its own child of
+one SeedSequence, so results depend only on (seed, chunk_size) and never on
+how many worker processes run the chunks. With a ResultCache each (chunk,
+model) result is stored separately, so adding or editing one model reruns
+only that model.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from result_cache import ResultCache
+
+
+VAULT_RETENTION = 0.20
+SPEND_CAP = 0.50  # can't spend more than 50% of balance per month
+TRAILING_MONTHS = 3
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+
+# ============================================================
+# REVENUE PROCESSES
+# ============================================================
+
+@dataclass
+class LognormalRevenue:
+    """IID monthly revenue, lognormal around `mean` with coefficient of variation `cv`."""
+    mean: float = 500.0
+    cv: float = 0.5
+
+    def sample(self, rng: np.random.Generator, n_paths: int, n_months: int) -> np.ndarray:
+        sigma2 = np.log1p(self.cv ** 2)
+        mu = np.log(self.mean) - sigma2 / 2
+        return rng.lognormal(mu, np.sqrt(sigma2), (n_paths, n_months))
+
+
+@dataclass
+class GeometricRevenue:
+    """Revenue follows a geometric random walk: growth `drift`, volatility `vol` per month."""
+    start: float = 500.0
+    drift: float = 0.02
+    vol: float = 0.25
+
+    def sample(self, rng: np.random.Generator, n_paths: int, n_months: int) -> np.ndarray:
+        shocks = rng.normal(self.drift - self.vol ** 2 / 2, self.vol, (n_paths, n_months))
+        return self.start * np.exp(np.cumsum(shocks, axis=1))
+
+
+@dataclass
+class RegimeSwitchRevenue:
+    """Lognormal revenue that dies (drops to zero for good) with `death_prob` per month."""
+    mean: float = 500.0
+    cv: float = 0.5
+    death_prob: float = 0.03
+
+    def sample(self, rng: np.random.Generator, n_paths: int, n_months: int) -> np.ndarray:
+        rev = LognormalRevenue(self.mean, self.cv).sample(rng, n_paths, n_months)
+        alive = np.cumprod(rng.random((n_paths, n_months)) >= self.death_prob, axis=1)
+        return rev * alive
+
+
+# ============================================================
+# GOVERNANCE MODELS (vectorized twins of governance_simulation)
+# ============================================================
+
+def fixed_budget(rev, trailing_avg, cumulative_profit):
+    return np.full_like(rev, 200.0)
+
+
+def revenue_linked(rev, trailing_avg, cumulative_profit):
+    return trailing_avg * VAULT_RETENTION * 0.60
+
+
+def milestone(rev, trailing_avg, cumulative_profit):
+    return np.minimum(300.0, np.maximum(100.0, cumulative_profit * 0.10))
+
+
+GOVERNANCE_MODELS: Dict[str, Callable] = {
+    "Fixed Budget ($200/mo)": fixed_budget,
+    "Revenue-Linked (60% of trailing rev)": revenue_linked,
+    "Milestone (unlock on profit)": milestone,
+}
+
+
+def run_governance(revenues: np.ndarray, budget_fn: Callable, initial_tvl: float = 5000.0) -> dict:
+    """Run one budget model over a (paths, months) revenue array."""
+    n_paths, n_months = revenues.shape
+    balance = np.full(n_paths, float(initial_tvl))
+    total_shares = float(initial_tvl)  # $1/share initial
+    cumulative_profit = np.zeros(n_paths)
+    csum = np.cumsum(revenues, axis=1)
+    peak_nav = balance / total_shares
+    max_drawdown = np.zeros(n_paths)
+
+    for m in range(n_months):
+        lo = m - TRAILING_MONTHS
+        window = csum[:, m] - (csum[:, lo] if lo >= 0 else 0.0)
+        trailing_avg = window / min(m + 1, TRAILING_MONTHS)
+
+        rev = revenues[:, m]
+        budget = budget_fn(rev, trailing_avg, cumulative_profit)
+        vault_income = rev * VAULT_RETENTION
+        actual_spend = np.minimum(budget, balance * SPEND_CAP)
+
+        balance = balance + vault_income - actual_spend
+        cumulative_profit = cumulative_profit + vault_income - actual_spend
+        nav = balance / total_shares
+        np.maximum(peak_nav, nav, out=peak_nav)
+        np.maximum(max_drawdown, 1.0 - nav / peak_nav, out=max_drawdown)
+
+    return {"final_balance": balance, "nav": balance / total_shares, "drawdown": max_drawdown}
+
+
+# ============================================================
+# MONTE CARLO RUNNER
+# ============================================================
+
+def _run_chunk(args) -> Dict[str, Dict[str, np.ndarray]]:
+    process, seed_seq, n_paths, n_months, initial_tvl, model_names = args
+    rng = np.random.default_rng(seed_seq)
+    revenues = process.sample(rng, n_paths, n_months)
+    return {name: run_governance(revenues, GOVERNANCE_MODELS[name], initial_tvl)
+            for name in model_names}
+
+
+def _chunk_sizes(n_paths: int, chunk_size: int) -> List[int]:
+    full, rest = divmod(n_paths, chunk_size)
+    return [chunk_size] * full + ([rest] if rest else [])
+
+
+def governance_monte_carlo(process=None, n_paths: int = 100_000, n_months: int = 12,
+                           initial_tvl: float = 5000.0, seed: int = 0,
+                           workers: int = 1, chunk_size: int = 50_000,
+                           models: Optional[Sequence[str]] = None,
+                           percentiles: Sequence[float] = PERCENTILES, cache: Optional[ResultCache] = None) -> dict:
+    """
+    Returns {model: {metric: {percentile: value}}} for metrics final_balance,
+    nav and drawdown. workers=1 runs in-process.
+    """
+    process = process or LognormalRevenue()
+    cache = cache if cache is not None else ResultCache.from_env()
+    model_names = list(models or GOVERNANCE_MODELS)
+    sizes = _chunk_sizes(n_paths, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(process, s, n, n_months, initial_tvl) for s, n in zip(seeds, sizes)]
+    parts = cache.map_items(_run_chunk, jobs, model_names, workers)
+
+    table = {}
+    for name in model_names:
+        table[name] = {}
+        for metric in ("final_balance", "nav", "drawdown"):
+            values = np.concatenate([p[name][metric] for p in parts])
+            table[name][metric] = dict(zip(percentiles, np.percentile(values, percentiles)))
+    return table
+
+
+def print_percentile_table(table: dict) -> None:
+    first = next(iter(table.values()))
+    ps = list(first["final_balance"])
+    for name, metrics in table.items():
+        print(f"\n--- {name} ---")
+        print(f"{'Metric':<15}" + "".join(f"{'p' + str(p):>11}" for p in ps))
+        print("-" * (15 + 11 * len(ps)))
+        for metric, fmt in (("final_balance", "{:>11.2f}"), ("nav", "{:>11.4f}"), ("drawdown", "{:>11.2%}")):
+            print(f"{metric:<15}" + "".join(fmt.format(v) for v in metrics[metric].values()))
+
+
+if __name__ == "__main__":
+    print("=" * 92)
+    print("GOVERNANCE MONTE CARLO (12 months, 200k paths per revenue process)")
+    print("=" * 92)
+    for label, process in [("Lognormal revenue, mean $500, CV 0.5", LognormalRevenue()),
+                           ("Geometric walk, +2%/mo drift, 25% vol", GeometricRevenue()),
+                           ("Lognormal with 3%/mo chance revenue dies", RegimeSwitchRevenue())]:
+        t0 = time.perf_counter()
+        table = governance_monte_carlo(process, n_paths=200_000, seed=42, workers=4)
+        print(f"\n### {label} ({time.perf_counter() - t0:.2f}s)")
+        print_percentile_table(table)
+    print()
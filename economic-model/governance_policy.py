@@ -0,0 +1,414 @@
+"""
+Governance Policy DSL
+
+`governance_simulation` and governance_mc hard-code three budget rules as
+functions of (rev, trailing_avg, cumulative_profit), with the 50%-of-balance
+spend cap fixed in the accounting. Here a policy is a few expression strings:
+
+    Policy("Revenue-linked, hosting floor",
+           budget="0.6 * mean(income, 3)",
+           floor="20",
+           cap="0.5 * balance",
+           reserve="0")
+
+Each month spend = budget, raised to the floor, limited to the cap and to the
+balance above the reserve (floor loses to both). A NaN budget falls back to
+the floor.
+
+Expressions are Python syntax over per-vault arrays:
+
+  rev, income         this month's gross revenue and the vault's share of it
+  balance, nav        vault balance and NAV per share, before this month
+  profit              cumulative income - spend
+  runway              months of balance at last month's net burn (inf if not burning)
+  last_spend, t       last month's spend; month number from 1
+  mean/sum/std(s, w)  over the trailing w months of stream s (rev or income)
+  ewma/ewm_std(s, h)  half-life h months
+  quantile(s, q, w)   trailing w months, to within SKETCH["rel_err"]
+  min, max, clip, where, abs, sqrt, log, exp;  a if cond else b;  and, or
+
+compile_policy checks the expressions against that whitelist and turns the
+policy into one generated NumPy function (CompiledPolicy.source) that returns
+(budget, floor, cap, reserve) for every vault and path at once. The rolling
+statistics come from rolling_stats.py and are shared: run_policies feeds each
+stream once per month however many policies read it.
+
+policy_monte_carlo runs a policy set over sampled revenue paths with
+governance_mc's chunking (results depend on seed and chunk_size, not
+workers), and rank_policies orders the policies by certainty-equivalent NAV
+growth: mean annual log NAV growth less risk_aversion / 2 times its variance.
+"""
+
+import ast
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from governance_mc import (GOVERNANCE_MODELS, SPEND_CAP, VAULT_RETENTION, GeometricRevenue, LognormalRevenue,
+                           RegimeSwitchRevenue, _chunk_sizes, run_governance)
+from result_cache import ResultCache
+from rolling_stats import RollingStats, WindowedQuantiles
+
+
+STREAMS = ("rev", "income")
+STATE = ("balance", "nav", "profit", "runway", "last_spend", "t")
+ELEMENTWISE = {  # name: (numpy function, number of arguments; None = two or more)
+    "min": ("minimum", None), "max": ("maximum", None), "clip": ("clip", 3), "where": ("where", 3),
+    "abs": ("abs", 1), "sqrt": ("sqrt", 1), "log": ("log", 1), "exp": ("exp", 1),
+}
+ROLLING = ("sum", "mean", "std", "ewma", "ewm_std", "quantile")
+CLAUSES = ("budget", "floor", "cap", "reserve")
+SKETCH = dict(rel_err=0.02, min_value=1.0, max_value=1e7)  # monthly dollars; ~400 bins per vault
+
+_BINOPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow)
+_CMPOPS = (ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+
+
+class PolicyError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Policy:
+    name: str
+    budget: str
+    floor: str = "0"
+    cap: str = f"{SPEND_CAP} * balance"
+    reserve: str = "0"
+
+
+@dataclass
+class CompiledPolicy:
+    policy: Policy
+    kernel: object
+    source: str
+    windows: Dict[str, set] = field(default_factory=dict)     # stream -> windows
+    halflives: Dict[str, set] = field(default_factory=dict)   # stream -> half-lives
+    quantiles: Dict[Tuple[str, int], set] = field(default_factory=dict)  # (stream, window) -> qs
+
+    @property
+    def name(self) -> str:
+        return self.policy.name
+
+
+# ============================================================
+# COMPILER
+# ============================================================
+
+class _Translate(ast.NodeTransformer):
+    """Rewrite a checked policy expression into NumPy calls on arrays and feeds."""
+
+    def __init__(self, compiled: CompiledPolicy, clause: str):
+        self.c = compiled
+        self.clause = clause
+
+    def fail(self, node, msg: str):
+        raise PolicyError(f"{self.c.name!r} {self.clause}: {msg} in {ast.unparse(node)!r}")
+
+    def generic_visit(self, node):
+        if not isinstance(node, (ast.Expression, ast.Load) + _BINOPS + _CMPOPS):
+            self.fail(node, f"{type(node).__name__} is not allowed")
+        return super().generic_visit(node)
+
+    def visit_Constant(self, node):
+        if type(node.value) not in (int, float):
+            self.fail(node, "only numeric constants are allowed")
+        return node
+
+    def visit_Name(self, node):
+        if node.id in STREAMS + STATE:
+            return node
+        self.fail(node, f"unknown name {node.id!r}")
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, _BINOPS):
+            self.fail(node, "operator not allowed")
+        return super().generic_visit(node)
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, (ast.USub, ast.UAdd)):
+            self.fail(node, "operator not allowed")
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_Compare(self, node):
+        if len(node.ops) != 1 or not isinstance(node.ops[0], _CMPOPS):
+            self.fail(node, "use one of <, <=, >, >= per comparison")
+        return super().generic_visit(node)
+
+    def visit_BoolOp(self, node):
+        fn = "logical_and" if isinstance(node.op, ast.And) else "logical_or"
+        values = [self.visit(v) for v in node.values]
+        return self._fold(fn, values)
+
+    def visit_IfExp(self, node):
+        return self._np("where", [self.visit(node.test), self.visit(node.body), self.visit(node.orelse)])
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.keywords:
+            self.fail(node, "only plain calls with positional arguments are allowed")
+        name, args = node.func.id, node.args
+        if name in ROLLING:
+            return self._rolling(node, name, args)
+        if name not in ELEMENTWISE:
+            self.fail(node, f"unknown function {name!r}")
+        fn, arity = ELEMENTWISE[name]
+        if (arity is None and len(args) < 2) or (arity is not None and len(args) != arity):
+            self.fail(node, f"{name} takes {arity or 'two or more'} arguments")
+        args = [self.visit(a) for a in args]
+        return self._fold(fn, args) if arity is None else self._np(fn, args)
+
+    def _rolling(self, node, name: str, args):
+        params = {"quantile": "q, months", "ewma": "half-life", "ewm_std": "half-life"}.get(name, "months")
+        if (len(args) != params.count(",") + 2 or not isinstance(args[0], ast.Name)
+                or args[0].id not in STREAMS):
+            self.fail(node, f"expected {name}({'|'.join(STREAMS)}, {params})")
+        consts = []
+        for a in args[1:]:
+            if not isinstance(a, ast.Constant) or type(a.value) not in (int, float) or a.value <= 0:
+                self.fail(node, f"{name} parameters must be positive constants")
+            consts.append(a.value)
+        stream = args[0].id
+        if name == "quantile":
+            q, w = consts
+            if not (q <= 1 and float(w).is_integer()):
+                self.fail(node, "quantile takes q in (0, 1] and a whole number of months")
+            self.c.quantiles.setdefault((stream, int(w)), set()).add(float(q))
+            return self._call(ast.Name(f"_{stream}_q{int(w)}"), "quantile", [ast.Constant(float(q))])
+        if name in ("ewma", "ewm_std"):
+            self.c.halflives.setdefault(stream, set()).add(float(consts[0]))
+            return self._call(ast.Name(f"_{stream}"), name, [ast.Constant(float(consts[0]))])
+        if not float(consts[0]).is_integer():
+            self.fail(node, f"{name} window must be a whole number of months")
+        self.c.windows.setdefault(stream, set()).add(int(consts[0]))
+        return self._call(ast.Name(f"_{stream}"), name, [ast.Constant(int(consts[0]))])
+
+    @staticmethod
+    def _call(obj, attr: str, args):
+        return ast.Call(ast.Attribute(obj, attr, ast.Load()), args, [])
+
+    def _np(self, fn: str, args):
+        return self._call(ast.Name("np"), fn, args)
+
+    def _fold(self, fn: str, args):
+        # np.minimum(a, b, c) would write into c, so n-ary min/max nest pairwise
+        out = args[0]
+        for a in args[1:]:
+            out = self._np(fn, [out, a])
+        return out
+
+
+def _feed_names(c: CompiledPolicy) -> List[str]:
+    names = [f"_{s}" for s in STREAMS if s in c.windows or s in c.halflives]
+    return names + [f"_{s}_q{w}" for s, w in sorted(c.quantiles)]
+
+
+@lru_cache(maxsize=None)
+def compile_policy(policy: Policy) -> CompiledPolicy:
+    """Check a policy's expressions and generate its kernel."""
+    c = CompiledPolicy(policy, None, "")
+    exprs = []
+    for clause in CLAUSES:
+        text = getattr(policy, clause)
+        try:
+            tree = ast.parse(text, mode="eval")
+        except SyntaxError as e:
+            raise PolicyError(f"{policy.name!r} {clause}: {e.msg} in {text!r}") from None
+        exprs.append(ast.unparse(ast.fix_missing_locations(_Translate(c, clause).visit(tree))))
+
+    lines = [f"def kernel({', '.join(STREAMS + STATE)}, feeds):"]
+    lines += [f"    {f} = feeds[{f!r}]" for f in _feed_names(c)]
+    lines += ["    return ("] + [f"        {e},  # {clause}" for clause, e in zip(CLAUSES, exprs)] + ["    )"]
+    c.source = "\n".join(lines)
+    namespace = {"np": np}
+    exec(compile(c.source, f"<policy {policy.name}>", "exec"), namespace)
+    c.kernel = namespace["kernel"]
+    return c
+
+
+def make_feeds(compiled: Sequence[CompiledPolicy], n: int) -> dict:
+    """One RollingStats per stream and one sketch per (stream, quantile window), covering every policy."""
+    feeds = {}
+    for s in STREAMS:
+        windows = set().union(*(c.windows.get(s, ()) for c in compiled))
+        halflives = set().union(*(c.halflives.get(s, ()) for c in compiled))
+        if windows or halflives:
+            feeds[f"_{s}"] = RollingStats(n, windows=sorted(windows) or (1,), halflives=sorted(halflives))
+    for key in sorted(set().union(*(c.quantiles for c in compiled))):
+        qs = set().union(*(c.quantiles.get(key, ()) for c in compiled))
+        feeds[f"_{key[0]}_q{key[1]}"] = WindowedQuantiles(n, key[1], sorted(qs), **SKETCH)
+    return feeds
+
+
+# ============================================================
+# ENGINE
+# ============================================================
+
+def run_policies(policies: Sequence[Policy], revenues: np.ndarray, initial_tvl: float = 5000.0,
+                 vault_retention: float = VAULT_RETENTION) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Run every policy over a (paths, months) revenue array with governance_mc's
+    accounting. Returns {policy: {"nav", "drawdown", "spent"}} per path.
+    """
+    compiled = [compile_policy(p) for p in policies]
+    n_paths, n_months = revenues.shape
+    feeds = make_feeds(compiled, n_paths)
+    total_shares = float(initial_tvl)  # $1/share initial
+    state = {c.name: {"balance": np.full(n_paths, float(initial_tvl)), "profit": np.zeros(n_paths),
+                      "last_spend": np.zeros(n_paths), "spent": np.zeros(n_paths),
+                      "peak": np.full(n_paths, 1.0), "drawdown": np.zeros(n_paths)}
+             for c in compiled}
+    last_income = np.zeros(n_paths)
+
+    for m in range(n_months):
+        rev = revenues[:, m]
+        income = rev * vault_retention
+        for name, feed in feeds.items():
+            feed.update(rev if name.startswith("_rev") else income)
+        for c in compiled:
+            s = state[c.name]
+            balance = s["balance"]
+            burn = s["last_spend"] - last_income
+            with np.errstate(divide="ignore", invalid="ignore"):
+                runway = np.where(burn > 0, balance / burn, np.inf)
+                budget, floor, cap, reserve = c.kernel(rev, income, balance, balance / total_shares, s["profit"],
+                                                       runway, s["last_spend"], m + 1, feeds)
+            spend = np.fmin(np.fmax(budget, floor), cap)
+            spend = np.fmax(np.fmin(spend, balance - reserve), 0.0)
+
+            s["balance"] = balance + income - spend
+            s["profit"] = s["profit"] + income - spend
+            s["last_spend"] = spend
+            s["spent"] += spend
+            nav = s["balance"] / total_shares
+            np.maximum(s["peak"], nav, out=s["peak"])
+            np.maximum(s["drawdown"], 1.0 - nav / s["peak"], out=s["drawdown"])
+        last_income = income
+
+    return {name: {"nav": s["balance"] / total_shares, "drawdown": s["drawdown"], "spent": s["spent"]}
+            for name, s in state.items()}
+
+
+# ============================================================
+# MONTE CARLO AND RANKING
+# ============================================================
+
+def _run_chunk(args) -> Dict[Policy, Dict[str, np.ndarray]]:
+    process, seed_seq, n_paths, n_months, initial_tvl, policies = args
+    rng = np.random.default_rng(seed_seq)
+    out = run_policies(policies, process.sample(rng, n_paths, n_months), initial_tvl)
+    return {p: out[p.name] for p in policies}
+
+
+def policy_monte_carlo(policies: Sequence[Policy], process=None, n_paths: int = 100_000, n_months: int = 36,
+                       initial_tvl: float = 5000.0, seed: int = 0, workers: int = 1,
+                       chunk_size: int = 25_000, cache: Optional[ResultCache] = None) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Per-path results for every policy over sampled revenue; workers=1 runs
+    in-process. With a ResultCache each (chunk, policy) is cached on its own,
+    so a rerun computes only new or edited policies and new chunks.
+    """
+    process = process or LognormalRevenue()
+    cache = cache if cache is not None else ResultCache.from_env()
+    for p in policies:
+        compile_policy(p)  # report bad expressions before sampling anything
+    sizes = _chunk_sizes(n_paths, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(process, s, n, n_months, initial_tvl) for s, n in zip(seeds, sizes)]
+    parts = cache.map_items(_run_chunk, jobs, policies, workers)
+    return {p.name: {k: np.concatenate([part[p][k] for part in parts]) for k in parts[0][p]}
+            for p in policies}
+
+
+def rank_policies(results: Dict[str, Dict[str, np.ndarray]], n_months: int,
+                  risk_aversion: float = 2.0) -> List[dict]:
+    """Summary rows sorted by certainty-equivalent annual log NAV growth, best first."""
+    years = n_months / 12
+    rows = []
+    for name, r in results.items():
+        g = np.log(np.maximum(r["nav"], 1e-12)) / years
+        mean, var = g.mean(), g.var()
+        rows.append({
+            "policy": name,
+            "score": mean - risk_aversion / 2 * var,
+            "growth": mean,
+            "vol": np.sqrt(var),
+            "nav_p5": np.percentile(r["nav"], 5),
+            "nav_p50": np.median(r["nav"]),
+            "p_loss": np.mean(r["nav"] < 1.0),
+            "drawdown_p95": np.percentile(r["drawdown"], 95),
+            "spend": r["spent"].mean() / n_months,
+        })
+    return sorted(rows, key=lambda row: row["score"], reverse=True)
+
+
+def print_ranking(rows: List[dict]) -> None:
+    print(f"{'#':>2} {'Policy':<38} {'CE g/yr':>8} {'mean g':>8} {'vol':>7} {'NAV p5':>7} {'NAV p50':>8} "
+          f"{'P(<1)':>7} {'DD p95':>7} {'spend/mo':>9}")
+    print("-" * 108)
+    for i, r in enumerate(rows, 1):
+        print(f"{i:>2} {r['policy']:<38} {r['score']:>8.2%} {r['growth']:>8.2%} {r['vol']:>7.2%} "
+              f"{r['nav_p5']:>7.3f} {r['nav_p50']:>8.3f} {r['p_loss']:>7.1%} {r['drawdown_p95']:>7.1%} "
+              f"{r['spend']:>9.2f}")
+
+
+# ============================================================
+# POLICY LIBRARY
+# ============================================================
+
+POLICIES: Dict[str, Policy] = {p.name: p for p in [
+    # governance_simulation's three models
+    Policy("Fixed Budget ($200/mo)", "200"),
+    Policy("Revenue-Linked (60% of trailing rev)", f"mean(rev, 3) * {VAULT_RETENTION} * 0.6"),
+    Policy("Milestone (unlock on profit)", "clip(profit * 0.1, 100, 300)"),
+    # candidates
+    Policy("60% of income, 6m", "0.6 * mean(income, 6)"),
+    Policy("90% of income, 12m", "0.9 * mean(income, 12)"),
+    Policy("60% of EWMA income (3m hl)", "0.6 * ewma(income, 3)"),
+    Policy("Income mean - 1 std (6m)", "max(mean(income, 6) - std(income, 6), 0)"),
+    Policy("p25 income (12m)", "quantile(income, 0.25, 12)"),
+    Policy("60% of income, $20 hosting floor", "0.6 * mean(income, 3)", floor="20"),
+    Policy("Income, halved below NAV 1", "mean(income, 3) * (1 if nav >= 1 else 0.5)"),
+    Policy("$200, income only under 24m runway", "where(runway < 24, mean(income, 3), 200)"),
+    Policy("$200 above a $4,000 reserve", "200", reserve="4000"),
+    Policy("Income + 10% of surplus over $5k", "mean(income, 3) + 0.1 * max(balance - 5000, 0)",
+           cap="0.1 * balance"),
+]}
+
+
+if __name__ == "__main__":
+    print("=" * 108)
+    print("GOVERNANCE POLICY DSL: expressions compiled to NumPy kernels")
+    print("=" * 108)
+
+    example = POLICIES["$200, income only under 24m runway"]
+    print(f"\n--- Generated kernel for {example.name!r} ---")
+    print(compile_policy(example).source)
+    try:
+        compile_policy(Policy("bad", "mean(balance, 3)"))
+    except PolicyError as e:
+        print(f"\nRejected: {e}")
+
+    print("\n--- Check: the three governance_simulation models against governance_mc.run_governance ---")
+    revenues = RegimeSwitchRevenue().sample(np.random.default_rng(7), 100_000, 36)
+    ours = run_policies(list(POLICIES.values())[:3], revenues)
+    for name, fn in GOVERNANCE_MODELS.items():
+        ref = run_governance(revenues, fn)
+        print(f"  {name:<38} max |NAV diff| {np.max(np.abs(ours[name]['nav'] - ref['nav'])):.1e}, "
+              f"max |drawdown diff| {np.max(np.abs(ours[name]['drawdown'] - ref['drawdown'])):.1e}")
+
+    n_paths, n_months = 200_000, 36
+    for label, process in [("Lognormal with 3%/mo chance revenue dies", RegimeSwitchRevenue()),
+                           ("Geometric walk, +2%/mo drift, 25% vol", GeometricRevenue())]:
+        t0 = time.perf_counter()
+        results = policy_monte_carlo(list(POLICIES.values()), process, n_paths, n_months, seed=42)
+        elapsed = time.perf_counter() - t0
+        cells = len(POLICIES) * n_paths * n_months
+        print(f"\n### {label}: {len(POLICIES)} policies x {n_paths:,} paths x {n_months} months "
+              f"({elapsed:.2f}s, {cells / elapsed / 1e6:.0f}M policy-path-months/s)")
+        print("Ranked by certainty-equivalent annual log NAV growth (risk aversion 2); spend is $/mo per vault")
+        print_ranking(rank_policies(results, n_months))
+    print()
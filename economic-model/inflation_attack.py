@@ -0,0 +1,167 @@
+"""
+First-Depositor Inflation Attack Simulator
+
+Numeric companion to `inflation_attack_analysis` in simulate.py. One attack
+is five integer vault ops in micro-USDC:
+
+  1. attacker makes the first deposit (`seed`); `dead` of the minted
+     shares go to a burn address
+  2. attacker transfers `donation` straight to the vault token account
+  3. victim deposits `victim`, shares rounded down
+  4. attacker withdraws, then the victim withdraws
+
+Each grid cell is one VaultBatchMicro vault, so a chunk of cells runs as
+five vectorized ops with exactly the on-chain rounding. The
+virtual offset (virtual shares = virtual assets = `offset`) is set per vault.
+The grid is a param_sweep.ParameterGrid walked along the donation axis.
+Per combination of the other parameters, only the attacker's best donation
+is kept: its profit, the victim's loss and the donation size.
+"""
+
+import time
+
+import numpy as np
+
+from fixed_point import MICRO
+from invariants import checking
+from param_sweep import ParameterGrid
+from vault_batch import VaultBatchMicro
+
+
+AXES = ("seed", "donation", "victim", "offset", "dead")
+
+
+def attack(seed, donation, victim, offset=0, dead=0) -> dict:
+    """
+    Run the attack once per element (arguments broadcast, micro-USDC).
+    Cells where the seed does not exceed the dead shares are invalid, and
+    their P&L is zero.
+    """
+    seed, donation, victim, offset, dead = (a.ravel() for a in np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.int64) for x in (seed, donation, victim, offset, dead))))
+    n = seed.size
+    b = VaultBatchMicro(n, virtual_shares=offset, virtual_assets=offset)
+    attacker = b.deposit(seed) - dead
+    valid = attacker > 0
+    b.donate(donation)
+    victim_shares = b.deposit(victim)
+
+    attacker_out = np.zeros(n, dtype=np.int64)
+    attacker_out[valid] = b.withdraw(attacker[valid], idx=valid)
+    victim_out = np.zeros(n, dtype=np.int64)
+    held = valid & (victim_shares > 0)
+    victim_out[held] = b.withdraw(victim_shares[held], idx=held)
+
+    profit = np.where(valid, attacker_out - seed - donation, 0)
+    loss = np.where(valid, victim - victim_out, 0)
+    return {"profit": profit, "victim_loss": loss, "victim_shares": victim_shares, "valid": valid}
+
+
+def attack_surface(grid: ParameterGrid, chunk_cells: int = 1 << 20) -> dict:
+    """
+    Attacker's best donation for every (seed, victim, offset, dead) cell,
+    with the resulting profit and victim loss in micro-USDC, plus
+    `grief_ratio`: the most victim loss per unit the attacker gives up at
+    any donation (inf where the loss comes at no cost).
+    """
+    assert set(grid.axes) == set(AXES), f"Grid axes must be {AXES}"
+    others = [n for n in grid.axes if n != "donation"]
+    other_shape = tuple(grid.axes[n].size for n in others)
+    donations = grid.axes["donation"].astype(np.int64)
+    rows = int(np.prod(other_shape))
+    best_profit = np.empty(rows, dtype=np.int64)
+    best_donation = np.empty(rows, dtype=np.int64)
+    best_loss = np.empty(rows, dtype=np.int64)
+    grief = np.empty(rows, dtype=np.float64)
+    profitable = 0
+
+    for sl, params in grid.chunks("donation", chunk_cells):
+        shape = (sl.stop - sl.start, donations.size)
+        r = attack(**{k: np.broadcast_to(v, shape) for k, v in params.items()})
+        profit = r["profit"].reshape(shape)
+        j = profit.argmax(axis=1)
+        k = np.arange(shape[0])
+        best_profit[sl] = profit[k, j]
+        best_donation[sl] = donations[j]
+        loss = r["victim_loss"].reshape(shape)
+        best_loss[sl] = loss[k, j]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(loss > 0, loss / -np.minimum(profit, 0), 0.0)
+        grief[sl] = ratio.max(axis=1)
+        profitable += int(np.count_nonzero(profit > 0))
+
+    return {
+        "axes": others,
+        "profit": best_profit.reshape(other_shape),
+        "donation": best_donation.reshape(other_shape),
+        "victim_loss": best_loss.reshape(other_shape),
+        "grief_ratio": grief.reshape(other_shape),
+        "profitable_fraction": profitable / grid.size,
+        "cells": grid.size,
+    }
+
+
+def default_grid(scale: int = 1) -> ParameterGrid:
+    """Donations and victims from $1 to $1M, offsets from none to 1e9 micro-units."""
+    return ParameterGrid(
+        seed=np.array([1, 1_001, 10 * MICRO]),
+        victim=np.round(np.logspace(0, 6, 25 * scale) * MICRO),
+        offset=np.concatenate([[0], 10.0 ** np.arange(0, 10)]),
+        dead=np.array([0, 1_000]),
+        donation=np.concatenate([[0], np.round(np.logspace(0, 6, 400 * scale) * MICRO)]),
+    )
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("FIRST-DEPOSITOR INFLATION ATTACK: profit surfaces over donation, victim, offset")
+    print("=" * 80)
+
+    grid = default_grid(2)
+    with checking() as chk:
+        t0 = time.perf_counter()
+        out = attack_surface(grid)
+        elapsed = time.perf_counter() - t0
+    print(f"\n  {out['cells']:,} attack configurations in {elapsed:.2f}s "
+          f"({out['cells'] / elapsed / 1e6:.1f}M/s), NAV-drop violations: {len(chk.violations)}")
+    print(f"  Profitable configurations: {out['profitable_fraction']:.2%}")
+
+    ax = grid.axes
+    victims = ax["victim"]
+    cols = [int(np.argmin(abs(victims - v * MICRO))) for v in (10, 100, 1_000, 10_000, 100_000, 1_000_000)]
+    header = "".join(f"{victims[c] / MICRO:>14,.0f}" for c in cols)
+
+    def table(title, corner, labels, values, fmt):
+        print(f"\n--- {title} ---")
+        print(f"{corner:>18}" + header)
+        for label, row in zip(labels, values):
+            print(f"{label:>18}" + "".join(fmt(row[c]) for c in cols))
+
+    money = lambda x: f"{x / MICRO:>14,.2f}"
+    ratio = lambda x: f"{'free':>14}" if np.isinf(x) else f"{x:>14.2e}"
+    offsets = [f"{o:,.0f}" for o in ax["offset"]]
+
+    table("Best attacker profit ($), seed 1 micro-USDC, no dead shares", "offset / victim $",
+          offsets, out["profit"][0, :, :, 0].T, money)
+    table("Victim loss per $1 the attacker burns (griefing), seed 1 micro-USDC", "offset / victim $",
+          offsets, out["grief_ratio"][0, :, :, 0].T, ratio)
+    table("Best attacker profit ($), seed 1,001 micro-USDC, 1,000 dead shares", "offset / victim $",
+          offsets, out["profit"][1, :, :, 1].T, money)
+    table("Best attacker profit ($) by seed (min first deposit), no offset, no dead shares",
+          "seed $ / victim $", [f"{s / MICRO:,.6f}" for s in ax["seed"]], out["profit"][:, :, 0, 0], money)
+
+    print("\n--- Smallest offset with no profitable donation for any victim ---")
+    for s, seed in enumerate(ax["seed"]):
+        for d, dead in enumerate(ax["dead"]):
+            if seed <= dead:
+                continue
+            safe = np.flatnonzero((out["profit"][s, :, :, d] <= 0).all(axis=0))
+            label = f"{ax['offset'][safe[0]]:,.0f}" if safe.size else "none in grid"
+            print(f"  seed ${seed / MICRO:,.6f}, {int(dead):>5} dead shares: {label}")
+
+    worst = np.unravel_index(out["profit"].argmax(), out["profit"].shape)
+    print(f"\n  Worst case: profit ${out['profit'][worst] / MICRO:,.2f} from a "
+          f"${out['donation'][worst] / MICRO:,.2f} donation against a "
+          f"${victims[worst[1]] / MICRO:,.2f} victim (offset {ax['offset'][worst[2]]:,.0f}, "
+          f"{int(ax['dead'][worst[3]])} dead shares)")
+    print()
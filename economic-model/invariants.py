@@ -0,0 +1,224 @@
+"""
+Model Invariants
+
+Invariants are declared once per model class in an `INVARIANTS` tuple and
+enforced by whichever InvariantChecker is active, at one of four levels:
+
+  off          never check
+  sampled      check every Nth model op
+  end_of_step  check only when the scenario calls end_step(...)
+  always       check after every model op
+
+Three kinds of invariant:
+  bound          measure(model) <= tol                       (e.g. floor liability - pool)
+  conserved      measure unchanged by the listed ops         (e.g. NAV across deposit/withdraw)
+  nondecreasing  measure never drops below its last value    (e.g. k for Option B)
+
+Conserved invariants are op-relative, so end_of_step only evaluates the other
+two. Nondecreasing values are remembered per live model (weakly referenced,
+so a new model that reuses a dead one's id starts fresh). Violations are collected as Violation records; strict=True raises
+AssertionError instead, like the inline asserts these checks replace.
+
+The default level comes from BLOCKHELIX_INVARIANTS, e.g. "always",
+"sampled:1000", "end_of_step", "off", optionally with ",strict". Unset means
+"always", collecting.
+"""
+
+import functools
+import os
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+OFF = "off"
+SAMPLED = "sampled"
+END_OF_STEP = "end_of_step"
+ALWAYS = "always"
+LEVELS = (OFF, SAMPLED, END_OF_STEP, ALWAYS)
+
+BOUND = "bound"
+CONSERVED = "conserved"
+NONDECREASING = "nondecreasing"
+
+
+@dataclass(frozen=True)
+class Invariant:
+    name: str
+    measure: Callable
+    kind: str = BOUND
+    tol: float = 0.0
+    rel_tol: float = 0.0
+    ops: Tuple[str, ...] = ()          # conserved: ops that must leave measure unchanged
+    guard: Optional[Callable] = None   # skip when guard(model) is False (evaluated post-op)
+    distance: Optional[Callable] = None  # conserved: (model, before, after) -> drift; default |after - before|
+
+
+@dataclass
+class Violation:
+    model: str
+    invariant: str
+    op: str
+    op_index: int
+    value: float       # observed drift / excess / drop
+    tol: float
+
+
+_plans: Dict[Tuple[type, str], Tuple[tuple, tuple]] = {}
+
+
+def _plan(cls: type, op: str) -> Tuple[tuple, tuple]:
+    """(conserved invariants for this op, state invariants) for a model class, cached."""
+    plan = _plans.get((cls, op))
+    if plan is None:
+        invs = getattr(cls, "INVARIANTS", ())
+        plan = _plans[(cls, op)] = (
+            tuple(inv for inv in invs if inv.kind == CONSERVED and op in inv.ops),
+            tuple(inv for inv in invs if inv.kind != CONSERVED),
+        )
+    return plan
+
+
+# ============================================================
+# CHECKER
+# ============================================================
+
+class InvariantChecker:
+    def __init__(self, level: str = ALWAYS, every: int = 100, strict: bool = False):
+        assert level in LEVELS, f"Unknown invariant level: {level}"
+        self.level = level
+        self.every = every
+        self.strict = strict
+        self.op_count = 0
+        self.checks = 0
+        self.violations: List[Violation] = []
+        self._last: Dict[int, Tuple[weakref.ref, Dict[str, float]]] = {}   # id -> (model ref, values)
+
+    @classmethod
+    def from_env(cls, var: str = "BLOCKHELIX_INVARIANTS") -> "InvariantChecker":
+        spec = os.environ.get(var, ALWAYS)
+        parts = [p.strip() for p in spec.split(",") if p.strip()]
+        strict = "strict" in parts
+        level, _, every = (parts[0] if parts and parts[0] != "strict" else ALWAYS).partition(":")
+        return cls(level, int(every) if every else 100, strict)
+
+    def before(self, model, op: str):
+        """Called before an op; returns a context if this op will be checked."""
+        self.op_count += 1
+        if self.level == ALWAYS or (self.level == SAMPLED and self.op_count % self.every == 0):
+            conserved, _ = _plan(type(model), op)
+            return [(inv, inv.measure(model)) for inv in conserved]
+        return None
+
+    def after(self, model, op: str, ctx) -> None:
+        self.checks += 1
+        for inv, before in ctx:
+            if inv.guard is not None and not inv.guard(model):
+                continue
+            after = inv.measure(model)
+            drift = inv.distance(model, before, after) if inv.distance else abs(after - before)
+            if drift > inv.tol:
+                self._violate(model, inv, op, drift)
+        self._check_state(model, op)
+
+    def end_step(self, *models) -> None:
+        if self.level == OFF:
+            return
+        self.checks += 1
+        for m in models:
+            self._check_state(m, "end_of_step")
+
+    def _check_state(self, model, op: str) -> None:
+        for inv in _plan(type(model), op)[1]:
+            if inv.guard is not None and not inv.guard(model):
+                continue
+            value = inv.measure(model)
+            if inv.kind == BOUND:
+                if value > inv.tol:
+                    self._violate(model, inv, op, value)
+            else:
+                seen = self._remembered(model)
+                last = seen.get(inv.name)
+                if last is not None and value < last - inv.tol - inv.rel_tol * abs(last):
+                    self._violate(model, inv, op, last - value)
+                seen[inv.name] = value
+
+    def _remembered(self, model) -> Dict[str, float]:
+        key = id(model)
+        entry = self._last.get(key)
+        if entry is None or entry[0]() is not model:
+            entry = self._last[key] = (weakref.ref(model, functools.partial(self._drop, key)), {})
+        return entry[1]
+
+    def _drop(self, key: int, ref: weakref.ref) -> None:
+        entry = self._last.get(key)
+        if entry is not None and entry[0] is ref:
+            del self._last[key]
+
+    def _violate(self, model, inv: Invariant, op: str, value: float) -> None:
+        v = Violation(type(model).__name__, inv.name, op, self.op_count, float(value), inv.tol)
+        if self.strict:
+            raise AssertionError(f"{v.model}.{v.invariant} violated after {op}: {v.value} > {v.tol}")
+        self.violations.append(v)
+
+    def forget(self, model) -> None:
+        """Drop remembered nondecreasing values for `model` (after a restore)."""
+        self._last.pop(id(model), None)
+
+    def summary(self) -> Dict[Tuple[str, str], int]:
+        counts: Dict[Tuple[str, str], int] = {}
+        for v in self.violations:
+            counts[(v.model, v.invariant)] = counts.get((v.model, v.invariant), 0) + 1
+        return counts
+
+    def reset(self) -> None:
+        self.op_count = 0
+        self.checks = 0
+        self.violations.clear()
+        self._last.clear()
+
+
+_active = InvariantChecker.from_env()
+
+
+def active() -> InvariantChecker:
+    return _active
+
+
+def set_checker(checker: InvariantChecker) -> InvariantChecker:
+    global _active
+    prev, _active = _active, checker
+    return prev
+
+
+@contextmanager
+def checking(level: str = ALWAYS, every: int = 100, strict: bool = False):
+    """Run a block under its own checker; yields it so violations can be read."""
+    chk = InvariantChecker(level, every, strict)
+    prev = set_checker(chk)
+    try:
+        yield chk
+    finally:
+        set_checker(prev)
+
+
+def end_step(*models) -> None:
+    _active.end_step(*models)
+
+
+def checked(fn):
+    """Check the model's declared INVARIANTS around this op at the active level."""
+    op = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        chk = _active
+        if chk.level == OFF or chk.level == END_OF_STEP:
+            return fn(self, *args, **kwargs)
+        ctx = chk.before(self, op)
+        out = fn(self, *args, **kwargs)
+        if ctx is not None:
+            chk.after(self, op, ctx)
+        return out
+    return wrapper
@@ -0,0 +1,213 @@
+"""
+Agent-Based Market Simulator
+
+Drives the bonding-curve options with a population of traders instead of the
+hand-scripted Alice/Bob/Charlie buyers. Four trader types:
+
+  momentum   buys after the price rose over a lookback window, sells after it fell
+  floor_arb  Option A's leak: on a fee-less curve a buy/sell round trip is free,
+             and new buyers inherit the floor, so any floor > 0 is an edge.
+             Buys while flat, exits once curve + floor clears cost basis
+  mev        front-runs scheduled revenue: buys the step before, sells the step after
+  holder     buys once at a random entry step and holds, with a small exit hazard
+
+Traders are columns of arrays (type, cash, tokens, cost basis). Each step
+every trader's decision is one vectorized mask; the step's sells then buys go
+through the model's sell_batch/buy_batch in a single call each, so the cost
+per step is a handful of NumPy ops regardless of population size.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+
+from bonding_curves import (BondingCurveBuybackBurn, BondingCurveFloorA, BondingCurveFloorAFixed,
+                            BondingCurveFloorB, BondingCurveFloorBRatchet)
+
+
+MOMENTUM, FLOOR_ARB, MEV, HOLDER = range(4)
+TRADER_TYPES = ("momentum", "floor_arb", "mev", "holder")
+
+MODELS = {
+    "A": BondingCurveFloorA,
+    "A-Fix": BondingCurveFloorAFixed,
+    "B": BondingCurveFloorB,
+    "B-Ratchet": BondingCurveFloorBRatchet,
+    "C": BondingCurveBuybackBurn,
+}
+
+
+@dataclass
+class MarketConfig:
+    population: Dict[str, int] = field(default_factory=lambda: {
+        "momentum": 4000, "floor_arb": 1000, "mev": 500, "holder": 4500})
+    steps: int = 1000
+    cash_mean: float = 5.0         # lognormal starting USDC per trader (~$50k across 10k traders;
+                                   # the default curve sells out at ~$88k)
+    cash_cv: float = 1.0
+    activity: float = 0.05         # chance a momentum trader looks at the market in a step
+    lookback: int = 24
+    momentum_threshold: float = 0.02
+    trade_fraction: float = 0.25   # share of cash (buys) / tokens (sells) per trade
+    arb_floor_ratio: float = 0.0   # floor_arb buys when floor > ratio * curve price
+    take_profit: float = 0.0
+    holder_exit_hazard: float = 1e-4
+    revenue_every: int = 30        # steps between revenue events
+    revenue_mean: float = 1000.0
+    revenue_cv: float = 0.5
+    seed: int = 0
+
+
+# ============================================================
+# ENGINE
+# ============================================================
+
+def _floor(model) -> float:
+    return getattr(model, "cumulative_revenue_per_share", 0.0)
+
+
+def run_market(model, cfg: Optional[MarketConfig] = None) -> dict:
+    cfg = cfg or MarketConfig()
+    rng = np.random.default_rng(cfg.seed)
+
+    kind = np.concatenate([np.full(cfg.population.get(name, 0), code, dtype=np.int8)
+                           for code, name in enumerate(TRADER_TYPES)])
+    n = kind.size
+    sigma2 = np.log1p(cfg.cash_cv ** 2)
+    cash = rng.lognormal(np.log(cfg.cash_mean) - sigma2 / 2, np.sqrt(sigma2), n)
+    start_cash = cash.copy()
+    tokens = np.zeros(n)
+    basis = np.zeros(n)  # USDC paid for tokens currently held
+    entry_step = np.where(kind == HOLDER, rng.integers(0, max(cfg.steps // 2, 1), n), -1)
+
+    is_mom, is_arb, is_mev, is_hold = (kind == k for k in range(4))
+    mev_idx = np.flatnonzero(is_mev)
+
+    price = np.empty(cfg.steps)
+    floor = np.empty(cfg.steps)
+    surplus = np.full(cfg.steps, np.nan)  # revenue pool - floor liability (Option A family)
+    volume = np.zeros(cfg.steps)
+    unfilled = np.zeros(cfg.steps)  # tokens refused by a clamped sell
+
+    for t in range(cfg.steps):
+        p = model.virtual_usdc_reserve / model.virtual_token_reserve
+        f = _floor(model)
+        past = price[t - cfg.lookback] if t >= cfg.lookback else p
+        ret = p / past - 1.0
+        rev_next = (t + 1) % cfg.revenue_every == 0
+        rev_prev = t % cfg.revenue_every == 0 and t > 0
+
+        u = rng.random(n)
+        holding = tokens > 0
+        has_cash = cash > 1.0
+
+        sell = np.zeros(n, dtype=bool)
+        buy = np.zeros(n, dtype=bool)
+        if ret < -cfg.momentum_threshold:
+            sell |= is_mom & holding & (u < cfg.activity)
+        elif ret > cfg.momentum_threshold:
+            buy |= is_mom & has_cash & (u < cfg.activity)
+        if f > 0:
+            value = tokens * (p + f)
+            sell |= is_arb & holding & (value > basis * (1 + cfg.take_profit))
+            if f > cfg.arb_floor_ratio * p:
+                buy |= is_arb & has_cash & ~holding
+        if rev_prev:
+            sell |= is_mev & holding
+        if rev_next:
+            buy |= is_mev & has_cash
+        sell |= is_hold & holding & (u < cfg.holder_exit_hazard)
+        buy |= is_hold & has_cash & (entry_step == t)
+
+        # Sells first (random order), then buys with MEV at the front of the queue
+        s_idx = rng.permutation(np.flatnonzero(sell))
+        if s_idx.size:
+            full_exit = is_mev[s_idx] | is_hold[s_idx] | is_arb[s_idx]
+            qty = np.where(full_exit, tokens[s_idx], tokens[s_idx] * cfg.trade_fraction)
+            r = model.sell_batch(qty)
+            qty = r["tokens_in"]  # less than asked once B-Ratchet hits its minimum
+            unfilled[t] += r.get("tokens_unfilled", np.zeros(0)).sum()
+            held = tokens[s_idx]
+            cash[s_idx] += r["usdc_out"]
+            basis[s_idx] *= 1.0 - qty / held
+            tokens[s_idx] -= qty
+            volume[t] += r["usdc_out"].sum()
+
+        b_all = np.flatnonzero(buy & ~sell)
+        if b_all.size:
+            front = np.isin(b_all, mev_idx, assume_unique=True) if rev_next else np.zeros(b_all.size, bool)
+            b_idx = np.concatenate((b_all[front], rng.permutation(b_all[~front])))
+            spend = np.where(is_hold[b_idx] | is_mev[b_idx], cash[b_idx], cash[b_idx] * cfg.trade_fraction)
+            r = model.buy_batch(spend)
+            paid = r["usdc_in"]
+            cash[b_idx] -= paid
+            tokens[b_idx] += r["tokens_out"]
+            basis[b_idx] += paid
+            volume[t] += paid.sum()
+
+        if rev_next:
+            rs2 = np.log1p(cfg.revenue_cv ** 2)
+            model.receive_revenue(float(rng.lognormal(np.log(cfg.revenue_mean) - rs2 / 2, np.sqrt(rs2))))
+
+        price[t] = model.virtual_usdc_reserve / model.virtual_token_reserve
+        floor[t] = _floor(model)
+        if hasattr(model, "revenue_pool"):
+            surplus[t] = model.revenue_pool - model.tokens_sold * model.cumulative_revenue_per_share
+
+    # Mark to market at spot (curve + floor), no price impact
+    mark = price[-1] + floor[-1]
+    pnl = cash + tokens * mark - start_cash
+    return {
+        "price": price, "floor": floor, "solvency_surplus": surplus, "volume": volume,
+        "kind": kind, "pnl": pnl, "roi": pnl / start_cash, "unfilled": unfilled, "tokens": tokens,
+    }
+
+
+def pnl_percentiles(result: dict, percentiles=(5, 25, 50, 75, 95)) -> Dict[str, np.ndarray]:
+    out = {}
+    for code, name in enumerate(TRADER_TYPES):
+        roi = result["roi"][result["kind"] == code]
+        if roi.size:
+            out[name] = np.percentile(roi, percentiles)
+    return out
+
+
+if __name__ == "__main__":
+    cfg = MarketConfig(steps=2000)
+    print("=" * 90)
+    print(f"AGENT-BASED MARKET: {sum(cfg.population.values()):,} traders x {cfg.steps:,} steps")
+    print("=" * 90)
+    final = {}
+    for label, Model in MODELS.items():
+        t0 = time.perf_counter()
+        model = Model()
+        r = run_market(model, cfg)
+        final[label] = (model, r["tokens"])
+        elapsed = time.perf_counter() - t0
+        worst = np.nanmin(r["solvency_surplus"]) if not np.all(np.isnan(r["solvency_surplus"])) else None
+        print(f"\n--- Option {label} ({elapsed:.2f}s, volume ${r['volume'].sum():,.0f}) ---")
+        print(f"  Price: start {r['price'][0]:.8f}, min {r['price'].min():.8f}, "
+              f"max {r['price'].max():.8f}, end {r['price'][-1]:.8f}")
+        print(f"  Floor at end: {r['floor'][-1]:.8f}")
+        if worst is not None:
+            print(f"  Worst pool - liability: ${worst:,.2f} ({'BACKED' if worst >= -0.01 else 'INSOLVENT'})")
+        if r["unfilled"].any():
+            print(f"  Sells clamped at the ratchet: {np.count_nonzero(r['unfilled'])} steps, "
+                  f"{r['unfilled'].sum():,.0f} tokens returned unfilled")
+        print(f"  {'ROI by type':<12}" + "".join(f"{'p' + str(p):>10}" for p in (5, 25, 50, 75, 95)))
+        for name, q in pnl_percentiles(r).items():
+            print(f"  {name:<12}" + "".join(f"{v:>10.1%}" for v in q))
+
+    print("\n--- Sell-off after the run: every remaining holder exits in one stream ---")
+    rng = np.random.default_rng(1)
+    for label in ("B", "B-Ratchet"):
+        model, held = final[label]
+        order = rng.permutation(np.flatnonzero(held > 0))
+        p0 = model.curve_price
+        r = model.sell_batch(held[order])
+        stuck = r.get("tokens_unfilled", np.zeros(1)).sum()
+        print(f"  Option {label:<10} paid ${r['usdc_out'].sum():>10,.2f} for {r['tokens_in'].sum():>14,.0f} tokens, "
+              f"price {p0:.8f} -> {model.curve_price:.8f}, unfilled {stuck:,.0f}")
+    print()
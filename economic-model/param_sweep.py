@@ -0,0 +1,170 @@
+"""
+Parameter Sweep Engine
+
+Dense version of the hand-picked loops in `capital_efficiency_model` and
+`optimal_tvl_analysis` (simulate.py). A ParameterGrid holds one 1-D array
+of values per parameter; `sweep` evaluates a vectorized formula over the
+full Cartesian product and returns, for every combination of the other
+parameters, the first value along one chosen axis where each condition
+starts to hold (e.g. the break-even demand).
+
+The grid is never materialized. It is walked in chunks of whole rows along
+the boundary axis: each chunk gets the other parameters as (rows, 1)
+columns and the boundary axis as a (1, L) row, the formula broadcasts to
+(rows, L), and only per-row boundaries and condition counts are kept. Peak
+memory is a few chunk-sized temporaries, so 10^8-cell grids run in a
+fixed footprint.
+"""
+
+import math
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from result_cache import ResultCache
+
+
+USDC_RISK_FREE = 0.05
+MONTHS_PER_YEAR = 12
+
+
+# ============================================================
+# FORMULAS (broadcasting twins of simulate.py)
+# ============================================================
+
+def unit_economics(demand, cost_per_job, price_per_job, vault_retention, hosting,
+                   target_yield, runway) -> Dict[str, np.ndarray]:
+    """
+    Depositor APY with TVL sized at burn_rate x runway (capital_efficiency_model)
+    and the TVL cap from optimal_tvl_analysis:
+      max_tvl = min(burn_rate x runway, net_vault_income x 12 / target_yield)
+    """
+    monthly_cost = demand * cost_per_job + hosting
+    vault_rev = demand * price_per_job * vault_retention
+    net_vault = vault_rev - monthly_cost
+    runway_tvl = monthly_cost * runway
+    with np.errstate(divide="ignore", invalid="ignore"):
+        apy = (1 + net_vault / runway_tvl) ** MONTHS_PER_YEAR - 1
+        yield_cap = np.where(net_vault > 0, net_vault * MONTHS_PER_YEAR / target_yield, 0.0)
+    max_tvl = np.minimum(runway_tvl, yield_cap)
+    return {"net_vault": net_vault, "apy": apy, "max_tvl": max_tvl}
+
+
+CONDITIONS: Dict[str, Callable] = {
+    "net_positive": lambda r: r["net_vault"] > 0,
+    "beats_risk_free": lambda r: r["apy"] > USDC_RISK_FREE,
+}
+
+
+# ============================================================
+# GRID + SWEEP
+# ============================================================
+
+class ParameterGrid:
+    def __init__(self, **axes):
+        self.axes = {name: np.asarray(v, dtype=np.float64).ravel() for name, v in axes.items()}
+        self.shape = tuple(a.size for a in self.axes.values())
+        self.size = math.prod(self.shape)
+
+    def chunks(self, along: str, chunk_cells: int):
+        """Yield (row slice, params) with `along` as a (1, L) row and the other
+        axes as (rows, 1) columns, covering the grid in C order of the others."""
+        line = self.axes[along]
+        others = [n for n in self.axes if n != along]
+        other_shape = tuple(self.axes[n].size for n in others)
+        n_rows = math.prod(other_shape)
+        step = max(1, chunk_cells // line.size)
+        for r0 in range(0, n_rows, step):
+            r1 = min(r0 + step, n_rows)
+            idx = np.unravel_index(np.arange(r0, r1), other_shape)
+            params = {n: self.axes[n][i][:, None] for n, i in zip(others, idx)}
+            params[along] = line[None, :]
+            yield slice(r0, r1), params
+
+
+def _sweep_chunk(fn: Callable, conditions: Dict[str, Callable], params: dict, along: str, n_rows: int) -> dict:
+    """{condition: (first `along` value per row or NaN, cells where it holds)} for one chunk."""
+    line = params[along].ravel()
+    result = fn(**params)
+    out = {}
+    for c, cond in conditions.items():
+        ok = np.broadcast_to(cond(result), (n_rows, line.size))
+        first = ok.argmax(axis=1)
+        any_ok = ok[np.arange(first.size), first]
+        out[c] = (np.where(any_ok, line[first], np.nan), int(np.count_nonzero(ok)))
+    return out
+
+
+def sweep(grid: ParameterGrid, along: str, fn: Callable = unit_economics,
+          conditions: Optional[Dict[str, Callable]] = None, chunk_cells: int = 1 << 20,
+          cache: Optional[ResultCache] = None) -> dict:
+    """
+    For each condition: `boundary`, an array over the other axes holding the
+    first `along` value (in grid order) where it holds, NaN if never, and
+    `fraction`, the share of all cells where it holds. With a ResultCache,
+    chunks whose parameters, formula and conditions were swept before are
+    read back instead of recomputed.
+    """
+    conditions = conditions or CONDITIONS
+    cache = cache if cache is not None else ResultCache.from_env()
+    others = [n for n in grid.axes if n != along]
+    other_shape = tuple(grid.axes[n].size for n in others)
+    line = grid.axes[along]
+    boundary = {c: np.full(math.prod(other_shape), np.nan) for c in conditions}
+    hits = dict.fromkeys(conditions, 0)
+
+    for rows, params in grid.chunks(along, chunk_cells):
+        for c, (b, h) in cache.call(_sweep_chunk, fn, conditions, params, along, rows.stop - rows.start).items():
+            boundary[c][rows] = b
+            hits[c] += h
+
+    return {
+        "axes": others,
+        "boundary": {c: b.reshape(other_shape) for c, b in boundary.items()},
+        "fraction": {c: h / grid.size for c, h in hits.items()},
+        "cells": grid.size,
+    }
+
+
+def default_grid(scale: int = 1) -> ParameterGrid:
+    """Ranges around the simulate.py base case (cost $0.38, price $5, 20% retention, $20 hosting)."""
+    return ParameterGrid(
+        cost_per_job=np.linspace(0.10, 1.00, 10 * scale),
+        price_per_job=np.linspace(1.0, 10.0, 10 * scale),
+        vault_retention=np.linspace(0.05, 0.50, 10),
+        hosting=np.array([0.0, 20.0, 50.0, 100.0]),
+        target_yield=np.array([0.05, 0.10, 0.15, 0.20]),
+        runway=np.array([3.0, 6.0, 12.0]),
+        demand=np.arange(1.0, 1001.0),
+    )
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("PARAMETER SWEEP: break-even demand across the unit-economics space")
+    print("=" * 80)
+
+    for scale in (1, 2):
+        grid = default_grid(scale)
+        t0 = time.perf_counter()
+        out = sweep(grid, along="demand")
+        elapsed = time.perf_counter() - t0
+        print(f"\n  {out['cells']:,} cells in {elapsed:.2f}s "
+              f"({out['cells'] / elapsed / 1e6:.0f}M cells/s)")
+        for c, f in out["fraction"].items():
+            print(f"    {c:<16} holds in {f:.1%} of cells")
+
+    # Slice at the simulate.py base case: retention 20%, hosting $20, 10% target, 6mo runway
+    grid = default_grid(1)
+    out = sweep(grid, along="demand")
+    ax = grid.axes
+    pick = (slice(None), slice(None), int(np.argmin(abs(ax["vault_retention"] - 0.20))), 1, 1, 1)
+    for c in CONDITIONS:
+        b = out["boundary"][c][pick]
+        print(f"\n--- Min demand (jobs/mo) for {c} (retention {ax['vault_retention'][pick[2]]:.0%}, "
+              f"hosting $20, 10% target, 6mo runway) ---")
+        print(f"{'cost/price':>12}" + "".join(f"{p:>7.1f}" for p in ax["price_per_job"]))
+        for i, cost in enumerate(ax["cost_per_job"]):
+            print(f"{cost:>12.2f}" + "".join(f"{'never':>7}" if np.isnan(v) else f"{v:>7.0f}" for v in b[i]))
+    print()
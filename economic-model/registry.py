@@ -0,0 +1,225 @@
+"""
+Model Protocol, Registry and Scenario Runner
+
+Every model the scenarios drive (VaultState and the bonding-curve options)
+exposes the same interface, EconomicModel:
+
+  buy(usdc) -> {"tokens_out", ...}       sell(tokens) -> {"usdc_out", ...}
+  receive_revenue(amount) -> dict        snapshot() / restore(snap)
+  metrics() -> {"price", "floor", "supply", "reserve", "revenue"}
+
+so a scenario can take any of them without hasattr checks or branching on
+labels. MODELS and SCENARIOS map names to "module:attribute" references that
+are only imported when used: this module is stdlib-only, so running one
+vault scenario never loads NumPy or the batched engines. A scenario whose
+reference is "module:__main__" runs that module's demo.
+
+    python registry.py --list
+    python registry.py fee-cascade governance
+    python registry.py 'option-*' -j 3
+    python registry.py worst-case --model A --model B-Ratchet
+
+Selected scenarios run in a process pool, one per worker, with their output
+captured and printed in the order they were asked for.
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import importlib
+import io
+import runpy
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple, runtime_checkable
+
+
+@runtime_checkable
+class EconomicModel(Protocol):
+    def buy(self, usdc_amount: float) -> dict: ...
+
+    def sell(self, token_amount: float) -> dict: ...
+
+    def receive_revenue(self, amount: float) -> dict: ...
+
+    def snapshot(self) -> tuple: ...
+
+    def restore(self, snap: tuple) -> None: ...
+
+    def metrics(self) -> dict: ...
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    name: str
+    ref: str
+    label: str
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    ref: str
+    description: str
+    takes_models: bool = False  # called with models=[(label, cls), ...] when --model is given
+
+
+def _spec(name: str, ref: str, label: str) -> Tuple[str, ModelSpec]:
+    return name, ModelSpec(name, ref, label)
+
+
+def _scenario(name: str, ref: str, description: str, **kw) -> Tuple[str, Scenario]:
+    return name, Scenario(name, ref, description, **kw)
+
+
+MODELS: Dict[str, ModelSpec] = dict([
+    _spec("vault", "simulate:VaultState", "Vault (NAV shares)"),
+    _spec("A", "bonding_curves:BondingCurveFloorA", "Option A (Floor)"),
+    _spec("A-Fix", "bonding_curves:BondingCurveFloorAFixed", "Option A-Fix (Floor)"),
+    _spec("B", "bonding_curves:BondingCurveFloorB", "Option B (Curve shift)"),
+    _spec("B-Ratchet", "bonding_curves:BondingCurveFloorBRatchet", "Option B-Ratchet"),
+    _spec("C", "bonding_curves:BondingCurveBuybackBurn", "Option C (Buyback)"),
+])
+
+SCENARIOS: Dict[str, Scenario] = dict([
+    # vault models (stdlib only)
+    _scenario("share-price", "simulate:simulate_share_price_dynamics", "Share price over a deposit/revenue sequence"),
+    _scenario("free-rider", "simulate:simulate_free_rider", "Free-rider deposit around a revenue event"),
+    _scenario("capital-efficiency", "simulate:capital_efficiency_model", "Capital efficiency by TVL and demand"),
+    _scenario("fee-cascade", "simulate:fee_cascade_analysis", "Fee cascade down an agent chain"),
+    _scenario("governance", "simulate:governance_simulation", "Governance budget models, 12 months"),
+    _scenario("failure-modes", "simulate:failure_mode_analysis", "Failure modes F1-F10"),
+    _scenario("roi", "simulate:comparative_roi", "Depositor ROI against alternatives"),
+    _scenario("inflation", "simulate:inflation_attack_analysis", "First-depositor inflation attack"),
+    _scenario("optimal-tvl", "simulate:optimal_tvl_analysis", "Optimal TVL by revenue"),
+    # bonding curves
+    _scenario("option-a", "bonding-curve-sim:sim_option_a", "6 months of Option A"),
+    _scenario("option-b", "bonding-curve-sim:sim_option_b", "6 months of Option B"),
+    _scenario("option-c", "bonding-curve-sim:sim_option_c", "6 months of Option C"),
+    _scenario("floor-solvency", "bonding-curve-sim:sim_floor_solvency_deep_dive", "Option A when all holders sell"),
+    _scenario("floor-buy-fix", "bonding-curve-sim:sim_floor_with_buy_adjustment", "Option A-Fix buy adjustment"),
+    _scenario("comparison", "bonding-curve-sim:sim_comparison_6month", "Option A vs C over 6 months"),
+    _scenario("worst-case", "bonding-curve-sim:sim_worst_case_buyer", "Buy the top, then panic sell",
+              takes_models=True),
+    # batched engines (NumPy)
+    _scenario("vault-batch", "vault_batch:__main__", "VaultBatch struct-of-arrays demo"),
+    _scenario("governance-mc", "governance_mc:__main__", "Governance Monte Carlo"),
+    _scenario("market", "market_sim:__main__", "Agent-based market over all curve options"),
+    _scenario("exit-search", "exit_search:__main__", "Exit-order search for Option A and A-Fix"),
+    _scenario("revenue-stream", "revenue_stream:__main__", "Event-driven revenue scheduler"),
+    _scenario("param-sweep", "param_sweep:__main__", "Vault unit-economics parameter sweep"),
+    _scenario("fee-graph", "fee_graph:__main__", "Sparse fee cascade over payment graphs"),
+    _scenario("agent-rank", "agent_rank:__main__", "AgentRank network rank"),
+    _scenario("inflation-sweep", "inflation_attack:__main__", "Inflation attack profit surfaces"),
+    _scenario("frontrun", "mev_frontrun:__main__", "F10 front-running optimizer"),
+    _scenario("bank-run", "bank_run:__main__", "Stochastic bank-run simulator"),
+    _scenario("unit-economics", "unit_economics:__main__", "Sampled job costs and demand, APY intervals"),
+    _scenario("governance-policy", "governance_policy:__main__", "Budget policy DSL, ranked by risk-adjusted NAV growth"),
+    _scenario("rolling-stats", "rolling_stats:__main__", "O(1) rolling statistics and daily budgets"),
+    _scenario("result-cache", "result_cache:__main__", "Cached Monte Carlo and sweep chunks, LRU eviction"),
+    _scenario("slashing", "slashing:__main__", "Challenge windows, slashes, deterrence and depositor loss"),
+])
+
+
+# ============================================================
+# LOOKUP
+# ============================================================
+
+def resolve(ref: str):
+    """Import "module:attribute" and return the attribute."""
+    module, _, attr = ref.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def model_class(name: str) -> type:
+    return resolve(MODELS[name].ref)
+
+
+def make_model(name: str, **params) -> EconomicModel:
+    return model_class(name)(**params)
+
+
+def select(patterns: Sequence[str], names) -> List[str]:
+    """Names matching any glob pattern, in pattern order, without repeats."""
+    out = []
+    for pat in patterns:
+        hits = fnmatch.filter(names, pat)
+        if not hits:
+            raise KeyError(f"Nothing matches {pat!r}")
+        out += [n for n in hits if n not in out]
+    return out
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def run_scenario(name: str, models: Optional[Sequence[str]] = None) -> Tuple[str, str, float]:
+    """Run one scenario with its output captured; returns (name, output, seconds)."""
+    scenario = SCENARIOS[name]
+    module, _, attr = scenario.ref.partition(":")
+    buf = io.StringIO()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(buf):
+        if attr == "__main__":
+            runpy.run_module(module, run_name="__main__", alter_sys=True)
+        elif models and scenario.takes_models:
+            resolve(scenario.ref)(models=[(MODELS[m].label, model_class(m)) for m in models])
+        else:
+            resolve(scenario.ref)()
+    return name, buf.getvalue(), time.perf_counter() - t0
+
+
+def _run_job(args) -> Tuple[str, str, float]:
+    return run_scenario(*args)
+
+
+def run_scenarios(names: Sequence[str], models: Optional[Sequence[str]] = None, workers: int = 1):
+    """Yield (name, output, seconds) per scenario in the order given."""
+    jobs = [(n, models) for n in names]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(_run_job, jobs)
+    else:
+        yield from map(_run_job, jobs)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run BlockHelix economic-model scenarios by name.")
+    parser.add_argument("scenarios", nargs="*", help="scenario names or glob patterns")
+    parser.add_argument("--model", "-m", action="append", default=None,
+                        help="model name or pattern for scenarios that take models (repeatable)")
+    parser.add_argument("--workers", "-j", type=int, default=1, help="scenarios run in parallel")
+    parser.add_argument("--list", action="store_true", help="list models and scenarios")
+    parser.add_argument("--quiet", "-q", action="store_true", help="print timings only")
+    args = parser.parse_args(argv)
+
+    if args.list or not args.scenarios:
+        print("Models:")
+        for spec in MODELS.values():
+            print(f"  {spec.name:<12} {spec.label:<24} {spec.ref}")
+        print("\nScenarios:")
+        for s in SCENARIOS.values():
+            print(f"  {s.name:<20} {s.description}{'  [--model]' if s.takes_models else ''}")
+        return 0
+
+    try:
+        names = select(args.scenarios, SCENARIOS)
+        models = select(args.model, MODELS) if args.model else None
+    except KeyError as e:
+        parser.error(e.args[0])
+
+    t0 = time.perf_counter()
+    for name, output, elapsed in run_scenarios(names, models, args.workers):
+        if not args.quiet:
+            sys.stdout.write(output)
+        print(f"[{name}: {elapsed:.2f}s]", file=sys.stderr if not args.quiet else sys.stdout)
+    print(f"[{len(names)} scenario(s) in {time.perf_counter() - t0:.2f}s]",
+          file=sys.stderr if not args.quiet else sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+"""
+Scenario Result Cache
+
+The Monte Carlo and sweep runners recompute every chunk on every run, even
+when a rerun differs from the last one in a single parameter of a single
+model. ResultCache stores each chunk's result on local disk under a
+content address:
+
+    sha256(function, arguments, code version)
+
+  function      module, qualified name and bytecode of the chunk function
+  arguments     hashed structurally: dataclass configs field by field, NumPy
+                arrays by dtype, shape and bytes, SeedSequences by entropy and
+                spawn key, functions (e.g. sweep conditions) by bytecode and
+                closure. Anything else raises TypeError rather than being keyed
+                by repr.
+  code version  hash of the source of every module of this directory that the
+                function's and the arguments' modules import, transitively, so
+                editing a model invalidates exactly the results that ran it
+
+Runners hand their chunk jobs to cache.map (one entry per job) or
+cache.map_items (one entry per job and item, e.g. per governance model or
+policy, so changing one policy reruns only that policy's chunks). Misses run
+in the process pool and are stored by the parent; hits are unpickled. A
+disabled cache just runs the jobs.
+
+Entries are pickles in <root>/<key[:2]>/<key>.pkl. A hit touches the file's
+mtime, and when the cache grows past max_bytes the least recently used
+entries are deleted down to 90% of it.
+
+Runners take cache=None, meaning ResultCache.from_env():
+  BLOCKHELIX_CACHE      unset/"off": disabled; "on": economic-model/.cache;
+                        anything else: a directory
+  BLOCKHELIX_CACHE_MB   size cap (default 2048)
+"""
+
+import ast
+import hashlib
+import marshal
+import os
+import pickle
+import sys
+import tempfile
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, is_dataclass
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROOT = os.path.join(HERE, ".cache")
+DEFAULT_MAX_MB = 2048
+
+
+def pool_map(fn: Callable, jobs: Sequence, workers: int = 1) -> list:
+    """map(fn, jobs) in-process, or across a process pool when workers > 1."""
+    if workers == 1 or len(jobs) < 2:
+        return [fn(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, jobs))
+
+
+# ============================================================
+# CODE VERSION
+# ============================================================
+
+def _module_path(name: str):
+    if name == "__main__":
+        path = getattr(sys.modules.get("__main__"), "__file__", None)
+        return os.path.abspath(path) if path else None
+    path = os.path.join(HERE, name + ".py")
+    return path if os.path.exists(path) else None
+
+
+@lru_cache(maxsize=None)
+def _local_imports(path: str) -> Tuple[str, ...]:
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read())
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(a.name.split(".")[0] for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    return tuple(sorted(p for p in map(_module_path, names) if p))
+
+
+@lru_cache(maxsize=None)
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def code_version(modules) -> str:
+    """Hash of the sources of `modules` and every local module they import."""
+    seen, stack = set(), [p for p in map(_module_path, modules) if p]
+    while stack:
+        path = stack.pop()
+        if path not in seen:
+            seen.add(path)
+            stack.extend(_local_imports(path))
+    h = hashlib.sha256()
+    for path in sorted(seen):
+        h.update(os.path.basename(path).encode() + b"=" + _file_digest(path).encode() + b";")
+    return h.hexdigest()
+
+
+# ============================================================
+# KEYS
+# ============================================================
+
+class _Hasher:
+    def __init__(self):
+        self.h = hashlib.sha256()
+        self.modules = set()
+
+    def tag(self, *parts) -> None:
+        self.h.update(("|".join(map(str, parts)) + ";").encode())
+
+    def feed(self, x) -> None:
+        t = type(x)
+        if x is None or t in (bool, int, str):
+            self.tag(t.__name__, repr(x))
+        elif t is float:
+            self.tag("float", x.hex())
+        elif t is bytes:
+            self.tag("bytes", len(x))
+            self.h.update(x)
+        elif t in (tuple, list):
+            self.tag(t.__name__, len(x))
+            for v in x:
+                self.feed(v)
+        elif t is dict:
+            self.tag("dict", len(x))
+            for k, v in sorted(x.items(), key=lambda kv: _digest(kv[0])):
+                self.feed(k)
+                self.feed(v)
+        elif t in (set, frozenset):
+            self.tag("set", len(x), *sorted(map(_digest, x)))
+        elif isinstance(x, type):
+            self.modules.add(x.__module__)
+            self.tag("type", x.__module__, x.__qualname__)
+        elif is_dataclass(x):
+            self.feed(t)
+            for f in fields(x):
+                self.tag(f.name)
+                self.feed(getattr(x, f.name))
+        elif t is partial:
+            self.tag("partial")
+            self.feed((x.func, x.args, x.keywords))
+        elif t is types.FunctionType:
+            self.modules.add(x.__module__)
+            self.tag("function", x.__module__, x.__qualname__, _code_digest(x.__code__))
+            self.feed(x.__defaults__)
+            self.feed(tuple(c.cell_contents for c in x.__closure__ or ()))
+        elif t.__module__ == "numpy" and hasattr(x, "dtype"):
+            if t.__name__ == "ndarray":
+                self.tag("ndarray", x.dtype.str, x.shape)
+                self.h.update(x.tobytes())
+            else:  # NumPy scalar
+                self.tag("scalar", x.dtype.str, repr(x.item()))
+        elif hasattr(x, "spawn_key") and hasattr(x, "entropy"):  # np.random.SeedSequence
+            self.tag("seed")
+            self.feed((x.entropy, tuple(x.spawn_key), x.pool_size))
+        elif isinstance(x, (int, float, str)):  # subclasses, e.g. enums
+            self.feed(next(base for base in (int, float, str) if isinstance(x, base))(x))
+        else:
+            raise TypeError(f"Can't build a cache key from {t.__module__}.{t.__qualname__}")
+
+
+def _code_digest(code: types.CodeType) -> str:
+    return hashlib.sha256(marshal.dumps(code)).hexdigest()
+
+
+def _digest(x) -> str:
+    hasher = _Hasher()
+    hasher.feed(x)
+    return hasher.h.hexdigest()
+
+
+# ============================================================
+# CACHE
+# ============================================================
+
+class ResultCache:
+    def __init__(self, root: str = DEFAULT_ROOT, max_bytes: int = DEFAULT_MAX_MB << 20, enabled: bool = True):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = None  # total entry size, scanned on first put
+
+    @classmethod
+    def from_env(cls, var: str = "BLOCKHELIX_CACHE") -> "ResultCache":
+        spec = os.environ.get(var, "off")
+        max_bytes = int(os.environ.get(var + "_MB", DEFAULT_MAX_MB)) << 20
+        if spec in ("", "off", "0"):
+            return cls(enabled=False)
+        return cls(DEFAULT_ROOT if spec in ("on", "1") else spec, max_bytes)
+
+    def __repr__(self) -> str:
+        state = f"{self.root}, {self.max_bytes >> 20} MB" if self.enabled else "disabled"
+        return f"ResultCache({state}, {self.hits} hits, {self.misses} misses)"
+
+    # ---- keys and entries ----
+
+    def key(self, fn: Callable, *args) -> str:
+        hasher = _Hasher()
+        hasher.feed(fn)
+        hasher.feed(args)
+        hasher.tag("code", code_version(hasher.modules))
+        return hasher.h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".pkl")
+
+    def get(self, key: str) -> Tuple[bool, object]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return False, None
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            self._remove(path)
+            return False, None
+        os.utime(path)
+        self.hits += 1
+        return True, value
+
+    def put(self, key: str, value) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        if self._bytes is None:
+            self._bytes = sum(size for _, _, size in self._entries())
+        else:
+            self._bytes += os.path.getsize(path)
+        if self._bytes > self.max_bytes:
+            self.evict(int(self.max_bytes * 0.9))
+
+    def _entries(self) -> List[Tuple[float, str, int]]:
+        out = []
+        if not os.path.isdir(self.root):
+            return out
+        for sub in os.scandir(self.root):
+            if sub.is_dir():
+                for e in os.scandir(sub.path):
+                    if e.name.endswith(".pkl"):
+                        st = e.stat()
+                        out.append((st.st_mtime, e.path, st.st_size))
+        return out
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def evict(self, target_bytes: int) -> int:
+        """Delete least recently used entries until the cache holds at most target_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for _, path, size in entries:
+            if total <= target_bytes:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+        self._bytes = total
+        self.evictions += removed
+        return removed
+
+    def size(self) -> Tuple[int, int]:
+        """(entries, bytes) on disk."""
+        entries = self._entries()
+        return len(entries), sum(size for _, _, size in entries)
+
+    def clear(self) -> None:
+        self.evict(0)
+
+    # ---- runners ----
+
+    def call(self, fn: Callable, *args):
+        """fn(*args), from the cache when this function, these arguments and this code ran before."""
+        if not self.enabled:
+            return fn(*args)
+        key = self.key(fn, *args)
+        hit, value = self.get(key)
+        if not hit:
+            value = fn(*args)
+            self.put(key, value)
+        return value
+
+    def map(self, fn: Callable, jobs: Sequence, workers: int = 1) -> list:
+        """[fn(job) for job in jobs], running only the jobs not cached."""
+        if not self.enabled:
+            return pool_map(fn, jobs, workers)
+        keys = [self.key(fn, job) for job in jobs]
+        out, todo = [None] * len(jobs), []
+        for i, key in enumerate(keys):
+            hit, out[i] = self.get(key)
+            if not hit:
+                todo.append(i)
+        for i, value in zip(todo, pool_map(fn, [jobs[i] for i in todo], workers)):
+            out[i] = value
+            self.put(keys[i], value)
+        return out
+
+    def map_items(self, fn: Callable, jobs: Sequence[tuple], items: Sequence, workers: int = 1) -> List[Dict]:
+        """
+        fn(job + (items,)) returns {item: result}. Each (job, item) is cached
+        on its own; a job reruns with only its uncached items, if any.
+        """
+        items = tuple(items)
+        if not self.enabled:
+            return pool_map(fn, [tuple(job) + (items,) for job in jobs], workers)
+        out, todo, keys = [{} for _ in jobs], [], {}
+        for i, job in enumerate(jobs):
+            missing = []
+            for item in items:
+                keys[i, item] = key = self.key(fn, job, item)
+                hit, value = self.get(key)
+                if hit:
+                    out[i][item] = value
+                else:
+                    missing.append(item)
+            if missing:
+                todo.append((i, tuple(missing)))
+        results = pool_map(fn, [tuple(jobs[i]) + (missing,) for i, missing in todo], workers)
+        for (i, missing), result in zip(todo, results):
+            for item in missing:
+                out[i][item] = result[item]
+                self.put(keys[i, item], result[item])
+        return [{item: o[item] for item in items} for o in out]
+
+
+if __name__ == "__main__":
+    import numpy as np
+
+    from governance_mc import RegimeSwitchRevenue, governance_monte_carlo
+    from governance_policy import POLICIES, Policy, policy_monte_carlo
+    from param_sweep import default_grid, sweep
+
+    print("=" * 80)
+    print("SCENARIO RESULT CACHE: content-addressed chunk results with LRU eviction")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = ResultCache(root)
+        policies = list(POLICIES.values())
+        process = RegimeSwitchRevenue()
+
+        def run(label, fn):
+            h0, m0 = cache.hits, cache.misses
+            t0 = time.perf_counter()
+            out = fn()
+            print(f"  {label:<46} {time.perf_counter() - t0:>7.2f}s   "
+                  f"{cache.hits - h0:>4} hits {cache.misses - m0:>4} misses")
+            return out
+
+        print(f"\n--- Policy Monte Carlo: {len(policies)} policies x 100,000 paths x 36 months ---")
+        base = run("uncached", lambda: policy_monte_carlo(policies, process, 100_000, seed=42,
+                                                          cache=ResultCache(enabled=False)))
+        cold = run("cold cache", lambda: policy_monte_carlo(policies, process, 100_000, seed=42, cache=cache))
+        warm = run("warm cache (same batch rerun)", lambda: policy_monte_carlo(policies, process, 100_000,
+                                                                               seed=42, cache=cache))
+        same = all(np.array_equal(base[p.name][k], warm[p.name][k]) for p in policies for k in base[p.name])
+        print(f"  cached results identical to uncached: {same}")
+        edited = policies[:-1] + [Policy("Income + 20% of surplus over $5k",
+                                         "mean(income, 3) + 0.2 * max(balance - 5000, 0)", cap="0.1 * balance")]
+        run("one policy edited", lambda: policy_monte_carlo(edited, process, 100_000, seed=42, cache=cache))
+        run("200,000 paths (first 100,000 cached)", lambda: policy_monte_carlo(edited, process, 200_000,
+                                                                               seed=42, cache=cache))
+
+        print("\n--- Governance Monte Carlo and parameter sweep ---")
+        run("governance_mc 200k paths, cold", lambda: governance_monte_carlo(process, 200_000, seed=42,
+                                                                             cache=cache))
+        run("governance_mc 200k paths, warm", lambda: governance_monte_carlo(process, 200_000, seed=42,
+                                                                             cache=cache))
+        grid = default_grid(2)
+        run(f"sweep {grid.size:,} cells, uncached", lambda: sweep(grid, "demand", cache=ResultCache(enabled=False)))
+        run(f"sweep {grid.size:,} cells, cold", lambda: sweep(grid, "demand", cache=cache))
+        run(f"sweep {grid.size:,} cells, warm", lambda: sweep(grid, "demand", cache=cache))
+
+        n, size = cache.size()
+        print(f"\n--- LRU eviction: {n} entries, {size / 2 ** 20:.1f} MB on disk ---")
+        cache.max_bytes = size // 4
+        cache.put(cache.key(pool_map, "probe"), b"")  # any put past the cap triggers eviction
+        n2, size2 = cache.size()
+        print(f"  cap lowered to {cache.max_bytes / 2 ** 20:.1f} MB: evicted {cache.evictions} entries, "
+              f"{n2} left ({size2 / 2 ** 20:.1f} MB)")
+        run("sweep rerun (most recently used, kept)", lambda: sweep(grid, "demand", cache=cache))
+        print(f"\n  {cache}")
+    print()
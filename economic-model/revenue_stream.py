@@ -0,0 +1,209 @@
+"""
+Event-Driven Revenue Streaming
+
+The scenarios in simulate.py and bonding-curve-sim.py book revenue as
+monthly lumps. Real x402 job payments land per job, thousands a day, and
+the F10 front-running result depends on exactly when they land. This
+scheduler runs a timeline of timestamped events over VaultState and the
+curve models:
+
+  revenue   job payment -> model.receive_revenue
+  deposit / withdraw / spend (vaults), buy / sell (curves)
+  call      arbitrary callback fn(scheduler), e.g. "withdraw my shares"
+
+Discrete events go through a heap ordered by (time, insertion order). Job
+streams are sampled as arrays and coalesced before they reach the heap: all
+payments to one model inside a `window` collapse into a single
+receive_revenue call. A window is also cut at every discrete event on the
+same model (and at every call), so coalescing never moves revenue across a
+deposit, withdrawal or trade. Every model's receive_revenue is linear in the
+amount between such events (vault cut, Option A floor increment, Option B
+reserve shift) or path independent (Option C buyback on the constant
+product), so coalesced and per-job runs end in the same state.
+
+Times are in days. Jobs stamped at exactly a discrete event's time land
+after it. Events scheduled from inside a callback run in order but do not
+cut windows that were already coalesced when run() started.
+"""
+
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from bonding_curves import BondingCurveBuybackBurn, BondingCurveFloorA
+from simulate import VaultState
+
+
+MINUTE = 1.0 / 1440
+HOUR = 1.0 / 24
+DAY = 1.0
+MONTH = 30.0
+YEAR = 365.0
+
+_OPS = {
+    "revenue": "receive_revenue",
+    "deposit": "deposit",
+    "withdraw": "withdraw",
+    "spend": "spend",
+    "buy": "buy",
+    "sell": "sell",
+}
+
+
+@dataclass
+class JobStream:
+    """Poisson job arrivals at `rate_per_day`, lognormal payment with mean `mean_payment`."""
+    model: object
+    rate_per_day: float
+    mean_payment: float
+    cv: float = 0.5
+    start: float = 0.0
+    end: float = YEAR
+    seed: int = 0
+
+    def sample(self) -> tuple:
+        rng = np.random.default_rng(self.seed)
+        n = rng.poisson(self.rate_per_day * (self.end - self.start))
+        times = np.sort(rng.uniform(self.start, self.end, n))
+        sigma2 = np.log1p(self.cv ** 2)
+        amounts = rng.lognormal(np.log(self.mean_payment) - sigma2 / 2, np.sqrt(sigma2), n)
+        return times, amounts
+
+
+# ============================================================
+# SCHEDULER
+# ============================================================
+
+class RevenueScheduler:
+    def __init__(self, window: float = HOUR):
+        self.window = window
+        self.now = 0.0
+        self.log: List[tuple] = []  # (time, kind, model name, amount, result) for discrete events
+        self.jobs = 0
+        self.revenue_calls = 0
+        self._heap: list = []
+        self._seq = 0
+        self._streams: List[JobStream] = []
+
+    def schedule(self, t: float, kind: str, model=None, amount: float = 0.0,
+                 fn: Optional[Callable] = None) -> None:
+        assert kind == "call" or kind in _OPS, f"Unknown event kind: {kind}"
+        heapq.heappush(self._heap, (t, self._seq, kind, model, amount, fn))
+        self._seq += 1
+
+    def revenue(self, t: float, model, amount: float) -> None:
+        self.schedule(t, "revenue", model, amount)
+
+    def deposit(self, t: float, model, amount: float) -> None:
+        self.schedule(t, "deposit", model, amount)
+
+    def withdraw(self, t: float, model, shares: float) -> None:
+        self.schedule(t, "withdraw", model, shares)
+
+    def call(self, t: float, fn: Callable) -> None:
+        self.schedule(t, "call", fn=fn)
+
+    def job_stream(self, stream: JobStream) -> None:
+        self._streams.append(stream)
+
+    def _coalesce(self, stream: JobStream) -> None:
+        """Collapse a stream's jobs per (window, gap between cuts) into heap events."""
+        times, amounts = stream.sample()
+        self.jobs += times.size
+        if times.size == 0:
+            return
+        cuts = np.sort([e[0] for e in self._heap if e[3] is stream.model or e[2] == "call"])
+        segment = np.searchsorted(cuts, times, side="right")
+        bucket = np.floor((times - stream.start) / self.window).astype(np.int64) if self.window > 0 \
+            else np.arange(times.size)
+        new_group = np.empty(times.size, dtype=bool)
+        new_group[0] = True
+        new_group[1:] = (np.diff(segment) != 0) | (np.diff(bucket) != 0)
+        starts = np.flatnonzero(new_group)
+        ends = np.append(starts[1:], times.size) - 1
+        totals = np.add.reduceat(amounts, starts)
+        for t, amt in zip(times[ends].tolist(), totals.tolist()):
+            self.schedule(t, "revenue", stream.model, amt)
+
+    def run(self, until: float = np.inf) -> dict:
+        streams, self._streams = self._streams, []
+        for s in streams:
+            self._coalesce(s)
+        events = 0
+        while self._heap and self._heap[0][0] <= until:
+            t, _, kind, model, amount, fn = heapq.heappop(self._heap)
+            self.now = t
+            events += 1
+            if kind == "call":
+                fn(self)
+                continue
+            result = getattr(model, _OPS[kind])(amount)
+            if kind == "revenue":
+                self.revenue_calls += 1
+            else:
+                self.log.append((t, kind, type(model).__name__, amount, result))
+        return {"events": events, "jobs": self.jobs, "revenue_calls": self.revenue_calls}
+
+
+# ============================================================
+# F10 REVISITED: FRONT-RUNNING A STREAM VS A LUMP
+# ============================================================
+
+def front_run_profit(stream_revenue: bool, hold_days: float, attacker: float = 10_000.0,
+                     monthly_revenue: float = 5000.0, window: float = MINUTE, seed: int = 0) -> float:
+    """
+    Attacker deposits just before the month-end lump (or at the same point of
+    a per-job stream with the same monthly total), holds `hold_days`, exits.
+    """
+    v = VaultState()
+    v.deposit(10_000)  # existing depositors
+    sched = RevenueScheduler(window)
+    t_in = MONTH - 1e-6
+    if stream_revenue:
+        sched.job_stream(JobStream(v, rate_per_day=10_000, mean_payment=monthly_revenue / MONTH / 10_000,
+                                   end=2 * MONTH, seed=seed))
+    else:
+        sched.revenue(MONTH, v, monthly_revenue)
+        sched.revenue(2 * MONTH, v, monthly_revenue)
+    position = {}
+    sched.call(t_in, lambda s: position.update(shares=v.deposit(attacker)))
+    sched.call(t_in + hold_days, lambda s: position.update(out=v.withdraw(position["shares"])))
+    sched.run()
+    return position["out"] - attacker
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("EVENT-DRIVEN REVENUE STREAMING")
+    print("=" * 80)
+
+    print("\n--- One year at 10,000 jobs/day (avg $0.30/job) ---")
+    print(f"{'Model':<28} {'Window':>8} {'Jobs':>10} {'Calls':>8} {'Time':>7}  Result")
+    for Model, key in [(VaultState, "usdc_balance"), (BondingCurveFloorA, "cumulative_revenue_per_share"),
+                       (BondingCurveBuybackBurn, "tokens_burned")]:
+        for window, wlabel in [(HOUR, "1h"), (DAY, "1d")]:
+            m = Model()
+            sched = RevenueScheduler(window)
+            if isinstance(m, VaultState):
+                sched.deposit(0.0, m, 50_000)
+                sched.withdraw(180.0, m, 20_000)
+            else:
+                sched.schedule(0.0, "buy", m, 5_000)
+                sched.schedule(180.0, "buy", m, 5_000)
+            sched.job_stream(JobStream(m, rate_per_day=10_000, mean_payment=0.30))
+            t0 = time.perf_counter()
+            stats = sched.run()
+            elapsed = time.perf_counter() - t0
+            print(f"{type(m).__name__:<28} {wlabel:>8} {stats['jobs']:>10,} {stats['revenue_calls']:>8,} "
+                  f"{elapsed:>6.2f}s  {key} = {getattr(m, key):,.8g}")
+
+    print("\n--- F10: attacker deposits $10,000 just before month-end, $5,000/mo revenue ---")
+    print(f"{'Hold':>10} {'Lump profit':>14} {'Stream profit':>15}")
+    for hold, label in [(MINUTE, "1 minute"), (HOUR, "1 hour"), (DAY, "1 day"), (7 * DAY, "1 week")]:
+        print(f"{label:>10} {front_run_profit(False, hold):>14.2f} {front_run_profit(True, hold):>15.2f}")
+    print("\n  With per-job revenue an attacker only earns what lands while they hold;")
+    print("  the lump-sum model overstates F10 by pricing a month of revenue into one block.")
+    print()
@@ -4,14 +4,25 @@ Quantitative analysis of tokenised agent vault dynamics.
 """
 
 import math
+from collections import deque
 from dataclasses import dataclass, field
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+from event_log import KIND_CODES, EventRecorder, labelled, recorded
+from fixed_point import MICRO, VaultStateMicro, from_micro, to_micro
+from invariants import CONSERVED, Invariant, checked
+from snapshot import snapshottable
 
 # ============================================================
 # 1. CORE VAULT SIMULATOR
 # ============================================================
 
-@dataclass
+SLASH_MULTIPLIER = 2
+SLASH_SPLIT_BPS = {"client": 7500, "arbitrator": 1000, "protocol": 1500}  # docs/slashing-economics.md
+MIN_OPERATOR_BOND = 100.0
+
+@snapshottable
+@dataclass(slots=True, weakref_slot=True)
 class VaultState:
     usdc_balance: float = 0.0
     total_shares: float = 0.0
@@ -20,6 +31,16 @@ class VaultState:
     agent_fee_bps: int = 7000     # 70% to agent
     protocol_fee_bps: int = 1000  # 10% to protocol
     # vault gets remainder: 20%
+    operator_bond: float = 0.0    # first loss on slashes
+    total_slashed: float = 0.0
+    slash_events: int = 0
+    recorder: Optional[EventRecorder] = field(default=None, repr=False, compare=False)
+    recorder_id: int = field(default=0, repr=False, compare=False)
+
+    INVARIANTS = (
+        Invariant("nav_conservation", lambda v: v.nav_per_share, CONSERVED, tol=1e-10,
+                  ops=("deposit", "withdraw"), guard=lambda v: v.total_shares > 1e-12),
+    )
 
     @property
     def vault_fee_bps(self) -> int:
@@ -31,31 +52,38 @@ class VaultState:
             return 1.0
         return self.usdc_balance / self.total_shares
 
+    def observe(self) -> tuple:
+        return (self.nav_per_share, self.usdc_balance, self.total_shares)
+
+    def metrics(self) -> dict:
+        nav = self.nav_per_share
+        return {"price": nav, "floor": nav, "supply": self.total_shares,
+                "reserve": self.usdc_balance, "revenue": self.total_revenue}
+
+    @checked
+    @recorded("deposit")
     def deposit(self, amount: float) -> float:
         assert amount > 0
-        nav_before = self.nav_per_share
         if self.total_shares == 0:
             shares = amount
         else:
             shares = amount / self.nav_per_share
         self.usdc_balance += amount
         self.total_shares += shares
-        nav_after = self.nav_per_share
-        assert abs(nav_before - nav_after) < 1e-10, f"NAV conservation violated: {nav_before} -> {nav_after}"
         return shares
 
+    @checked
+    @recorded("withdraw")
     def withdraw(self, shares: float) -> float:
         assert shares > 0
         assert shares <= self.total_shares
-        nav_before = self.nav_per_share
         usdc_out = shares * self.nav_per_share
         self.total_shares -= shares
         self.usdc_balance -= usdc_out
-        if self.total_shares > 1e-12:
-            nav_after = self.nav_per_share
-            assert abs(nav_before - nav_after) < 1e-10, f"NAV conservation violated: {nav_before} -> {nav_after}"
         return usdc_out
 
+    @checked
+    @recorded("revenue", "vault")
     def receive_revenue(self, amount: float) -> dict:
         assert amount > 0
         vault_cut = amount * self.vault_fee_bps / 10000
@@ -65,12 +93,41 @@ class VaultState:
         self.total_revenue += amount
         return {"vault": vault_cut, "protocol": protocol_cut, "agent": agent_cut}
 
+    @checked
+    @recorded("spend")
     def spend(self, amount: float) -> None:
         assert amount > 0
         assert amount <= self.usdc_balance, f"Insufficient balance: {self.usdc_balance} < {amount}"
         self.usdc_balance -= amount
         self.total_spend += amount
 
+    @checked
+    @recorded("slash", "from_depositors")
+    def slash(self, job_payment: float, multiplier: int = SLASH_MULTIPLIER) -> dict:
+        """Upheld challenge: the bond pays first, depositor capital the rest."""
+        assert job_payment > 0
+        amount = job_payment * multiplier
+        from_bond = min(amount, self.operator_bond)
+        from_depositors = min(amount - from_bond, self.usdc_balance)
+        paid = from_bond + from_depositors
+        self.operator_bond -= from_bond
+        self.usdc_balance -= from_depositors
+        self.total_slashed += paid
+        self.slash_events += 1
+        return {"from_bond": from_bond, "from_depositors": from_depositors,
+                **{k: paid * bps / 10000 for k, bps in SLASH_SPLIT_BPS.items()}}
+
+    @property
+    def deposits_open(self) -> bool:
+        return self.operator_bond >= MIN_OPERATOR_BOND
+
+    # buy/sell give the vault the same trade interface as the bonding curves
+    def buy(self, usdc_amount: float) -> dict:
+        return {"tokens_out": self.deposit(usdc_amount)}
+
+    def sell(self, shares: float) -> dict:
+        return {"usdc_out": self.withdraw(shares)}
+
 
 # ============================================================
 # 2. SHARE PRICE DYNAMICS SIMULATION
@@ -78,48 +135,57 @@ class VaultState:
 
 def simulate_share_price_dynamics():
     """Walk through the exact scenario requested: deposits, spend, revenue, more deposits, withdrawals."""
-    v = VaultState()
-    log = []
+    rec = EventRecorder()
+    v = rec.attach(VaultState())
 
     # (a) Initial capital comes in
+    labelled(rec, "Alice deposits $10,000")
     s1 = v.deposit(10000)
-    log.append(("Alice deposits $10,000", v.nav_per_share, v.usdc_balance, v.total_shares, s1))
 
-    s2 = v.deposit(5000)
-    log.append(("Bob deposits $5,000", v.nav_per_share, v.usdc_balance, v.total_shares, s2))
+    labelled(rec, "Bob deposits $5,000")
+    v.deposit(5000)
 
     # (b) Agent spends on operations
+    labelled(rec, "Agent spends $3,000 on compute")
     v.spend(3000)
-    log.append(("Agent spends $3,000 on compute", v.nav_per_share, v.usdc_balance, v.total_shares, 0))
 
     # (c) Revenue flows in ($8,000 gross, vault gets 20% = $1,600)
-    r = v.receive_revenue(8000)
-    log.append((f"Revenue $8,000 (vault gets ${r['vault']:.0f})", v.nav_per_share, v.usdc_balance, v.total_shares, 0))
+    labelled(rec, "Revenue $8,000 (vault gets ${result:.0f})")
+    v.receive_revenue(8000)
 
     # (d) More deposits arrive (Charlie sees the agent is profitable)
-    s3 = v.deposit(5000)
-    log.append(("Charlie deposits $5,000", v.nav_per_share, v.usdc_balance, v.total_shares, s3))
+    labelled(rec, "Charlie deposits $5,000")
+    v.deposit(5000)
 
     # More operations
+    labelled(rec, "Agent spends $2,000")
     v.spend(2000)
-    log.append(("Agent spends $2,000", v.nav_per_share, v.usdc_balance, v.total_shares, 0))
 
-    r2 = v.receive_revenue(12000)
-    log.append((f"Revenue $12,000 (vault gets ${r2['vault']:.0f})", v.nav_per_share, v.usdc_balance, v.total_shares, 0))
+    labelled(rec, "Revenue $12,000 (vault gets ${result:.0f})")
+    v.receive_revenue(12000)
 
     # (e) Alice withdraws
-    usdc_out = v.withdraw(s1)
-    log.append((f"Alice withdraws all shares -> ${usdc_out:.2f}", v.nav_per_share, v.usdc_balance, v.total_shares, 0))
+    labelled(rec, "Alice withdraws all shares -> ${result:.2f}")
+    v.withdraw(s1)
 
     print("=" * 90)
     print("SHARE PRICE DYNAMICS SIMULATION")
     print("=" * 90)
+    print_event_table(rec)
+    print()
+
+
+def print_event_table(rec: EventRecorder) -> None:
+    """Text view over a recorder's buffered events: one row per event, post-event state."""
+    c = rec.buffer()
     print(f"{'Event':<45} {'NAV/Share':>10} {'Balance':>10} {'Shares':>10} {'New Shares':>10}")
     print("-" * 90)
-    for event, nav, bal, shares, new_shares in log:
+    for i in range(len(c["seq"])):
+        event = rec.labels[c["label"][i]].format(result=c["result"][i])
+        new_shares = c["result"][i] if c["kind"][i] == KIND_CODES["deposit"] else 0
         ns = f"{new_shares:.2f}" if new_shares > 0 else "-"
-        print(f"{event:<45} {nav:>10.4f} {bal:>10.2f} {shares:>10.2f} {ns:>10}")
-    print()
+        print(f"{event:<45} {c['price_post'][i]:>10.4f} {c['reserve_post'][i]:>10.2f} "
+              f"{c['supply_post'][i]:>10.2f} {ns:>10}")
 
 
 # ============================================================
@@ -171,7 +237,26 @@ def simulate_free_rider():
 # 4. CAPITAL EFFICIENCY ANALYSIS
 # ============================================================
 
-def capital_efficiency_model():
+@dataclass(frozen=True)
+class JobCosts:
+    """Point estimates of per-job unit economics (USDC). unit_economics.py samples around these."""
+    llm: float = 0.23              # ~50K in, ~5K out for patch generation
+    audit_sub_agent: float = 0.10  # lighter analysis
+    test_sub_agent: float = 0.05   # simple test runs
+    tx_fee: float = 0.00025        # Solana, per transaction
+    tx_per_job: int = 3
+    price: float = 5.0
+    hosting_monthly: float = 20.0
+
+    @property
+    def cost_per_job(self) -> float:
+        return self.llm + self.audit_sub_agent + self.test_sub_agent + self.tx_fee * self.tx_per_job
+
+
+JOB_COSTS = JobCosts()
+
+
+def capital_efficiency_model(costs: JobCosts = JOB_COSTS):
     """Model R(k), C(k), and optimal TVL for different agent types."""
 
     print("=" * 80)
@@ -179,14 +264,9 @@ def capital_efficiency_model():
     print("=" * 80)
 
     # Real cost basis (USDC, monthly)
-    claude_cost_per_job = 0.23   # ~50K in, ~5K out for patch generation
-    audit_sub_agent = 0.10       # lighter analysis
-    test_sub_agent = 0.05        # simple test runs
-    hosting_monthly = 20.0
-    solana_tx_cost = 0.00025
-
-    cost_per_job = claude_cost_per_job + audit_sub_agent + test_sub_agent + solana_tx_cost * 3
-    price_per_job = 5.0
+    hosting_monthly = costs.hosting_monthly
+    cost_per_job = costs.cost_per_job
+    price_per_job = costs.price
     profit_per_job = price_per_job - cost_per_job
     vault_retention = 0.20
 
@@ -382,12 +462,12 @@ def governance_simulation():
 
         balance = initial_tvl
         total_shares = initial_tvl  # $1/share initial
-        trailing_revs = []
+        trailing_revs = deque(maxlen=3)  # rolling_stats.py has the daily, multi-vault version
         cumulative_profit = 0
 
         for month, rev in enumerate(monthly_revenues, 1):
             trailing_revs.append(rev)
-            trailing_avg = sum(trailing_revs[-3:]) / min(len(trailing_revs), 3)
+            trailing_avg = sum(trailing_revs) / len(trailing_revs)
 
             budget = budget_fn(rev, trailing_avg, cumulative_profit)
             vault_income = rev * vault_retention
@@ -501,19 +581,20 @@ def failure_mode_analysis():
 # 8. COMPARATIVE ROI ANALYSIS
 # ============================================================
 
-def comparative_roi():
+def comparative_roi(costs: JobCosts = JOB_COSTS):
     """Compare agent vault returns to alternatives."""
     print("=" * 80)
     print("COMPARATIVE ROI ANALYSIS (Annual)")
     print("=" * 80)
 
     investment = 10000
+    price, cost = costs.price, round(costs.cost_per_job, 2)  # quoted to the cent
 
     # Agent vault scenarios
     scenarios = [
-        ("Agent vault (bull case: 100 jobs/mo)", 100, 5.0, 0.38, 0.20),
-        ("Agent vault (base case: 50 jobs/mo)", 50, 5.0, 0.38, 0.20),
-        ("Agent vault (bear case: 20 jobs/mo)", 20, 5.0, 0.38, 0.20),
+        ("Agent vault (bull case: 100 jobs/mo)", 100, price, cost, 0.20),
+        ("Agent vault (base case: 50 jobs/mo)", 50, price, cost, 0.20),
+        ("Agent vault (bear case: 20 jobs/mo)", 20, price, cost, 0.20),
     ]
 
     alternatives = [
@@ -530,7 +611,7 @@ def comparative_roi():
 
     for name, jobs, price, cost, retention in scenarios:
         monthly_rev = jobs * price
-        monthly_cost = jobs * cost + 20  # hosting
+        monthly_cost = jobs * cost + costs.hosting_monthly
         vault_income = monthly_rev * retention
         # If vault funds operations:
         net_to_vault_monthly = vault_income - monthly_cost
@@ -549,6 +630,22 @@ def comparative_roi():
 # 9. INFLATION ATTACK ANALYSIS (first depositor)
 # ============================================================
 
+def _inflation_attack(vault: "VaultStateMicro", seed: int, donation: int, victim: int) -> dict:
+    """Run the first-depositor attack on `vault` in exact micro-USDC."""
+    attacker_shares = vault.deposit(seed)
+    vault.donate(donation)
+    victim_shares = vault.deposit(victim)
+    attacker_out = vault.withdraw(attacker_shares)
+    victim_out = vault.withdraw(victim_shares) if victim_shares else 0
+    return {
+        "attacker_shares": attacker_shares,
+        "victim_shares": victim_shares,
+        "attacker_profit": attacker_out - seed - donation,
+        "victim_loss": victim - victim_out,
+        "stranded": vault.usdc_balance,
+    }
+
+
 def inflation_attack_analysis():
     """Analyze first-depositor inflation attack on the current implementation."""
     print("=" * 80)
@@ -556,20 +653,26 @@ def inflation_attack_analysis():
     print("=" * 80)
 
     # Current implementation: shares = amount (when total_shares == 0)
-    # No virtual offset, no dead shares
+    # No virtual offset, no dead shares. Run in exact micro-USDC (u64, floor
+    # rounding) since the attack lives entirely in the integer rounding.
 
     print("\nCurrent implementation uses 1:1 ratio for first deposit (shares = amount)")
     print("USDC has 6 decimals, so minimum deposit = 1 (= 0.000001 USDC)")
     print()
 
-    # Attack scenario
-    print("Attack scenario:")
-    print("1. Attacker deposits 1 micro-USDC (0.000001), gets 1 share")
+    seed, donation, victim = 1, to_micro(10_000), to_micro(9_999)
+    v = VaultStateMicro()
+    print("Attack scenario (exact u64 arithmetic):")
+    print(f"1. Attacker deposits 1 micro-USDC (0.000001), gets {v.deposit(seed)} share")
+    v.donate(donation)
     print("2. Attacker transfers 10,000 USDC directly to vault token account")
-    print("3. NAV = 10,000.000001 / 1 = $10,000.000001 per share")
+    print(f"3. NAV = {v.usdc_balance:,} / {v.total_shares} micro = ${v.nav_per_share / MICRO:,.6f} per share")
+    victim_shares = v.deposit(victim)
     print("4. Victim deposits 9,999 USDC")
-    print("5. Victim shares = 9999 / 10000.000001 = 0.9999... -> rounds to 0")
-    print("6. Attacker withdraws 1 share -> gets all 19,999 USDC")
+    print(f"5. Victim shares = floor({victim:,} * 1 / {donation + seed:,}) = {victim_shares}")
+    out = v.withdraw(1)
+    print(f"6. Attacker withdraws 1 share -> gets {from_micro(out):,.6f} USDC")
+    print(f"   Attacker profit: ${from_micro(out - seed - donation):,.6f}, victim loss: ${from_micro(victim):,.2f}")
     print()
 
     # However, the Solana implementation requires tokens go through the program
@@ -580,11 +683,25 @@ def inflation_attack_analysis():
     print("- BUT: SPL tokens CAN be transferred directly to any token account")
     print("- This means the inflation attack IS possible on Solana")
     print()
-    print("RECOMMENDED MITIGATIONS:")
+    print("RECOMMENDED MITIGATIONS (same attack, exact arithmetic):")
+    mitigations = [
+        ("None", VaultStateMicro(), seed),
+        ("Virtual offset 1e6 / 1e6", VaultStateMicro(virtual_shares=MICRO, virtual_assets=MICRO), seed),
+        ("Dead shares (1000)", VaultStateMicro(dead_shares=1000), 1001),
+        ("Min first deposit $10", VaultStateMicro(min_first_deposit=to_micro(10)), to_micro(10)),
+    ]
+    print(f"{'Mitigation':<28} {'Seed':>11} {'Victim shares':>15} {'Attacker P&L':>14} {'Victim loss':>12}")
+    for name, vault, s in mitigations:
+        r = _inflation_attack(vault, s, donation, victim)
+        print(f"{name:<28} {from_micro(s):>11.6f} {r['victim_shares']:>15,} "
+              f"{from_micro(r['attacker_profit']):>14,.2f} {from_micro(r['victim_loss']):>12,.2f}")
+    print()
     print("1. Virtual offset: Initialize with virtual_shares=1e6, virtual_assets=1e6")
-    print("   This makes the attack cost ~$1M to steal $1")
+    print("   The donation is shared with the virtual position, so the attacker loses most of it")
     print("2. Minimum first deposit: Require first deposit >= $10")
+    print("   Raises the seed, but a large enough donation still rounds the victim down")
     print("3. Dead shares: Mint 1000 shares to a burn address on first deposit")
+    print("   The burned shares absorb the donation the attacker paid for")
     print()
 
 
@@ -592,16 +709,16 @@ def inflation_attack_analysis():
 # 10. OPTIMAL TVL FORMULA
 # ============================================================
 
-def optimal_tvl_analysis():
+def optimal_tvl_analysis(costs: JobCosts = JOB_COSTS):
     """Derive and test the TVL cap formula."""
     print("=" * 80)
     print("OPTIMAL TVL FORMULA ANALYSIS")
     print("=" * 80)
 
-    cost_per_job = 0.38
-    price_per_job = 5.0
+    cost_per_job = round(costs.cost_per_job, 2)
+    price_per_job = costs.price
     vault_retention = 0.20
-    hosting = 20.0
+    hosting = costs.hosting_monthly
 
     print(f"\nProposed formula: max_tvl = burn_rate x runway_months")
     print(f"Alternative: max_tvl = f(demand, cost, target_yield)")
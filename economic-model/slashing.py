@@ -0,0 +1,322 @@
+"""
+Slashing and Challenge-Window Engine
+
+Stochastic companion to docs/slashing-economics.md. Every job an agent
+completes leaves a receipt, which stays challengeable for `window_days`.
+When the window closes, the arbitrator rules on any challenge filed
+against it. An upheld challenge slashes multiplier x the job payment,
+operator bond first (VaultState.slash), and the slash is split 75/10/15
+between client, arbitrator and protocol.
+
+Each vault keeps its open window in a ReceiptRing: a (vaults, window)
+circular log holding the payment (float32) and two status bits (bad job,
+challenged), i.e. 5 bytes per receipt. Jobs arrive in blocks of K per
+vault. Each step does three things:
+
+  1. expiry + resolution sweep: the K oldest slots leave the window. Their
+     challenges are ruled on together (upheld with `upheld_rate` for bad
+     jobs, `false_positive` for good ones), and the slashes are summed per
+     vault with one bincount, then paid bond-first.
+  2. new receipts: one lognormal payment and one uniform per job. The
+     uniform decides both bits against per-vault thresholds, so bad and
+     challenged draws cost a single pass.
+  3. revenue: the block's payments, vault_fee_bps of them to depositors.
+
+No Python loop ever runs per receipt. The window is rounded up to a
+whole number of blocks.
+
+Deterrence is what the operator actually lost per bad job (bond slashed /
+bad jobs), next to the cost a bad job saves (`cut_savings`). Once the bond
+is gone, slashes fall on depositors and the operator's marginal penalty is
+zero. Depositor loss is what came out of depositor capital, as a share of
+initial TVL. Vaults run in SeedSequence-seeded chunks across processes,
+as in bank_run.py.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from governance_mc import _chunk_sizes
+from result_cache import ResultCache
+from simulate import MIN_OPERATOR_BOND, SLASH_MULTIPLIER, SLASH_SPLIT_BPS
+
+
+PERCENTILES = (5, 25, 50, 75, 95, 99)
+MAX_BLOCK = 4096
+
+
+@dataclass
+class SlashConfig:
+    jobs_per_day: float = 200 / 30      # N = 200 jobs a month in the doc's scenarios
+    job_mean: float = 5.0               # USDC per job
+    job_cv: float = 0.5
+    bad_rate: float = 0.02              # q, share of jobs with cut corners
+    challenge_rate: float = 0.03        # bad jobs a client challenges
+    frivolous_rate: float = 0.0         # good jobs challenged anyway
+    upheld_rate: float = 0.60
+    false_positive: float = 0.05        # challenges to good jobs upheld anyway
+    window_days: float = 7.0
+    multiplier: int = SLASH_MULTIPLIER
+    operator_bond: float = 100.0
+    initial_tvl: float = 10_000.0
+    vault_fee_bps: int = 2000
+    cut_savings: float = 0.05           # what a bad job saves the operator
+    seed: int = 0
+
+    def blocks(self, max_block: int = MAX_BLOCK) -> tuple:
+        """(jobs per block, blocks per window); window = their product, rounded up."""
+        window = max(1, int(np.ceil(self.window_days * self.jobs_per_day)))
+        per_window = -(-window // max_block)
+        return -(-window // per_window), per_window
+
+    def expected_monthly_slash(self) -> float:
+        """N * (q*p_c*p_u + (1-q)*p_f*fp) * m * J, section 5.2 plus false positives."""
+        q = self.bad_rate
+        p = q * self.challenge_rate * self.upheld_rate + (1 - q) * self.frivolous_rate * self.false_positive
+        return 30 * self.jobs_per_day * p * self.multiplier * self.job_mean
+
+
+# ============================================================
+# RECEIPT RING
+# ============================================================
+
+class ReceiptRing:
+    """Open challenge windows for a batch of vaults: payment + status bits per receipt."""
+    BAD = 1
+    CHALLENGED = 2
+
+    def __init__(self, n_vaults: int, block: int, blocks: int):
+        self.block = block
+        self.blocks = blocks
+        self.payment = np.zeros((n_vaults, block * blocks), dtype=np.float32)
+        self.status = np.zeros((n_vaults, block * blocks), dtype=np.uint8)
+        self.step = 0
+
+    @property
+    def window(self) -> int:
+        return self.payment.shape[1]
+
+    def oldest(self) -> slice:
+        """Slots that leave the window on this step (and take the next block)."""
+        j = self.step % self.blocks
+        return slice(j * self.block, (j + 1) * self.block)
+
+    def open_challenges(self) -> np.ndarray:
+        return np.count_nonzero(self.status & self.CHALLENGED, axis=1)
+
+
+# ============================================================
+# ENGINE
+# ============================================================
+
+def simulate_vaults(cfg: SlashConfig, rng: np.random.Generator, n_vaults: int, n_jobs: int,
+                    bad_rate: Optional[np.ndarray] = None, trace: Optional[list] = None) -> dict:
+    """
+    Run `n_jobs` per vault (rounded up to whole blocks), then close every
+    window still open. `bad_rate` overrides cfg.bad_rate per vault. If
+    `trace` is a list, vault 0's upheld payments and block revenue are
+    appended per step, for replay through VaultState.
+    """
+    k, per_window = cfg.blocks()
+    ring = ReceiptRing(n_vaults, k, per_window)
+    q = np.broadcast_to(cfg.bad_rate if bad_rate is None else bad_rate, (n_vaults,))[:, None]
+    t_bad_challenged = (q * cfg.challenge_rate).astype(np.float32)
+    t_bad = q.astype(np.float32)
+    t_challenged = (q + (1 - q) * cfg.frivolous_rate).astype(np.float32)
+    sigma = np.sqrt(np.log1p(cfg.job_cv ** 2))
+    mu = np.log(cfg.job_mean) - sigma ** 2 / 2
+    vault_share = cfg.vault_fee_bps / 10000
+
+    bond = np.full(n_vaults, float(cfg.operator_bond))
+    balance = np.full(n_vaults, float(cfg.initial_tvl))
+    out = {name: np.zeros(n_vaults) for name in ("from_bond", "from_depositors", "revenue", "pending_max")}
+    counts = {name: np.zeros(n_vaults, dtype=np.int64) for name in ("bad", "challenged", "upheld", "false_positive")}
+    blocked_day = np.full(n_vaults, np.nan)
+    exhausted_day = np.full(n_vaults, np.nan)
+    first_loss_day = np.full(n_vaults, np.nan)
+    pending = np.zeros(n_vaults)
+
+    n_steps = -(-n_jobs // k)
+    days_per_step = k / cfg.jobs_per_day
+    for step in range(n_steps + per_window):
+        sl = ring.oldest()
+        day = step * days_per_step
+
+        # 1. expiry + resolution of the oldest block
+        st = ring.status[:, sl]
+        r, c = np.nonzero(st & ReceiptRing.CHALLENGED)
+        if r.size:
+            pay = ring.payment[:, sl][r, c].astype(np.float64)
+            bad = (st[r, c] & ReceiptRing.BAD).astype(bool)
+            upheld = rng.random(r.size) < np.where(bad, cfg.upheld_rate, cfg.false_positive)
+            pending -= np.bincount(r, pay, n_vaults) * cfg.multiplier
+            counts["upheld"] += np.bincount(r[upheld], minlength=n_vaults)
+            counts["false_positive"] += np.bincount(r[upheld & ~bad], minlength=n_vaults)
+            slash = np.bincount(r[upheld], pay[upheld], n_vaults) * cfg.multiplier
+            from_bond = np.minimum(slash, bond)
+            from_dep = np.minimum(slash - from_bond, balance)
+            bond -= from_bond
+            balance -= from_dep
+            out["from_bond"] += from_bond
+            out["from_depositors"] += from_dep
+            blocked_day[np.isnan(blocked_day) & (bond < MIN_OPERATOR_BOND)] = day
+            exhausted_day[np.isnan(exhausted_day) & (bond <= 0)] = day
+            first_loss_day[np.isnan(first_loss_day) & (from_dep > 0)] = day
+            if trace is not None:
+                trace.append(("slash", pay[upheld & (r == 0)].tolist()))
+        ring.status[:, sl] = 0
+
+        # 2. new receipts, then 3. revenue
+        if step < n_steps:
+            pay = np.exp(mu + sigma * rng.standard_normal((n_vaults, k), dtype=np.float32))
+            u = rng.random((n_vaults, k), dtype=np.float32)
+            bad = u < t_bad
+            challenged = (u < t_bad_challenged) | (bad ^ (u < t_challenged))
+            ring.payment[:, sl] = pay
+            ring.status[:, sl] = bad.view(np.uint8) | (challenged.view(np.uint8) << 1)
+            block_pay = pay.sum(axis=1, dtype=np.float64)
+            pending += np.where(challenged, pay, 0).sum(axis=1, dtype=np.float64) * cfg.multiplier
+            np.maximum(out["pending_max"], pending, out=out["pending_max"])
+            counts["bad"] += np.count_nonzero(bad, axis=1)
+            counts["challenged"] += np.count_nonzero(challenged, axis=1)
+            out["revenue"] += block_pay
+            balance += block_pay * vault_share
+            if trace is not None:
+                trace.append(("revenue", float(block_pay[0])))
+        ring.step += 1
+
+    slashed = out["from_bond"] + out["from_depositors"]
+    return {
+        **out, **counts,
+        "jobs": n_steps * k,
+        "days": n_steps * days_per_step,
+        "bond": bond,
+        "balance": balance,
+        "slashed": slashed,
+        **{name: slashed * bps / 10000 for name, bps in SLASH_SPLIT_BPS.items()},
+        "blocked_day": blocked_day,
+        "exhausted_day": exhausted_day,
+        "first_loss_day": first_loss_day,
+        "window_jobs": ring.window,
+    }
+
+
+# ============================================================
+# MONTE CARLO RUNNER
+# ============================================================
+
+def _run_chunk(args) -> dict:
+    cfg, seed_seq, n_jobs, bad_rate = args
+    return simulate_vaults(cfg, np.random.default_rng(seed_seq), bad_rate.size, n_jobs, bad_rate)
+
+
+def slashing_monte_carlo(cfg: Optional[SlashConfig] = None, n_vaults: int = 1_000, n_jobs: int = 2_400,
+                         bad_rate: Optional[np.ndarray] = None, workers: int = 1,
+                         chunk_size: int = 2048, percentiles=PERCENTILES, cache: Optional[ResultCache] = None) -> dict:
+    """
+    Deterrence and depositor-loss distributions across vaults:
+      penalty_per_bad_job  operator bond lost / bad jobs (USDC)
+      p_blocked            share of vaults whose bond fell below MIN_OPERATOR_BOND
+      p_exhausted          share whose bond ran out (exhausted_day: when)
+      p_cut_pays           share of vaults where cut_savings * bad > bond lost
+      depositor_loss       slashes paid from depositor capital / initial TVL
+      loss_to_yield        the same / depositors' revenue share
+    """
+    cfg = cfg or SlashConfig()
+    bad_rate = np.broadcast_to(cfg.bad_rate if bad_rate is None else bad_rate, (n_vaults,)).astype(np.float64)
+    sizes = _chunk_sizes(n_vaults, chunk_size)
+    seeds = np.random.SeedSequence(cfg.seed).spawn(len(sizes))
+    bounds = np.cumsum([0] + sizes)
+    jobs = [(cfg, s, n_jobs, bad_rate[a:b]) for s, a, b in zip(seeds, bounds[:-1], bounds[1:])]
+    cache = cache if cache is not None else ResultCache.from_env()
+    parts = cache.map(_run_chunk, jobs, workers)
+
+    res = {k: np.concatenate([p[k] for p in parts]) for k, v in parts[0].items() if isinstance(v, np.ndarray)}
+    months = parts[0]["days"] / 30
+    with np.errstate(divide="ignore", invalid="ignore"):
+        penalty = np.where(res["bad"] > 0, res["from_bond"] / res["bad"], np.nan)
+        loss_to_yield = np.where(res["revenue"] > 0,
+                                 res["from_depositors"] / (res["revenue"] * cfg.vault_fee_bps / 10000), 0.0)
+    pct = lambda x: dict(zip(percentiles, np.nanpercentile(x, percentiles)))
+    return {
+        "vaults": n_vaults,
+        "jobs": parts[0]["jobs"],
+        "months": months,
+        "window_jobs": parts[0]["window_jobs"],
+        "monthly_slash": float(res["slashed"].mean() / months),
+        "expected_monthly_slash": float(np.mean([SlashConfig(**{**cfg.__dict__, "bad_rate": q})
+                                                 .expected_monthly_slash() for q in np.unique(bad_rate)])),
+        "penalty_per_bad_job": pct(penalty),
+        "p_cut_pays": float(np.mean(res["from_bond"] < cfg.cut_savings * res["bad"])),
+        "p_blocked": float(np.mean(~np.isnan(res["blocked_day"]))),
+        "p_exhausted": float(np.mean(~np.isnan(res["exhausted_day"]))),
+        "exhausted_day": pct(res["exhausted_day"]) if np.isfinite(res["exhausted_day"]).any() else None,
+        "p_depositor_loss": float(np.mean(res["from_depositors"] > 0)),
+        "depositor_loss": pct(res["from_depositors"] / cfg.initial_tvl),
+        "loss_to_yield": pct(loss_to_yield),
+        "pending_to_bond": pct(res["pending_max"] / cfg.operator_bond),
+        "false_positive_share": float(res["false_positive"].sum() / max(res["upheld"].sum(), 1)),
+        "split": {name: float(res[name].sum()) for name in SLASH_SPLIT_BPS},
+    }
+
+
+def _print_table(title: str, rows, percentiles=PERCENTILES, fmt="{:>9.2f}") -> None:
+    print(f"\n--- {title} ---")
+    print(f"{'':<30}" + "".join(f"{'p' + str(p):>9}" for p in percentiles))
+    for label, table in rows:
+        print(f"{label:<30}" + ("".join(fmt.format(table[p]) for p in percentiles) if table else "      n/a"))
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("SLASHING: challenge windows, 2x slash, 75/10/15 split, operator bond first")
+    print("=" * 80)
+
+    scenarios = [
+        ("A good (2% bad)", SlashConfig(bad_rate=0.02)),
+        ("B mediocre (5%)", SlashConfig(bad_rate=0.05)),
+        ("C poor (10%)", SlashConfig(bad_rate=0.10)),
+        ("D catastrophic (20%)", SlashConfig(bad_rate=0.20, challenge_rate=0.10, upheld_rate=0.70)),
+    ]
+    print("\n--- Doc scenarios (section 5.3): 200 jobs/mo at ~$5, $100 bond, $10k TVL, 5 years ---")
+    print(f"{'Scenario':<22} {'E[slash]/mo':>11} {'sim':>7} {'P(blocked)':>11} {'P(bond gone)':>13} "
+          f"{'when, p50':>10} {'dep loss p95':>13} {'cut pays':>9}")
+    results = {}
+    for label, c in scenarios:
+        r = slashing_monte_carlo(c, n_vaults=10_000, n_jobs=12_000)
+        results[label] = r
+        ex = f"{r['exhausted_day'][50] / 30:>8.1f}mo" if r["exhausted_day"] else f"{'-':>10}"
+        print(f"{label:<22} {r['expected_monthly_slash']:>11.2f} {r['monthly_slash']:>7.2f} "
+              f"{r['p_blocked']:>11.1%} {r['p_exhausted']:>13.1%} {ex} "
+              f"{r['depositor_loss'][95]:>13.3%} {r['p_cut_pays']:>9.1%}")
+    print("  (blocked: bond below the $100 minimum, so deposits stop; once the bond is gone,")
+    print("   slashes come out of depositor capital and cutting corners costs the operator nothing)")
+    _print_table("Operator penalty per bad job (USDC), 5 years; a $0.05 corner cut is deterred above 0.05",
+                 [(label, r["penalty_per_bad_job"]) for label, r in results.items()], fmt="{:>9.3f}")
+    _print_table("Depositor slash loss as % of depositors' revenue share, 5 years",
+                 [(label, {p: v * 100 for p, v in r["loss_to_yield"].items()}) for label, r in results.items()])
+
+    print("\n--- High-volume agents: 5,000 jobs/day at $0.10, 7-day windows, $250 bond, $100k TVL ---")
+    hv = SlashConfig(jobs_per_day=5_000, job_mean=0.10, operator_bond=250, initial_tvl=100_000,
+                     frivolous_rate=0.002, cut_savings=0.002)
+    elapsed, total, split, upheld_fp = 0.0, 0, dict.fromkeys(SLASH_SPLIT_BPS, 0.0), []
+    for q in (0.005, 0.02, 0.05, 0.10):
+        t0 = time.perf_counter()
+        r = slashing_monte_carlo(hv, n_vaults=50, n_jobs=2_000_000, bad_rate=q, chunk_size=50)
+        elapsed += time.perf_counter() - t0
+        total += r["vaults"] * r["jobs"]
+        split = {k: split[k] + v for k, v in r["split"].items()}
+        upheld_fp.append(r["false_positive_share"])
+        print(f"  bad {q:>5.1%}: bond gone in {r['p_exhausted']:>6.1%} of vaults"
+              + (f" (median day {r['exhausted_day'][50]:>4.0f})" if r["exhausted_day"] else " " * 18)
+              + f", depositor loss p50 {r['depositor_loss'][50]:>7.3%} p95 {r['depositor_loss'][95]:>7.3%}"
+              f", peak open challenges {r['pending_to_bond'][50]:>4.2f}x bond")
+    print(f"\n  200 vaults x {r['jobs']:,} jobs ({r['months']:.1f} months, {r['window_jobs']:,}-receipt rings) = "
+          f"{total / 1e6:,.0f}M jobs in {elapsed:.2f}s ({total / elapsed / 1e6:.0f}M jobs/s)")
+    print(f"  Slash split: client ${split['client']:,.0f}, arbitrator ${split['arbitrator']:,.0f}, "
+          f"protocol ${split['protocol']:,.0f}; {min(upheld_fp):.0%}-{max(upheld_fp):.0%} of upheld "
+          f"challenges were against good work")
+    print()
@@ -0,0 +1,57 @@
+"""
+Model Snapshots
+
+snapshot() / restore() / fork() for the dataclass models (VaultState and the
+bonding-curve options), so what-if branches ("what if Alice exits first")
+run on the live model and roll back instead of cloning objects:
+
+    snap = curve.snapshot()
+    r = curve.sell(tokens)
+    curve.restore(snap)
+
+The models are slotted dataclasses, so their state has a fixed layout. A
+snapshot is the tuple of state fields read in one attrgetter call; it is
+immutable, so any number of branches can share it. The recorder attachment
+is not state and is never captured: restoring leaves it alone and forks
+start unattached.
+
+Restoring can move a model backwards (e.g. Option B's k), so restore() also
+clears what the active InvariantChecker remembers about the model.
+
+VaultBatch keeps its arrays in one 2-D buffer and implements the same three
+methods with a single array copy.
+"""
+
+from dataclasses import fields
+from operator import attrgetter
+
+from invariants import active
+
+
+def snapshottable(cls):
+    """Class decorator (applied outside @dataclass(slots=True)): adds
+    snapshot/restore/fork over every compared dataclass field."""
+    names = tuple(f.name for f in fields(cls) if f.compare)
+    get = attrgetter(*names)
+
+    def snapshot(self) -> tuple:
+        return get(self)
+
+    def restore(self, snap: tuple) -> None:
+        for name, value in zip(names, snap):
+            setattr(self, name, value)
+        active().forget(self)
+
+    def fork(self):
+        other = type(self).__new__(type(self))
+        for name, value in zip(names, get(self)):
+            setattr(other, name, value)
+        other.recorder = None
+        other.recorder_id = 0
+        return other
+
+    cls.STATE_FIELDS = names
+    cls.snapshot = snapshot
+    cls.restore = restore
+    cls.fork = fork
+    return cls
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from agent_rank import AgentRank
+
+
+def _random_payments(rng, n, m):
+    return rng.integers(0, n, m), rng.integers(0, n, m), rng.lognormal(0, 1, m)
+
+
+def test_spec_example_3():
+    ar = AgentRank(4, prior=[0.8, 0.6, 0.3, 0.2])
+    ar.add_payments([0, 0, 1, 2], [1, 2, 2, 3], [10_000, 5_000, 3_000, 1_000])
+    np.testing.assert_allclose(ar.solve(), [0.171, 0.225, 0.304, 0.301], atol=1e-3)
+
+
+@pytest.mark.parametrize("batches", [[10], [10, 200, 5], [500, 500]])
+def test_incremental_push_matches_cold_solve(batches):
+    rng = np.random.default_rng(3)
+    n = 5_000
+    edges = [_random_payments(rng, n, 20_000)]
+    ar = AgentRank(n)
+    ar.add_payments(*edges[0])
+    ar.solve(warm=False)
+    for b in batches:
+        edges.append(_random_payments(rng, n, b))
+        ar.update(*edges[-1])
+
+    full = AgentRank(n, tol=1e-14)
+    full.add_payments(*(np.concatenate(col) for col in zip(*edges)))
+    np.testing.assert_allclose(ar.rank, full.solve(warm=False), atol=1e-9)
+
+
+def test_tracked_residual_matches_graph():
+    rng = np.random.default_rng(4)
+    n = 2_000
+    ar = AgentRank(n)
+    ar.add_payments(*_random_payments(rng, n, 8_000))
+    ar.solve(warm=False)
+    ar.add_payments(*_random_payments(rng, n, 50))
+    W = ar.W + ar.pending
+    res = ar.teleport + ar.damping * (W @ (ar.r * ar.inv_outflow)) - ar.r
+    np.testing.assert_allclose(ar.res, res, atol=1e-15)
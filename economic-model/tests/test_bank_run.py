@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from bank_run import BankRunConfig, _sample_path_inputs, simulate_paths
+from simulate import VaultState
+
+
+def _replay(cfg: BankRunConfig, seed: int = 0) -> tuple:
+    """One path through simulate_paths and through VaultState op by op: (batch, VaultState) final NAV."""
+    sizes, sens = cfg.depositors()
+    batch = simulate_paths(cfg, np.random.default_rng(seed), 1, sizes, sens)
+    demand, tau = _sample_path_inputs(cfg, np.random.default_rng(seed), 1, sens)
+    demand, tau = demand[0], tau[0]
+    burn = cfg.burn_rate * sizes.sum()
+    demand *= cfg.revenue_multiple * burn / 30
+
+    v = VaultState(agent_fee_bps=10000 - cfg.vault_fee_bps, protocol_fee_bps=0)
+    held = [v.deposit(float(s)) for s in sizes]
+    order = list(np.argsort(tau))
+    peak, peer, big_hazard, k = 1.0, 0.0, 0.0, 0
+    decay = 0.5 ** (1 / cfg.peer_halflife)
+    for d in range(cfg.days):
+        work = min(1.0, v.usdc_balance / (burn * cfg.capacity_months))
+        if demand[d] * work > 0:
+            v.receive_revenue(float(demand[d] * work))
+        spend = min(burn / 30 * work, v.usdc_balance)
+        if spend > 0:
+            v.spend(spend)
+        nav = v.nav_per_share
+        peak = max(peak, nav)
+        runway = v.usdc_balance / burn
+        big_hazard += (cfg.base_hazard + cfg.dd_coef * (1 - nav / peak)
+                       + cfg.runway_coef * max(0.0, 1 - runway / cfg.runway_target) + cfg.peer_coef * peer)
+        before = v.total_shares
+        out = 0.0
+        while k < len(order) and tau[order[k]] <= big_hazard:
+            out += held[order[k]]
+            k += 1
+            v.withdraw(held[order[k - 1]] if k < len(order) else v.total_shares)
+        peer = peer * decay + (1 - decay) * (out / before if before > 0 else 0.0)
+    return float(batch["final_nav"][0]), v.nav_per_share
+
+
+def test_simulate_paths_matches_vault_state():
+    nav_batch, nav_scalar = _replay(BankRunConfig(n_depositors=300, days=180))
+    assert nav_batch == pytest.approx(nav_scalar, rel=1e-9)
+
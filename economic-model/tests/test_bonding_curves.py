@@ -0,0 +1,49 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from bonding_curves import BondingCurveFloorAFixed, BondingCurveFloorBRatchet
+
+
+def test_ratchet_base_defaults_to_starting_reserve():
+    assert BondingCurveFloorBRatchet(virtual_usdc_reserve=50_000.0).base_virtual_usdc == 50_000.0
+
+
+def test_ratchet_base_survives_replace():
+    c = BondingCurveFloorBRatchet()
+    c.buy(3_000.0)
+    assert dataclasses.replace(c).base_virtual_usdc == 30_000.0
+
+
+def test_ratchet_base_can_be_given():
+    c = BondingCurveFloorBRatchet(base_virtual_usdc=25_000.0)
+    assert c.minimum_virtual_usdc == 25_000.0
+
+
+def _sold_down_afix(**kw):
+    c = BondingCurveFloorAFixed(real_token_reserve=5e6, **kw)
+    c.buy(100.0)
+    c.receive_revenue(1_000.0)
+    return c
+
+
+def test_afix_buy_fills_only_remaining_tokens():
+    c = _sold_down_afix()
+    left = c.real_token_reserve
+    r = c.buy(1e6)
+    assert r["tokens_out"] == pytest.approx(left)
+    assert c.real_token_reserve >= 0
+    assert r["curve_usdc"] + r["floor_usdc"] + r["usdc_unfilled"] == pytest.approx(1e6)
+    assert c.check_solvency()["floor_fully_backed"]
+
+
+def test_afix_buy_batch_fills_only_remaining_tokens():
+    c, s = _sold_down_afix(), _sold_down_afix()
+    left = c.real_token_reserve
+    r = c.buy_batch(np.array([20.0, 1e6, 50.0]))
+    assert r["tokens_out"][0] == pytest.approx(s.buy(20.0)["tokens_out"])
+    assert r["tokens_out"].sum() == pytest.approx(left)
+    assert c.real_token_reserve == pytest.approx(0.0, abs=1e-6)
+    np.testing.assert_allclose(r["usdc_in"] + r["usdc_unfilled"], [20.0, 1e6, 50.0])
+    assert r["usdc_unfilled"][2] == 50.0
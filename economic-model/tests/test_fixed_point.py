@@ -0,0 +1,54 @@
+import pytest
+
+from bonding_curves import BondingCurveFloorA, BondingCurveFloorAFixed
+from fixed_point import MICRO, BondingCurveMicro, to_micro
+
+
+def _scripted(steps=40):
+    """Yield (float result, micro result, float curve, micro curve) over a
+    buy / revenue / sell sequence run on both Option A curves."""
+    f, m = BondingCurveFloorA(), BondingCurveMicro()
+    held = []
+    for step in range(steps):
+        a, b = f.buy(1000.0 + 37 * step), m.buy(to_micro(1000.0 + 37 * step))
+        held.append(b["tokens_out"])
+        yield a, b, f, m
+        yield f.receive_revenue(250.0 + step), m.receive_revenue(to_micro(250.0 + step)), f, m
+        if step % 3 == 2:
+            tokens = held.pop(0)
+            yield f.sell(tokens / MICRO), m.sell(tokens), f, m
+
+
+def test_micro_option_a_matches_float_within_one_micro_usdc():
+    for a, b, _, _ in _scripted():
+        for key in ("floor", "curve_component", "floor_component"):
+            if key in b:
+                assert abs(a[key] * MICRO - b[key]) <= 1.0, key
+
+
+def test_micro_solvency_matches_float():
+    for _, _, f, m in _scripted():
+        fs, ms = f.check_solvency(), m.check_solvency()
+        assert ms["floor_liability"] == pytest.approx(fs["floor_liability"] * MICRO, abs=2.0)
+        assert ms["floor_fully_backed"] == fs["floor_fully_backed"]
+
+
+def test_micro_buy_past_reserve_clamps_like_float():
+    f = BondingCurveFloorA(real_token_reserve=1_000.0)
+    m = BondingCurveMicro(real_token_reserve=1_000 * MICRO)
+    a, b = f.buy(100.0), m.buy(to_micro(100.0))
+    assert b["tokens_out"] == a["tokens_out"] * MICRO == 1_000 * MICRO
+    assert m.real_token_reserve == 0
+
+
+def test_micro_afix_buy_past_reserve_matches_float():
+    f = BondingCurveFloorAFixed(real_token_reserve=5e6)
+    m = BondingCurveMicro(real_token_reserve=5 * 10**6 * MICRO, buyer_pays_floor=True)
+    for c, to in ((f, float), (m, to_micro)):
+        c.buy(to(100.0))
+        c.receive_revenue(to(1_000.0))
+    a, b = f.buy(1e6), m.buy(to_micro(1e6))
+    assert b["tokens_out"] == pytest.approx(a["tokens_out"] * MICRO, abs=2)
+    assert b["refund"] == pytest.approx(a["usdc_unfilled"] * MICRO, abs=2)
+    assert m.real_token_reserve == 0
+    assert m.check_solvency()["floor_fully_backed"]
@@ -0,0 +1,25 @@
+import gc
+
+from bonding_curves import BondingCurveFloorB, BondingCurveFloorBRatchet
+from invariants import checking
+
+
+def test_fresh_curves_do_not_inherit_dead_curve_state():
+    # a new curve can reuse a collected curve's id; its k must start fresh
+    with checking(strict=True) as chk:
+        for _ in range(50):
+            m = BondingCurveFloorB()
+            m.buy(1000)
+            m.receive_revenue(500)
+            m.sell(m.tokens_sold / 2)
+    assert chk.violations == []
+
+
+def test_remembered_state_is_dropped_with_the_model():
+    with checking() as chk:
+        m = BondingCurveFloorBRatchet()
+        m.buy(1000)
+        assert len(chk._last) == 1
+        del m
+        gc.collect()
+        assert len(chk._last) == 0
@@ -0,0 +1,23 @@
+import pytest
+
+from mev_frontrun import DEFENSES, Defense, gross_gain
+from revenue_stream import DAY, MINUTE
+from simulate import VaultState
+
+
+def _replay(tvl: float, revenue: float, x: float, hold: float, defense: Defense) -> tuple:
+    """Closed-form gross gain vs VaultState with vesting applied as pro-rata revenue (no entry fee)."""
+    assert defense.entry_fee_bps == 0, "VaultState has no entry fee"
+    v = VaultState()
+    v.deposit(tvl)
+    shares = v.deposit(x)
+    phi = min(hold / defense.vesting_days, 1.0) if defense.vesting_days else 1.0
+    v.receive_revenue(revenue * phi)
+    sim = v.withdraw(shares) - x
+    return float(gross_gain(x, tvl, revenue, hold, defense)), sim
+
+
+@pytest.mark.parametrize("x, hold, defense", [(10_000, MINUTE, DEFENSES[0]), (250_000, 3 * DAY, DEFENSES[5])])
+def test_gross_gain_matches_vault_state(x, hold, defense):
+    closed_form, sim = _replay(10_000, 5_000, x, hold, defense)
+    assert closed_form == pytest.approx(sim, rel=1e-9)
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from simulate import VaultState
+from slashing import SlashConfig, simulate_vaults
+
+
+def _replay(cfg: SlashConfig, n_jobs: int = 20_000, seed: int = 0) -> tuple:
+    """Vault 0 of a batch run vs its slashes and revenue replayed through VaultState: (batch, VaultState)."""
+    trace = []
+    batch = simulate_vaults(cfg, np.random.default_rng(seed), 4, n_jobs, trace=trace)
+    v = VaultState(agent_fee_bps=10000 - cfg.vault_fee_bps, protocol_fee_bps=0, operator_bond=cfg.operator_bond)
+    v.deposit(cfg.initial_tvl)
+    for kind, value in trace:
+        if kind == "revenue":
+            v.receive_revenue(value)
+        else:
+            for pay in value:
+                v.slash(pay, cfg.multiplier)
+    return ((float(batch["balance"][0]), float(batch["bond"][0]), float(batch["slashed"][0])),
+            (v.usdc_balance, v.operator_bond, v.total_slashed))
+
+
+def test_simulate_vaults_matches_vault_state_slash():
+    batch, scalar = _replay(SlashConfig(bad_rate=0.05, challenge_rate=0.3, frivolous_rate=0.01))
+    assert batch == pytest.approx(scalar, rel=1e-9, abs=1e-9)
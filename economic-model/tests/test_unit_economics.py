@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from unit_economics import JobCostModel, _poisson, monthly_job_costs
+
+
+@pytest.mark.parametrize("rate", [0.0, 0.3, 4.0, 800.0, 5000.0])
+def test_poisson_moments(rate):
+    u = np.random.default_rng(0).random(200_000, dtype=np.float32)
+    k = _poisson(u, rate)
+    assert abs(k.mean() - rate) <= 0.02 * rate + 0.01
+    assert abs(k.var() - rate) <= 0.05 * rate + 0.01
+
+
+def test_large_call_rate_samples():
+    # exp(-800) underflows to 0.0; the old CDF loop never terminated
+    out = JobCostModel(audit_calls=800).sample(np.random.default_rng(0), 1_000)
+    assert np.isfinite(out["total"]).all()
+    assert out["audit"].mean() == pytest.approx(800 * JobCostModel.audit_cost, rel=0.05)
+
+
+class UnitCost(JobCostModel):
+    def sample(self, rng, n):
+        return {"total": np.ones(n, dtype=np.float32)}
+
+
+@pytest.mark.parametrize("batch_jobs", [1, 2, 3, 5, 1 << 21])
+def test_monthly_job_costs_sums_each_cell(batch_jobs):
+    # trailing empty cells inside a batch used to cut the previous cell short
+    jobs = np.array([[2, 0], [3, 1], [0, 5], [4, 0]])
+    got = monthly_job_costs(UnitCost(), np.random.default_rng(0), jobs, batch_jobs)
+    np.testing.assert_array_equal(got, jobs)
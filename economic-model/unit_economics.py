@@ -0,0 +1,304 @@
+"""
+Stochastic Unit Economics
+
+capital_efficiency_model, comparative_roi and optimal_tvl_analysis price
+every job at the point estimates in simulate.JobCosts ($0.23 LLM, $0.10
+audit, $0.05 test, 3 x $0.00025 tx, $5 price, $20/mo hosting) and demand at
+a fixed jobs/month, so each scenario yields a single APY. Here the same
+quantities are distributions, with means at those point estimates:
+
+  LLM cost       input tokens lognormal (mean 50K); output tokens a lognormal
+                 ratio of input (mean 10%), priced per million tokens
+  sub-agents     audit and test call counts Poisson per job, each call's cost
+                 lognormal around JobCosts' per-job figure
+  tx fees        tx_per_job fees per job, lognormal (priority-fee spikes)
+  demand         jobs per month Poisson around a per-path rate that is gamma
+                 distributed (negative binomial arrivals, overdispersed
+                 between paths and months)
+
+Jobs are sampled explicitly: a (paths, months) job-count array is expanded
+into one flat batch of jobs, each component is drawn for the whole batch at
+once, and np.add.reduceat sums job costs back into their path-month. Batches
+are capped at `batch_jobs` so memory stays flat however large the demand.
+Per-job draws are float32 from one block of standard normals and uniforms,
+about twice as fast as NumPy's float64 lognormal and poisson; sums of several
+lognormals (calls, tx fees) are drawn as one lognormal with the same mean and
+variance.
+
+vault_monte_carlo feeds the monthly totals through capital_efficiency_model's
+accounting (the vault funds costs and keeps `vault_retention` of revenue) and
+returns per-path APY and annual return, from which the demo prints confidence
+intervals and a TVL cap that meets a target yield with a given probability:
+annual return N / TVL >= y with probability c  <=>  TVL <= quantile(N, 1 - c) / y.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from governance_mc import VAULT_RETENTION, _chunk_sizes
+from result_cache import ResultCache
+from simulate import JOB_COSTS, JobCosts
+
+
+USDC_RISK_FREE = 0.05
+PERCENTILES = (5, 50, 95)
+
+
+def _lognormal(z: np.ndarray, mean, cv) -> np.ndarray:
+    """Lognormal with the given mean and CV from standard normals z (cv may be an array)."""
+    s2 = np.log1p(np.square(cv, dtype=z.dtype))
+    return mean * np.exp(np.sqrt(s2) * z - s2 / 2)
+
+
+def _poisson(u: np.ndarray, rate: float) -> np.ndarray:
+    """
+    Poisson counts from uniforms by inverting the CDF over rate +- 10 sd.
+    The pmf is built in log space, so large rates (exp(-rate) underflows past
+    ~745) work too; mass outside the window is below 1e-20.
+    """
+    if rate <= 0:
+        return np.zeros(u.shape, dtype=np.int64)
+    sd = math.sqrt(rate)
+    lo, hi = max(0, int(rate - 10 * sd - 10)), int(rate + 10 * sd + 10)
+    k = np.arange(lo, hi + 1)
+    log_fact = math.lgamma(lo + 1) + np.concatenate(([0.0], np.cumsum(np.log(k[1:]))))
+    cdf = np.cumsum(np.exp(k * math.log(rate) - rate - log_fact))
+    return lo + np.minimum(np.searchsorted(cdf, u, side="right"), k.size - 1)
+
+
+def _compound(z: np.ndarray, k: np.ndarray, mean: float, cv: float) -> np.ndarray:
+    """
+    Sum of k iid lognormal calls per job. The sum is drawn as one lognormal
+    with the exact mean (k * mean) and variance (CV / sqrt(k)), the
+    Fenton-Wilkinson approximation; k = 0 costs nothing.
+    """
+    kf = k.astype(z.dtype)
+    return np.where(k > 0, _lognormal(z, mean * kf, cv / np.sqrt(np.maximum(kf, 1))), 0)
+
+
+# ============================================================
+# MODELS
+# ============================================================
+
+@dataclass
+class JobCostModel:
+    tokens_in_mean: float = 50_000.0
+    tokens_in_cv: float = 0.6
+    out_ratio_mean: float = 0.10      # output tokens per input token
+    out_ratio_cv: float = 0.5
+    usd_per_mtok_in: float = 3.0
+    usd_per_mtok_out: float = 15.0
+    audit_calls: float = 1.0          # Poisson mean per job
+    audit_cost: float = JOB_COSTS.audit_sub_agent
+    test_calls: float = 1.0
+    test_cost: float = JOB_COSTS.test_sub_agent
+    call_cv: float = 0.5
+    tx_per_job: int = JOB_COSTS.tx_per_job
+    tx_fee: float = JOB_COSTS.tx_fee
+    tx_fee_cv: float = 1.0
+
+    @property
+    def mean_llm(self) -> float:
+        return self.tokens_in_mean * (self.usd_per_mtok_in + self.out_ratio_mean * self.usd_per_mtok_out) / 1e6
+
+    @property
+    def mean_cost(self) -> float:
+        return (self.mean_llm + self.audit_calls * self.audit_cost + self.test_calls * self.test_cost
+                + self.tx_per_job * self.tx_fee)
+
+    def sample(self, rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+        """Per-job cost components (float32) for n jobs."""
+        z = rng.standard_normal((5, n), dtype=np.float32)
+        u = rng.random((2, n), dtype=np.float32)
+        tokens_in = _lognormal(z[0], self.tokens_in_mean, self.tokens_in_cv)
+        tokens_out = tokens_in * _lognormal(z[1], self.out_ratio_mean, self.out_ratio_cv)
+        llm = (tokens_in * (self.usd_per_mtok_in / 1e6) + tokens_out * (self.usd_per_mtok_out / 1e6))
+        audit = _compound(z[2], _poisson(u[0], self.audit_calls), self.audit_cost, self.call_cv)
+        test = _compound(z[3], _poisson(u[1], self.test_calls), self.test_cost, self.call_cv)
+        tx = _compound(z[4], np.full(n, self.tx_per_job), self.tx_fee, self.tx_fee_cv)
+        return {"llm": llm, "audit": audit, "test": test, "tx": tx, "total": llm + audit + test + tx}
+
+
+@dataclass
+class DemandModel:
+    jobs_per_month: float = 50.0
+    path_cv: float = 0.3    # spread of the underlying rate between paths
+    month_cv: float = 0.2   # month-to-month spread of the rate within a path
+
+    def sample(self, rng: np.random.Generator, n_paths: int, n_months: int) -> np.ndarray:
+        """Jobs per (path, month): Poisson around a gamma-distributed rate."""
+        rate = np.full((n_paths, 1), float(self.jobs_per_month))
+        for cv, shape in ((self.path_cv, (n_paths, 1)), (self.month_cv, (n_paths, n_months))):
+            if cv > 0:
+                rate = rate * rng.gamma(1 / cv ** 2, cv ** 2, shape)
+        return rng.poisson(np.broadcast_to(rate, (n_paths, n_months)))
+
+
+@dataclass
+class UnitEconomics:
+    costs: JobCostModel = field(default_factory=JobCostModel)
+    demand: DemandModel = field(default_factory=DemandModel)
+    price: float = JOB_COSTS.price
+    hosting_monthly: float = JOB_COSTS.hosting_monthly
+    vault_retention: float = VAULT_RETENTION
+
+    @property
+    def point(self) -> JobCosts:
+        """The deterministic JobCosts with this model's mean costs."""
+        c = self.costs
+        return JobCosts(llm=c.mean_llm, audit_sub_agent=c.audit_calls * c.audit_cost,
+                        test_sub_agent=c.test_calls * c.test_cost, tx_fee=c.tx_fee, tx_per_job=c.tx_per_job,
+                        price=self.price, hosting_monthly=self.hosting_monthly)
+
+
+# ============================================================
+# SAMPLING
+# ============================================================
+
+def monthly_job_costs(costs: JobCostModel, rng: np.random.Generator, jobs: np.ndarray,
+                      batch_jobs: int = 1 << 21) -> np.ndarray:
+    """Total job cost per cell of a job-count array, sampling every job."""
+    flat = jobs.ravel()
+    out = np.zeros(flat.size)
+    ends = np.cumsum(flat)
+    start = 0
+    while start < flat.size:
+        # whole cells up to about batch_jobs jobs (at least one cell)
+        base = ends[start - 1] if start else 0
+        stop = max(int(np.searchsorted(ends, base + batch_jobs, side="right")), start + 1)
+        k = flat[start:stop]
+        total = costs.sample(rng, int(k.sum()))["total"]
+        if total.size:
+            # reduceat over non-empty cells only: an empty cell's offset would
+            # repeat the next cell's (or run past the end of the batch)
+            seg, nz = out[start:stop], k > 0
+            seg[nz] = np.add.reduceat(total, (np.cumsum(k) - k)[nz], dtype=np.float64)
+        start = stop
+    return out.reshape(jobs.shape)
+
+
+def simulate_vault(econ: UnitEconomics, rng: np.random.Generator, n_paths: int, n_months: int = 12,
+                   tvl: Optional[float] = None, runway: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    capital_efficiency_model's accounting per path: the vault pays job costs
+    and hosting and receives vault_retention of revenue. TVL is given, or
+    sized at runway months of the expected (point) monthly cost.
+    """
+    jobs = econ.demand.sample(rng, n_paths, n_months)
+    job_cost = monthly_job_costs(econ.costs, rng, jobs)
+    if tvl is None:
+        tvl = (econ.demand.jobs_per_month * econ.costs.mean_cost + econ.hosting_monthly) * runway
+    net = jobs * econ.price * econ.vault_retention - job_cost - econ.hosting_monthly
+    return {
+        "apy": np.prod(1 + net / tvl, axis=1) - 1,
+        "annual_net": net.sum(axis=1) * 12 / n_months,
+        "cost_per_job": job_cost.sum(axis=1) / np.maximum(jobs.sum(axis=1), 1),
+        "jobs": jobs.sum(axis=1),
+        "tvl": np.full(n_paths, float(tvl)),
+    }
+
+
+def _run_chunk(args) -> Dict[str, np.ndarray]:
+    econ, seed_seq, n_paths, n_months, tvl, runway = args
+    return simulate_vault(econ, np.random.default_rng(seed_seq), n_paths, n_months, tvl, runway)
+
+
+def vault_monte_carlo(econ: UnitEconomics, n_paths: int = 20_000, n_months: int = 12, tvl: Optional[float] = None,
+                      runway: Optional[float] = None, seed: int = 0, workers: int = 1,
+                      chunk_size: int = 5_000, cache: Optional[ResultCache] = None) -> Dict[str, np.ndarray]:
+    """Per-path results of simulate_vault; results depend on (seed, chunk_size), not workers."""
+    if (tvl is None) == (runway is None):
+        raise ValueError("Give exactly one of tvl and runway")
+    sizes = _chunk_sizes(n_paths, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(econ, s, n, n_months, tvl, runway) for s, n in zip(seeds, sizes)]
+    cache = cache if cache is not None else ResultCache.from_env()
+    parts = cache.map(_run_chunk, jobs, workers)
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+def optimal_tvl(annual_net: np.ndarray, target_yield: float, confidence: float = 0.90) -> float:
+    """Largest TVL whose simple annual return meets target_yield with probability `confidence`."""
+    return max(float(np.quantile(annual_net, 1 - confidence)), 0.0) / target_yield
+
+
+def interval(x: np.ndarray, percentiles=PERCENTILES) -> List[float]:
+    return list(np.percentile(x, percentiles))
+
+
+if __name__ == "__main__":
+    econ = UnitEconomics()
+    point = econ.point
+
+    print("=" * 96)
+    print("STOCHASTIC UNIT ECONOMICS: sampled jobs instead of fixed per-job costs")
+    print("=" * 96)
+
+    rng = np.random.default_rng(0)
+    n = 4_000_000
+    t0 = time.perf_counter()
+    jobs = econ.costs.sample(rng, n)
+    elapsed = time.perf_counter() - t0
+    print(f"\n--- Per-job cost, {n:,} sampled jobs ({n / elapsed / 1e6:.1f}M jobs/s) ---")
+    print(f"{'Component':<10} {'fixed':>9} {'mean':>9} {'p5':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    fixed = {"llm": JOB_COSTS.llm, "audit": JOB_COSTS.audit_sub_agent, "test": JOB_COSTS.test_sub_agent,
+             "tx": JOB_COSTS.tx_fee * JOB_COSTS.tx_per_job, "total": JOB_COSTS.cost_per_job}
+    for k, v in jobs.items():
+        p5, p50, p95, p99 = np.percentile(v, (5, 50, 95, 99))
+        print(f"{k:<10} {fixed[k]:>9.5f} {v.mean():>9.5f} {p5:>9.5f} {p50:>9.5f} {p95:>9.5f} {p99:>9.5f}")
+    print(f"  Margin at ${econ.price:.2f}/job: {1 - jobs['total'].mean() / econ.price:.1%} mean, "
+          f"{1 - np.percentile(jobs['total'], 99) / econ.price:.1%} on a p99 job")
+
+    n_paths = 10_000
+    print(f"\n--- Capital efficiency scenarios (12 months, {n_paths:,} paths; "
+          f"demand CV {econ.demand.path_cv:.0%} between paths, {econ.demand.month_cv:.0%} month to month) ---")
+    print(f"{'Scenario':<46} {'TVL':>7} {'Jobs':>5} {'point APY':>10} {'p5':>9} {'p50':>9} {'p95':>9} "
+          f"{'P(<5%)':>7}")
+    print("-" * 108)
+    total_jobs, t0 = 0, time.perf_counter()
+    for name, tvl, demand in [("B: Compute-limited (20 -> 100 jobs)", 1000, 100),
+                              ("C: Parallel scaling (10 -> 50 jobs)", 5000, 50),
+                              ("D: Demand ceiling (capital for 100, gets 30)", 5000, 30)]:
+        e = UnitEconomics(demand=DemandModel(demand))
+        r = vault_monte_carlo(e, n_paths, tvl=tvl, seed=1)
+        total_jobs += r["jobs"].sum()
+        net = demand * point.price * e.vault_retention - demand * point.cost_per_job - point.hosting_monthly
+        apy = (1 + net / tvl) ** 12 - 1
+        print(f"{name:<46} {tvl:>7,} {demand:>5} {apy:>10.1%} "
+              + "".join(f"{v:>9.1%}" for v in interval(r["apy"])) + f"{np.mean(r['apy'] < USDC_RISK_FREE):>8.1%}")
+
+    print(f"\n--- Comparative ROI on $10,000 (simple annual return) ---")
+    print(f"{'Strategy':<46} {'p5':>7} {'p50':>7} {'p95':>7} {'P(> ' + format(USDC_RISK_FREE, '.0%') + ' lending)':>20}")
+    for name, demand in [("Agent vault (bull case: 100 jobs/mo)", 100), ("Agent vault (base case: 50 jobs/mo)", 50),
+                         ("Agent vault (bear case: 20 jobs/mo)", 20)]:
+        e = UnitEconomics(demand=DemandModel(demand))
+        r = vault_monte_carlo(e, n_paths, tvl=10_000, seed=2)
+        total_jobs += r["jobs"].sum()
+        ret = r["annual_net"] / 10_000
+        lo, mid, hi = interval(ret)
+        print(f"{name:<46} {lo:>7.1%} {mid:>7.1%} {hi:>7.1%} {np.mean(ret > USDC_RISK_FREE):>20.1%}")
+
+    targets = (0.05, 0.10, 0.15, 0.20)
+    print(f"\n--- Optimal TVL: point formula vs meeting the target yield in 90% of paths ---")
+    print(f"{'Demand':>7} {'cost/job p5-p95':>16}" + "".join(f"{'TVL@' + str(int(t * 100)) + '%':>18}" for t in targets))
+    print(f"{'':>24}" + "".join(f"{'point':>9}{'90%':>9}" for _ in targets))
+    for demand in (20, 50, 100, 200, 500):
+        e = UnitEconomics(demand=DemandModel(demand))
+        r = vault_monte_carlo(e, n_paths, runway=6, seed=3)
+        total_jobs += r["jobs"].sum()
+        net = demand * point.price * e.vault_retention - demand * point.cost_per_job - point.hosting_monthly
+        lo, _, hi = interval(r["cost_per_job"])
+        row = f"{demand:>7} {lo:>7.3f} - {hi:<6.3f}"
+        for t in targets:
+            pt = f"${net * 12 / t:,.0f}" if net > 0 else "N/A"
+            ci = optimal_tvl(r["annual_net"], t)
+            row += f"{pt:>9}{'$' + format(ci, ',.0f') if ci > 0 else 'N/A':>9}"
+        print(row)
+    elapsed = time.perf_counter() - t0
+    print(f"\n  {total_jobs:,} jobs sampled for the vault tables in {elapsed:.2f}s "
+          f"({total_jobs / elapsed / 1e6:.1f}M jobs/s)")
+    print()
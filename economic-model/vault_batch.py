@@ -0,0 +1,465 @@
+"""
+Vectorized Multi-Vault Engine
+
+Struct-of-arrays counterpart to `VaultState` in simulate.py. Holds the state
+of N vaults as NumPy arrays and applies deposit / withdraw / receive_revenue /
+spend to a selection of vaults in a single call. Results match `VaultState`
+element by element; this is what protocol-wide treasury exposure runs use
+once vault counts reach the tens of thousands.
+
+A selection (`idx`) is either None (all vaults), a boolean mask of length N,
+or an array of unique integer indices. Amounts are a scalar or an array
+aligned with the selection.
+
+VaultBatchMicro is the int64 twin of fixed_point.VaultStateMicro: the same
+buffers in micro-USDC, with mul_div_array standing in for the on-chain
+u128 multiply-then-divide.
+"""
+
+import time
+from typing import List
+
+import numpy as np
+
+from event_log import KIND_CODES
+from fixed_point import BPS, VaultStateMicro
+from invariants import CONSERVED, Invariant, checked
+from simulate import VaultState
+
+
+# ============================================================
+# EXACT INT64 MUL-DIV
+# ============================================================
+
+_EST_MAX = float(1 << 50)  # float quotient estimates below this are within one unit
+
+
+def mul_div_array(a, b, c) -> np.ndarray:
+    """
+    Elementwise floor(a * b / c) for non-negative int64 inputs, exact.
+
+    The quotient is estimated in float64 and corrected by one unit using the
+    remainder a*b - q*c, which int64 arithmetic gets right modulo 2^64 and is
+    small, so the wrapped value is the true one. Elements whose estimate is
+    too large for that go through Python ints. Results above int64 raise
+    OverflowError, like checked u64 math on chain.
+    """
+    a, b, c = np.broadcast_arrays(np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64),
+                                  np.asarray(c, dtype=np.int64))
+    est = a.astype(np.float64) * b
+    est /= c
+    q = est.astype(np.int64)
+    r = a * b - q * c
+    q -= r < 0
+    q += r >= c
+    big = est >= _EST_MAX
+    if big.any():
+        for j in zip(*np.nonzero(big)):
+            exact = int(a[j]) * int(b[j]) // int(c[j])
+            if exact > np.iinfo(np.int64).max:
+                raise OverflowError(f"int64 overflow: {exact}")
+            q[j] = exact
+    return q
+
+
+def _mul_wide(a: np.ndarray, b: np.ndarray) -> tuple:
+    """Full 126-bit product of non-negative int64 arrays as (hi, lo) uint64 words."""
+    a, b = a.astype(np.uint64), b.astype(np.uint64)
+    mask, s = np.uint64(0xFFFFFFFF), np.uint64(32)
+    a1, a0, b1, b0 = a >> s, a & mask, b >> s, b & mask
+    lo = a0 * b0
+    mid = a1 * b0 + a0 * b1
+    lo2 = lo + (mid << s)
+    hi = a1 * b1 + (mid >> s) + (lo2 < lo)
+    return hi, lo2
+
+
+# ============================================================
+# VAULT BATCH
+# ============================================================
+
+class VaultBatch:
+    INVARIANTS = (
+        Invariant("nav_conservation", lambda b: b.nav_per_share, CONSERVED, tol=1e-10,
+                  ops=("deposit", "withdraw"),
+                  distance=lambda b, before, after: VaultBatch._nav_drift(
+                      before, after, live=b.total_shares > 1e-12)),
+    )
+
+    _dtype = np.float64
+
+    def __init__(self, n: int, agent_fee_bps: int = 7000, protocol_fee_bps: int = 1000):
+        self.n = n
+        # All state lives in two buffers so snapshot/restore is one copy each;
+        # the named attributes are row views and every op updates them in place.
+        self._state = np.zeros((4, n), dtype=self._dtype)
+        self._fees = np.empty((2, n), dtype=np.int64)
+        self._fees[0] = agent_fee_bps
+        self._fees[1] = protocol_fee_bps
+        self._bind()
+        self.recorder = None
+        self.recorder_id = 0
+
+    def _bind(self) -> None:
+        self.usdc_balance, self.total_shares, self.total_revenue, self.total_spend = self._state
+        self.agent_fee_bps, self.protocol_fee_bps = self._fees
+
+    def snapshot(self) -> tuple:
+        return (self._state.copy(), self._fees.copy())
+
+    def restore(self, snap: tuple) -> None:
+        np.copyto(self._state, snap[0])
+        np.copyto(self._fees, snap[1])
+
+    def fork(self) -> "VaultBatch":
+        other = type(self).__new__(type(self))
+        other.__dict__.update(self.__dict__)
+        other._state, other._fees = self.snapshot()
+        other._bind()
+        other.recorder = None
+        other.recorder_id = 0
+        return other
+
+    @classmethod
+    def from_states(cls, states: List[VaultState]) -> "VaultBatch":
+        b = cls(len(states))
+        b.usdc_balance[:] = [s.usdc_balance for s in states]
+        b.total_shares[:] = [s.total_shares for s in states]
+        b.total_revenue[:] = [s.total_revenue for s in states]
+        b.total_spend[:] = [s.total_spend for s in states]
+        b.agent_fee_bps[:] = [s.agent_fee_bps for s in states]
+        b.protocol_fee_bps[:] = [s.protocol_fee_bps for s in states]
+        return b
+
+    def to_state(self, i: int) -> VaultState:
+        return VaultState(
+            usdc_balance=float(self.usdc_balance[i]),
+            total_shares=float(self.total_shares[i]),
+            total_revenue=float(self.total_revenue[i]),
+            total_spend=float(self.total_spend[i]),
+            agent_fee_bps=int(self.agent_fee_bps[i]),
+            protocol_fee_bps=int(self.protocol_fee_bps[i]),
+        )
+
+    def _select(self, idx):
+        if idx is None:
+            return slice(None)
+        idx = np.asarray(idx)
+        if idx.dtype == np.bool_:
+            assert idx.shape == (self.n,), f"Mask shape {idx.shape} != ({self.n},)"
+            return np.flatnonzero(idx)
+        return idx
+
+    def _amounts(self, amount, i) -> np.ndarray:
+        size = self.n if isinstance(i, slice) else len(i)
+        return np.broadcast_to(np.asarray(amount, dtype=self._dtype), (size,))
+
+    @property
+    def vault_fee_bps(self) -> np.ndarray:
+        return 10000 - self.agent_fee_bps - self.protocol_fee_bps
+
+    @property
+    def nav_per_share(self) -> np.ndarray:
+        return self._nav(self.usdc_balance, self.total_shares)
+
+    @staticmethod
+    def _nav(balance: np.ndarray, shares: np.ndarray) -> np.ndarray:
+        nav = np.ones_like(balance)
+        np.divide(balance, shares, out=nav, where=shares != 0)
+        return nav
+
+    def _observe(self, i):
+        if self.recorder is None:
+            return None
+        bal, ts = self.usdc_balance[i].copy(), self.total_shares[i].copy()
+        return (self._nav(bal, ts), bal, ts)
+
+    def _log(self, kind: str, i, amount, result, pre) -> None:
+        """One event per selected vault, entity = vault index."""
+        if pre is None:
+            return
+        post = self._observe(i)
+        self.recorder.record_columns(self, KIND_CODES[kind], {
+            "amount": amount, "result": result,
+            "price_pre": pre[0], "price_post": post[0],
+            "reserve_pre": pre[1], "reserve_post": post[1],
+            "supply_pre": pre[2], "supply_post": post[2],
+        }, entity=np.arange(self.n) if isinstance(i, slice) else i)
+
+    @staticmethod
+    def _nav_drift(before: np.ndarray, after: np.ndarray, live=None) -> float:
+        d = np.subtract(before, after, out=after)
+        np.abs(d, out=d)
+        if live is not None:
+            np.copyto(d, 0.0, where=~live)
+        return float(d.max()) if d.size else 0.0
+
+    @checked
+    def deposit(self, amount, idx=None) -> np.ndarray:
+        i = self._select(idx)
+        amount = self._amounts(amount, i)
+        assert np.all(amount > 0)
+        pre = self._observe(i)
+        bal, ts = self.usdc_balance[i], self.total_shares[i]
+        shares = amount / self._nav(bal, ts)  # nav is exactly 1.0 on empty vaults
+        self.usdc_balance[i] = bal + amount
+        self.total_shares[i] = ts + shares
+        self._log("deposit", i, amount, shares, pre)
+        return shares
+
+    @checked
+    def withdraw(self, shares, idx=None) -> np.ndarray:
+        i = self._select(idx)
+        shares = self._amounts(shares, i)
+        pre = self._observe(i)
+        bal, ts = self.usdc_balance[i], self.total_shares[i]
+        assert np.all(shares > 0)
+        assert np.all(shares <= ts)
+        usdc_out = shares * self._nav(bal, ts)
+        self.total_shares[i] = ts - shares
+        self.usdc_balance[i] = bal - usdc_out
+        self._log("withdraw", i, shares, usdc_out, pre)
+        return usdc_out
+
+    @checked
+    def receive_revenue(self, amount, idx=None) -> dict:
+        i = self._select(idx)
+        amount = self._amounts(amount, i)
+        assert np.all(amount > 0)
+        pre = self._observe(i)
+        vault_cut = amount * self.vault_fee_bps[i] / 10000
+        protocol_cut = amount * self.protocol_fee_bps[i] / 10000
+        agent_cut = amount - vault_cut - protocol_cut
+        self.usdc_balance[i] += vault_cut
+        self.total_revenue[i] += amount
+        self._log("revenue", i, amount, vault_cut, pre)
+        return {"vault": vault_cut, "protocol": protocol_cut, "agent": agent_cut}
+
+    @checked
+    def spend(self, amount, idx=None) -> None:
+        i = self._select(idx)
+        amount = self._amounts(amount, i)
+        assert np.all(amount > 0)
+        assert np.all(amount <= self.usdc_balance[i]), "Insufficient balance"
+        pre = self._observe(i)
+        self.usdc_balance[i] -= amount
+        self.total_spend[i] += amount
+        self._log("spend", i, amount, 0.0, pre)
+
+
+def _nav_drops(b, before: tuple, after: tuple) -> int:
+    """
+    Vaults whose assets/shares fell, compared exactly: a1 * s0 < a0 * s1.
+
+    The difference of the two products is exact in wrapping int64 whenever
+    it is below 2^63, which the float64 difference tells us reliably while
+    the products stay under ~2^100; past that, full-width products decide.
+    """
+    (a0, s0), (a1, s1) = before, after
+    lf = a1.astype(np.float64) * s0
+    rf = a0.astype(np.float64) * s1
+    if lf.size and max(lf.max(), rf.max()) >= 2.0 ** 100:
+        lhs, rhs = _mul_wide(a1, s0), _mul_wide(a0, s1)
+        return int(np.count_nonzero((lhs[0] < rhs[0]) | ((lhs[0] == rhs[0]) & (lhs[1] < rhs[1]))))
+    lf -= rf
+    near = np.abs(lf) < 2.0 ** 62
+    exact = a1 * s0 - a0 * s1
+    return int(np.count_nonzero(np.where(near, exact < 0, lf < 0)))
+
+
+class VaultBatchMicro(VaultBatch):
+    """
+    N VaultStateMicro vaults in int64 micro-USDC, matching it unit for unit:
+    shares and payouts round down, fee cuts round down with the remainder
+    left in the vault. Virtual shares / assets are a scalar or one value per vault.
+    """
+    _dtype = np.int64
+
+    INVARIANTS = (
+        Invariant("nav_never_drops", lambda b: (b.usdc_balance + b.virtual_assets,
+                                                b.total_shares + b.virtual_shares),
+                  CONSERVED, tol=0, ops=("deposit", "withdraw"), distance=_nav_drops),
+    )
+
+    def __init__(self, n: int, agent_fee_bps: int = 7000, protocol_fee_bps: int = 1000,
+                 virtual_shares=0, virtual_assets=0):
+        super().__init__(n, agent_fee_bps, protocol_fee_bps)
+        self.virtual_shares = np.broadcast_to(np.asarray(virtual_shares, dtype=np.int64), (n,))
+        self.virtual_assets = np.broadcast_to(np.asarray(virtual_assets, dtype=np.int64), (n,))
+
+    @classmethod
+    def from_states(cls, states: List[VaultStateMicro]) -> "VaultBatchMicro":
+        b = super().from_states(states)
+        b.virtual_shares = np.array([s.virtual_shares for s in states], dtype=np.int64)
+        b.virtual_assets = np.array([s.virtual_assets for s in states], dtype=np.int64)
+        return b
+
+    def to_state(self, i: int) -> VaultStateMicro:
+        return VaultStateMicro(
+            usdc_balance=int(self.usdc_balance[i]),
+            total_shares=int(self.total_shares[i]),
+            total_revenue=int(self.total_revenue[i]),
+            total_spend=int(self.total_spend[i]),
+            agent_fee_bps=int(self.agent_fee_bps[i]),
+            protocol_fee_bps=int(self.protocol_fee_bps[i]),
+            virtual_shares=int(self.virtual_shares[i]),
+            virtual_assets=int(self.virtual_assets[i]),
+        )
+
+    @property
+    def nav_per_share(self) -> np.ndarray:
+        return self._nav((self.usdc_balance + self.virtual_assets).astype(np.float64),
+                         (self.total_shares + self.virtual_shares).astype(np.float64))
+
+    def _observe(self, i):
+        if self.recorder is None:
+            return None
+        bal, ts = self.usdc_balance[i].astype(np.float64), self.total_shares[i].astype(np.float64)
+        return (self._nav(bal, ts), bal, ts)
+
+    @checked
+    def deposit(self, amount, idx=None) -> np.ndarray:
+        i = self._select(idx)
+        amount = self._amounts(amount, i)
+        assert np.all(amount > 0)
+        pre = self._observe(i)
+        bal, ts = self.usdc_balance[i], self.total_shares[i]
+        supply = ts + self.virtual_shares[i]
+        shares = mul_div_array(amount, supply, np.maximum(bal + self.virtual_assets[i], 1))
+        np.copyto(shares, amount, where=supply == 0)  # empty vault: 1:1
+        self.usdc_balance[i] = bal + amount
+        self.total_shares[i] = ts + shares
+        self._log("deposit", i, amount, shares, pre)
+        return shares
+
+    @checked
+    def withdraw(self, shares, idx=None) -> np.ndarray:
+        i = self._select(idx)
+        shares = self._amounts(shares, i)
+        pre = self._observe(i)
+        bal, ts = self.usdc_balance[i], self.total_shares[i]
+        assert np.all(shares > 0)
+        assert np.all(shares <= ts)
+        usdc_out = mul_div_array(shares, bal + self.virtual_assets[i], ts + self.virtual_shares[i])
+        self.total_shares[i] = ts - shares
+        self.usdc_balance[i] = bal - usdc_out
+        self._log("withdraw", i, shares, usdc_out, pre)
+        return usdc_out
+
+    @checked
+    def receive_revenue(self, amount, idx=None) -> dict:
+        i = self._select(idx)
+        amount = self._amounts(amount, i)
+        assert np.all(amount > 0)
+        pre = self._observe(i)
+        agent_cut = mul_div_array(amount, self.agent_fee_bps[i], BPS)
+        protocol_cut = mul_div_array(amount, self.protocol_fee_bps[i], BPS)
+        vault_cut = amount - agent_cut - protocol_cut
+        self.usdc_balance[i] += vault_cut
+        self.total_revenue[i] += amount
+        self._log("revenue", i, amount, vault_cut, pre)
+        return {"vault": vault_cut, "protocol": protocol_cut, "agent": agent_cut}
+
+    def donate(self, amount, idx=None) -> None:
+        """Direct token transfers into the vaults: assets up, no shares."""
+        i = self._select(idx)
+        self.usdc_balance[i] += self._amounts(amount, i)
+
+
+# ============================================================
+# EQUIVALENCE + THROUGHPUT CHECK
+# ============================================================
+
+def _script(n: int, seed: int = 0):
+    """One deposit / spend / revenue / deposit / withdraw cycle per vault."""
+    rng = np.random.default_rng(seed)
+    d1 = rng.uniform(1_000, 50_000, n)
+    sp = d1 * rng.uniform(0.05, 0.5, n)
+    rev = rng.uniform(100, 20_000, n)
+    d2 = rng.uniform(500, 10_000, n)
+    return d1, sp, rev, d2
+
+
+def compare_with_vault_state(n: int = 100_000, seed: int = 0) -> dict:
+    d1, sp, rev, d2 = _script(n, seed)
+
+    t0 = time.perf_counter()
+    states = [VaultState() for _ in range(n)]
+    for j, v in enumerate(states):
+        s = v.deposit(float(d1[j]))
+        v.spend(float(sp[j]))
+        v.receive_revenue(float(rev[j]))
+        v.deposit(float(d2[j]))
+        v.withdraw(s * 0.5)
+    t_loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    b = VaultBatch(n)
+    s = b.deposit(d1)
+    b.spend(sp)
+    b.receive_revenue(rev)
+    b.deposit(d2)
+    b.withdraw(s * 0.5)
+    t_batch = time.perf_counter() - t0
+
+    max_diff = max(
+        float(np.max(np.abs(b.usdc_balance - [v.usdc_balance for v in states]))),
+        float(np.max(np.abs(b.total_shares - [v.total_shares for v in states]))),
+    )
+    return {"n": n, "loop_s": t_loop, "batch_s": t_batch,
+            "speedup": t_loop / t_batch, "max_abs_diff": max_diff}
+
+
+def compare_micro(n: int = 100_000, seed: int = 0, reps: int = 5) -> dict:
+    """VaultBatchMicro vs VaultStateMicro (exact equality) and vs the float batch (time)."""
+    d1, sp, rev, d2 = (np.round(x * 1e6).astype(np.int64) for x in _script(n, seed))
+
+    def run(b, a1, a2, a3, a4):
+        s = b.deposit(a1)
+        b.spend(a2)
+        b.receive_revenue(a3)
+        b.deposit(a4)
+        b.withdraw(s // 2)
+        return b
+
+    floats = [x.astype(np.float64) for x in (d1, sp, rev, d2)]
+    t_float = min(_timed(lambda: run(VaultBatch(n), *floats)) for _ in range(reps))
+    t_micro = min(_timed(lambda: run(VaultBatchMicro(n), d1, sp, rev, d2)) for _ in range(reps))
+    b = run(VaultBatchMicro(n), d1, sp, rev, d2)
+
+    m = min(n, 10_000)
+    mismatches = 0
+    for j in range(m):
+        v = VaultStateMicro()
+        s = v.deposit(int(d1[j]))
+        v.spend(int(sp[j]))
+        v.receive_revenue(int(rev[j]))
+        v.deposit(int(d2[j]))
+        v.withdraw(s // 2)
+        mismatches += (v.usdc_balance, v.total_shares) != (int(b.usdc_balance[j]), int(b.total_shares[j]))
+    return {"n": n, "float_s": t_float, "micro_s": t_micro, "slowdown": t_micro / t_float,
+            "checked": m, "mismatches": mismatches}
+
+
+def _timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("VAULT BATCH: element-wise equivalence and throughput vs VaultState")
+    print("=" * 80)
+    for n in [1_000, 10_000, 100_000]:
+        r = compare_with_vault_state(n)
+        print(f"  N={r['n']:>7,}: loop={r['loop_s']:.3f}s batch={r['batch_s']:.4f}s "
+              f"speedup={r['speedup']:>6.0f}x max|diff|={r['max_abs_diff']:.2e}")
+
+    print("\n--- Integer micro-USDC batch vs float batch ---")
+    for n in [10_000, 100_000, 1_000_000]:
+        r = compare_micro(n)
+        print(f"  N={r['n']:>9,}: float={r['float_s']:.4f}s micro={r['micro_s']:.4f}s "
+              f"slowdown={r['slowdown']:.2f}x  exact vs VaultStateMicro: "
+              f"{r['checked'] - r['mismatches']:,}/{r['checked']:,}")
+    print()